@@ -0,0 +1,77 @@
+"""Helpers shared by the benchmarks, which run on the headless backend."""
+import time
+
+from splutter.core import Controller
+from splutter.core import View
+from splutter.headless import HeadlessCurses
+from splutter.window import Window
+
+# Calls that read input rather than draw.
+_INPUT_CALLS = ('getch',)
+
+
+def headless_window(width=80, height=24, **kwargs):
+    """Make a window on a new headless screen.
+
+    :returns: The ``(curses_lib, window)`` pair.
+    """
+    curses_lib = HeadlessCurses(width, height)
+    window = Window(curses_lib.screen, curses_lib=curses_lib, **kwargs)
+    return curses_lib, window
+
+
+class BenchController(Controller):
+    """A controller showing one view, which ignores events it is sent."""
+    def __init__(self, view=None):
+        super().__init__()
+        self.view = View() if view is None else view
+        self.add_view('main', self.view)
+        self.active_view = 'main'
+
+    def handle_event(self, event, window):
+        pass
+
+
+def run_frames(controller, curses_lib, window, frames, step=None):
+    """Draw frames the way the controller's main loop does.
+
+    Each frame reads and handles any input, then draws the damaged parts
+    of the window. The first, full frame is drawn before timing starts.
+
+    :param step: Called with the frame number before each frame. It can
+        change components, and returns input to send to the screen or
+        None.
+    :returns: A dict of results, see :func:`result`.
+    """
+    screen = curses_lib.screen
+    controller._full_redraw = True
+    controller._draw(window)
+    screen.call_counts.clear()
+    screen.bytes_written = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        if step is not None:
+            data = step(frame)
+            if data is not None:
+                screen.feed(data)
+        controller._poll_all(window)
+        controller._draw(window)
+    return result(frames, time.perf_counter() - start, screen)
+
+
+def result(frames, seconds, screen=None):
+    """Summarise a timed run of frames as a dict that can go into JSON."""
+    summary = {
+        'frames': frames,
+        'seconds': seconds,
+        'fps': frames / seconds if seconds else None,
+        'us_per_frame': 1e6 * seconds / frames if frames else None,
+    }
+    if screen is not None:
+        calls = dict((name, count / frames)
+                     for name, count in sorted(screen.call_counts.items())
+                     if name not in _INPUT_CALLS)
+        summary['curses_calls_per_frame'] = sum(calls.values())
+        summary['calls_per_frame'] = calls
+        summary['bytes_per_frame'] = screen.bytes_written / frames
+    return summary
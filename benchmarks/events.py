@@ -0,0 +1,85 @@
+"""Measure the cost of reading and dispatching input events.
+
+Each stream of input is decoded by the window and dispatched through the
+controller's event bus, with and without an event pool::
+
+    python -m benchmarks.events
+
+Expect the pooled figures to be no better than the plain ones, see
+:class:`splutter.events.EventPool`.
+"""
+import time
+import argparse
+
+from splutter.events import EventPool
+from splutter.keys import KEY_DOWN
+from splutter.keys import KEY_UP
+from splutter.table import ColumnSpec
+from splutter.table import Table
+from splutter.text import TextField
+
+from benchmarks.common import BenchController
+from benchmarks.common import headless_window
+
+
+def _typing(count):
+    return [ord('a') + i % 26 for i in range(count)]
+
+
+def _arrows(count):
+    return [KEY_DOWN if i % 2 else KEY_UP for i in range(count)]
+
+
+def _mouse_moves(count):
+    codes = []
+    for i in range(count):
+        report = '\x1b[<35;%d;%dM' % (i % 80 + 1, i % 24 + 1)
+        codes.extend(ord(c) for c in report)
+    return codes
+
+
+def _controller(focus):
+    controller = BenchController()
+    view = controller.view
+    view.add_component('field', TextField(0, 0, width=40))
+    view.add_component('table', Table(0, 2, [ColumnSpec('Name', 20)],
+                                      height=10))
+    view.active_component = focus
+    return controller
+
+
+def measure(codes, focus, batch, pool=None):
+    """Return the average seconds taken to handle one event."""
+    curses_lib, window = headless_window(event_pool=pool)
+    screen = curses_lib.screen
+    controller = _controller(focus)
+    events = 0
+    start = time.perf_counter()
+    for offset in range(0, len(codes), batch):
+        screen.feed(codes[offset:offset + batch])
+        for event in window.get_events():
+            controller._propagate_event(event, window)
+            window.release_events([event])
+            events += 1
+    return (time.perf_counter() - start) / max(events, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=100000)
+    args = parser.parse_args()
+    # Keys are read a few at a time, as typed, so they are not pastes.
+    streams = [
+        ('typing', _typing(args.events), 'field', 4),
+        ('arrows', _arrows(args.events), 'table', 4),
+        ('mouse moves', _mouse_moves(args.events), 'table', 64),
+    ]
+    for name, codes, focus, batch in streams:
+        plain = measure(codes, focus, batch)
+        pooled = measure(codes, focus, batch, pool=EventPool())
+        print('%-12s %6.2f us/event %6.2f us/event pooled' % (
+            name, plain * 1e6, pooled * 1e6))
+
+
+if __name__ == '__main__':
+    main()
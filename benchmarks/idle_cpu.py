@@ -0,0 +1,60 @@
+"""Measure how much CPU an idle splutter window uses.
+
+Runs a controller with no input for a few seconds in each loop mode and
+reports the CPU time used as a percentage of wall clock time::
+
+    python -m benchmarks.idle_cpu --seconds 2
+"""
+import time
+import asyncio
+import argparse
+
+from splutter.core import Controller
+from splutter.text import TextField
+from splutter.window import Window
+from splutter.exceptions import CloseSplutterWindow
+from splutter.headless import HeadlessCurses
+
+from benchmarks.common import BenchController
+
+
+def _stop():
+    raise CloseSplutterWindow('done')
+
+
+def measure(mode, seconds):
+    """Return the CPU used by an idle window as a fraction of wall time."""
+    curses_lib = HeadlessCurses()
+    try:
+        window = Window(curses_lib.screen, curses_lib=curses_lib,
+                        input_fd=curses_lib.screen.fileno())
+        controller = BenchController()
+        controller.view.add_component('input', TextField(0, 0, text='idle'))
+        controller.view.active_component = 'input'
+
+        async def _attach():
+            controller.call_later(seconds, _stop)
+            await controller.attach_to_window(window, mode=mode)
+
+        wall = time.monotonic()
+        cpu = time.process_time()
+        asyncio.run(_attach())
+        cpu = time.process_time() - cpu
+        wall = time.monotonic() - wall
+    finally:
+        curses_lib.screen.close()
+    return cpu / wall
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=2.0,
+                        help='How long to leave each window idle.')
+    args = parser.parse_args()
+    for name, mode in (('poll', Controller.LOOP_POLL),
+                       ('event', Controller.LOOP_EVENT)):
+        print('%-6s %6.2f%% cpu' % (name, 100 * measure(mode, args.seconds)))
+
+
+if __name__ == '__main__':
+    main()
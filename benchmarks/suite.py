@@ -0,0 +1,224 @@
+"""Run every benchmark and report the results as JSON.
+
+Each built-in component is drawn frame after frame on the headless
+backend, changing a little every frame as it would in use. Frames per
+second, curses calls per frame and bytes per frame are reported for
+each, along with the cost of decoding and dispatching input::
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --only table art
+
+Compare the output of two releases to catch regressions.
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+
+from splutter import keys
+from splutter.art import Art
+from splutter.core import Controller
+from splutter.core import View
+from splutter.events import EventPool
+from splutter.table import ColumnSpec
+from splutter.table import Table
+from splutter.text import TextField
+from splutter.window import EventBus
+from splutter.window import WindowEvent
+
+from benchmarks import events
+from benchmarks import idle_cpu
+from benchmarks.common import BenchController
+from benchmarks.common import headless_window
+from benchmarks.common import run_frames
+from benchmarks.table_render import LazyRows
+
+_PASTE_START = '\x1b[200~'
+_PASTE_END = '\x1b[201~'
+
+
+def _table(row_count, frames):
+    curses_lib, window = headless_window(200, 60)
+    controller = BenchController()
+    table = Table(0, 0, [ColumnSpec('Id', 10), ColumnSpec('Host', 12),
+                         ColumnSpec('Latency', 10)], height=50)
+    table.rows = LazyRows(row_count)
+    controller.view.add_component('table', table)
+    controller.view.active_component = 'table'
+
+    def step(frame):
+        # Move the selection back and forth so every frame changes.
+        return [keys.KEY_DOWN if frame // 8 % 2 == 0 else keys.KEY_UP]
+
+    return run_frames(controller, curses_lib, window, frames, step)
+
+
+def bench_table_10(frames):
+    return _table(10, frames)
+
+
+def bench_table_1k(frames):
+    return _table(1000, frames)
+
+
+def bench_table_100k(frames):
+    return _table(100000, frames)
+
+
+def bench_art_200x60(frames):
+    curses_lib, window = headless_window(200, 60)
+    controller = BenchController()
+    art = Art(0, 0, '\n'.join('#' * 200 for _ in range(60)))
+    controller.view.add_component('art', art)
+
+    def step(frame):
+        char = chr(ord('a') + frame % 26)
+        art.set_entry(frame * 7 % 200, frame % 60, char)
+
+    return run_frames(controller, curses_lib, window, frames, step)
+
+
+def _text_field(frames, step):
+    curses_lib, window = headless_window()
+    controller = BenchController()
+    # Long enough that text is never refused.
+    field = TextField(0, 0, width=60, max_length=1 << 20)
+    controller.view.add_component('field', field)
+    controller.view.active_component = 'field'
+    return run_frames(controller, curses_lib, window, frames, step)
+
+
+def bench_text_field_typing(frames):
+    return _text_field(frames, lambda frame: chr(ord('a') + frame % 26))
+
+
+def bench_text_field_paste(frames):
+    def step(frame):
+        text = ''.join(chr(ord('a') + (frame + i) % 26) for i in range(256))
+        return _PASTE_START + text + _PASTE_END
+
+    return _text_field(frames, step)
+
+
+def bench_view_400_components(frames):
+    curses_lib, window = headless_window(200, 60)
+    controller = BenchController()
+    view = controller.view
+    names = []
+    for row in range(20):
+        for column in range(20):
+            name = 'field-%d-%d' % (column, row)
+            view.add_component(name, TextField(column * 10, row * 3,
+                                               width=8))
+            names.append(name)
+
+    def step(frame):
+        # Type into a different field every frame.
+        view.active_component = names[frame * 37 % len(names)]
+        return chr(ord('a') + frame % 26)
+
+    return run_frames(controller, curses_lib, window, frames, step)
+
+
+def bench_event_bus(frames):
+    """Propagate key events through nested views to a focused table."""
+    _, window = headless_window()
+    controller = BenchController()
+    inner = View()
+    table = Table(0, 0, [ColumnSpec('Name', 20)], height=10)
+    table.rows = LazyRows(1000)
+    inner.add_component('table', table)
+    inner.active_component = 'table'
+    controller.view.add_component('inner', inner)
+    controller.view.active_component = 'inner'
+    bus = EventBus(controller)
+    key_events = [WindowEvent(keys.KEY_DOWN if i % 2 else keys.KEY_UP,
+                              WindowEvent.KEY_EVENT)
+                  for i in range(frames)]
+    start = time.perf_counter()
+    for event in key_events:
+        bus.propagate_event(event, controller.view, window)
+    seconds = time.perf_counter() - start
+    return {
+        'events': frames,
+        'seconds': seconds,
+        'events_per_second': frames / seconds if seconds else None,
+        'us_per_event': 1e6 * seconds / frames if frames else None,
+    }
+
+
+def _input(codes, focus, batch):
+    def bench(frames):
+        stream = codes(frames)
+        return {
+            'events': frames,
+            'us_per_event': 1e6 * events.measure(stream, focus, batch),
+            'us_per_event_pooled': 1e6 * events.measure(
+                stream, focus, batch, pool=EventPool()),
+        }
+    return bench
+
+
+BENCHMARKS = [
+    ('table_10', bench_table_10),
+    ('table_1k', bench_table_1k),
+    ('table_100k', bench_table_100k),
+    ('art_200x60', bench_art_200x60),
+    ('text_field_typing', bench_text_field_typing),
+    ('text_field_paste', bench_text_field_paste),
+    ('view_400_components', bench_view_400_components),
+    ('event_bus', bench_event_bus),
+    # Keys are read a few at a time, as typed, so they are not pastes.
+    ('input_typing', _input(events._typing, 'field', 4)),
+    ('input_arrows', _input(events._arrows, 'table', 4)),
+    ('input_mouse_moves', _input(events._mouse_moves, 'table', 64)),
+]
+
+
+def run(frames, only=None, idle_seconds=0):
+    """Run the benchmarks whose names start with any of ``only``.
+
+    :returns: A dict of results that can be written as JSON.
+    """
+    results = {}
+    for name, bench in BENCHMARKS:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results[name] = bench(frames)
+    if idle_seconds:
+        results['idle_cpu'] = dict(
+            (mode_name, idle_cpu.measure(mode, idle_seconds))
+            for mode_name, mode in (('poll', Controller.LOOP_POLL),
+                                    ('event', Controller.LOOP_EVENT)))
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'frames': frames,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=1000,
+                        help='Frames, or events, to run each benchmark for.')
+    parser.add_argument('--only', nargs='*',
+                        help='Only run benchmarks starting with these names.')
+    parser.add_argument('--idle-seconds', type=float, default=0,
+                        help='Also measure idle CPU use for this long.')
+    parser.add_argument('--output', help='Write the JSON to this file.')
+    args = parser.parse_args()
+    report = run(args.frames, args.only, args.idle_seconds)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Measure how long a Table takes to render as its row count grows.
+
+Rows come from a lazy sequence, so the render time should stay the same
+however many rows there are::
+
+    python -m benchmarks.table_render
+"""
+import time
+import argparse
+
+from splutter.table import ColumnSpec
+from splutter.table import Table
+
+from benchmarks.common import headless_window
+
+
+class LazyRows(object):
+    """Rows that are only built when they are read."""
+    def __init__(self, count):
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return [index, 'host-%d' % (index % 97), index * 0.5]
+
+
+def measure(row_count, frames, height=50):
+    """Return the average seconds taken to render one frame."""
+    _, window = headless_window(200, 60)
+    table = Table(0, 0, [ColumnSpec('Id', 10), ColumnSpec('Host', 12),
+                         ColumnSpec('Latency', 10)], height=height)
+    table.rows = LazyRows(row_count)
+    # Park the selection in the middle of the rows.
+    table._select(row_count // 2)
+    start = time.perf_counter()
+    for _ in range(frames):
+        window.erase()
+        table.render(0, 0, window)
+        window.refresh()
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+    for row_count in (1000, 100000, 1000000):
+        seconds = measure(row_count, args.frames)
+        print('%9d rows %8.1f us/frame' % (row_count, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,8 @@ from splutter.core import Controller
 from splutter.exceptions import CloseSplutterWindow
 from splutter.art import Art
 from splutter.art import Border
-from splutter.art import TextField
+from splutter.keymap import Keymap
+from splutter.text import TextField
 
 
 ART = r"""
@@ -47,6 +48,17 @@ class ArtController(Controller):
     INSERT_MODE = 0
     CONTROL_MODE = 1
 
+    KEYMAP = Keymap()
+    KEYMAP.bind(splutter.KEY_UP, 'move_up', INSERT_MODE)
+    KEYMAP.bind(splutter.KEY_DOWN, 'move_down', INSERT_MODE)
+    KEYMAP.bind(splutter.KEY_LEFT, 'move_left', INSERT_MODE)
+    KEYMAP.bind(splutter.KEY_RIGHT, 'move_right', INSERT_MODE)
+    KEYMAP.bind(splutter.KEY_ESC, 'control_mode', INSERT_MODE)
+    KEYMAP.bind('i', 'insert_mode', CONTROL_MODE)
+    KEYMAP.bind('I', 'insert_mode', CONTROL_MODE)
+    KEYMAP.bind('q', 'quit', CONTROL_MODE)
+    KEYMAP.bind('Q', 'quit', CONTROL_MODE)
+
     def __init__(self, art):
         super().__init__()
         self._cursor_x = 1
@@ -54,10 +66,10 @@ class ArtController(Controller):
         self._mode = None
         self._art = Art(1, 2, art)
         self._border = Border(0, 1, self._art.width + 1, self._art.height + 1)
-        self._mode_text = TextField(1, 0)
-        self._stats_text = TextField(1, self._art.bottom + 1,
-                                     'Size: %d x %d' % (self._art.width,
-                                                        self._art.height))
+        self._mode_text = TextField(1, 0, width=50)
+        self._stats_text = TextField(1, self._art.bottom + 1, width=50,
+                                     text='Size: %d x %d' % (self._art.width,
+                                                             self._art.height))
         self._control_mode_instructions = Art(
             self._border.right + 2, 2, INSTRUCTIONS)
 
@@ -97,38 +109,38 @@ class ArtController(Controller):
         super().render(window)
         window.move_cursor(self._cursor_x, self._cursor_y)
 
-    def _handle_insert_mode_key(self, input_ch, window):
-        if input_ch == splutter.KEY_UP:
-            self._try_move(-1, 0, window)
-        elif input_ch == splutter.KEY_DOWN:
-            self._try_move(1, 0, window)
-        elif input_ch == splutter.KEY_LEFT:
-            self._try_move(0, -1, window)
-        elif input_ch == splutter.KEY_RIGHT:
-            self._try_move(0, 1, window)
-        elif 32 <= input_ch < 128:
-            # Ascii range for a printable character. Overwrite the current char
-            # in the art box.
+    def action_move_up(self, event, window):
+        self._try_move(-1, 0, window)
+
+    def action_move_down(self, event, window):
+        self._try_move(1, 0, window)
+
+    def action_move_left(self, event, window):
+        self._try_move(0, -1, window)
+
+    def action_move_right(self, event, window):
+        self._try_move(0, 1, window)
+
+    def action_control_mode(self, event, window):
+        self._set_mode(self.CONTROL_MODE)
+
+    def action_insert_mode(self, event, window):
+        self._set_mode(self.INSERT_MODE)
+
+    def action_quit(self, event, window):
+        raise CloseSplutterWindow(
+            'Exiting because %s was pressed.' % chr(event.code))
+
+    def handle_event(self, event, window):
+        if self.KEYMAP.dispatch(event, self, window, mode=self._mode):
+            return
+        printable = event.printable()
+        if self._mode == self.INSERT_MODE and printable:
+            # Overwrite the current char in the art box.
             self._art.set_entry(
                 self._cursor_x - self._art.x,
                 self._cursor_y - self._art.y,
-                chr(input_ch))
-        elif input_ch == splutter.KEY_ESC:
-            self._set_mode(self.CONTROL_MODE)
-
-    def _handle_control_mode_key(self, input_ch, window):
-        value = chr(input_ch)
-        if value == 'i' or value == 'I':
-            self._set_mode(self.INSERT_MODE)
-        if value == 'q' or value == 'Q':
-            raise CloseSplutterWindow(
-                'Exiting because %s was pressed.' % value)
-
-    def handle_key(self, input_ch, window):
-        if self._mode == self.INSERT_MODE:
-            self._handle_insert_mode_key(input_ch, window)
-        elif self._mode == self.CONTROL_MODE:
-            self._handle_control_mode_key(input_ch, window)
+                printable)
 
 
 def _load_art(path):
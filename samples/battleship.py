@@ -1,4 +1,3 @@
-import re
 import asyncio
 from collections import OrderedDict
 
@@ -9,6 +8,8 @@ from splutter.core import View
 from splutter.core import Controller
 from splutter.table import ColumnSpec
 from splutter.table import Table
+from splutter.rows import RowStore
+from splutter.keymap import Keymap
 from splutter.keys import KEY_ENTER, KEY_UP, KEY_DOWN, KEY_LEFT, KEY_RIGHT
 
 
@@ -110,19 +111,23 @@ class BoardView(View):
         self._in_bounds(ship)
 
     def _can_place(self, ship):
-        placed_ships = [s for key, s in self.components.items()
-                        if re.match('placed_\d', key)]
-        for placed_ship in placed_ships:
-            if ship.overlaps(placed_ship):
+        for other in self.query_rect(ship.bounds()):
+            if other is not ship and isinstance(other, Ship):
                 return False
         return True
 
     def handle_placement_event(self, event, window):
-        """Drop the ship that is being placed onto the board."""
-        self._num += 1
+        """Drop the ship that is being placed onto the board.
+
+        :returns: False if the ship overlaps one already placed.
+        """
         ship = self.get_component(self.SHIP_COMPONENT)
+        if not self._can_place(ship):
+            return False
+        self._num += 1
         self.add_component(self.SHIP_COMPONENT, None)
         self.add_component('placed_%s' % self._num, ship)
+        return True
 
     def rotate_placement_ship(self):
         """Rotate the ship that is currently being placed."""
@@ -144,7 +149,10 @@ class ShipSelectionView(View):
             ColumnSpec('Name', 11),
             ColumnSpec('Symbol', 16)
         ])
-        self._table.rows = [[k, v] for k, v in _SHIPS_HORIZ.items()]
+        order = list(_SHIPS_HORIZ)
+        self._ships = RowStore(sort_key=lambda row: order.index(row[0]))
+        self._ships.update((k, [k, v]) for k, v in _SHIPS_HORIZ.items())
+        self._table.rows = self._ships
         self.add_component('table', self._table)
         self.active_component = 'table'
 
@@ -153,12 +161,7 @@ class ShipSelectionView(View):
         return name
 
     def delete_ship(self, ship_name_to_delete):
-        new_ships = []
-        for row in self._table.rows:
-            ship_name = row[0]
-            if ship_name != ship_name_to_delete:
-                new_ships.append(row)
-        self._table.rows = new_ships
+        self._ships.delete(ship_name_to_delete)
 
     def handle_event(self, event, window):
         pass
@@ -168,6 +171,17 @@ class PlacementController(Controller):
     SHIP_VIEW_NAME = 'ships'
     BOARD_VIEW_NAME = 'board'
 
+    # Bindings are in a mode named after the view they apply to.
+    KEYMAP = Keymap()
+    KEYMAP.bind(KEY_ENTER, 'choose_ship', SHIP_VIEW_NAME)
+    KEYMAP.bind(KEY_LEFT, 'move_ship', BOARD_VIEW_NAME)
+    KEYMAP.bind(KEY_RIGHT, 'move_ship', BOARD_VIEW_NAME)
+    KEYMAP.bind(KEY_UP, 'move_ship', BOARD_VIEW_NAME)
+    KEYMAP.bind(KEY_DOWN, 'move_ship', BOARD_VIEW_NAME)
+    KEYMAP.bind(KEY_ENTER, 'place_ship', BOARD_VIEW_NAME)
+    KEYMAP.bind('r', 'rotate_ship', BOARD_VIEW_NAME)
+    KEYMAP.bind('R', 'rotate_ship', BOARD_VIEW_NAME)
+
     def __init__(self):
         super().__init__()
         self.add_view(self.BOARD_VIEW_NAME, BoardView())
@@ -190,24 +204,22 @@ class PlacementController(Controller):
         # Set the active view to the board so events are properly sent to it.
         self.active_view = self.BOARD_VIEW_NAME
 
-    def _handle_ships_event(self, event, window):
-        if event == KEY_ENTER:
-            ship = self.active_view.get_selected_ship_name()
-            self._select_ship_from_ship_list(ship)
+    def action_choose_ship(self, event, window):
+        ship = self.active_view.get_selected_ship_name()
+        self._select_ship_from_ship_list(ship)
+
+    def action_move_ship(self, event, window):
+        self.active_view.handle_move_event(event, window)
 
-    def _handle_board_event(self, event, window):
-        if event in {KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN}:
-            self.active_view.handle_move_event(event, window)
-        elif event == KEY_ENTER:
-            self.active_view.handle_placement_event(event, window)
+    def action_place_ship(self, event, window):
+        if self.active_view.handle_placement_event(event, window):
             self.active_view = self.SHIP_VIEW_NAME
-        elif event == 'r':
-            self.active_view.rotate_placement_ship()
+
+    def action_rotate_ship(self, event, window):
+        self.active_view.rotate_placement_ship()
 
     def handle_event(self, event, window):
-        getattr(self, '_handle_%s_event' % self.active_view_name)(
-            event, window
-        )
+        self.KEYMAP.dispatch(event, self, window, mode=self.active_view_name)
 
 
 def main():
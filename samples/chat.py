@@ -35,7 +35,8 @@ def main():
 
     with splutter_window() as window:
         controller = ChatController()
-        loop.run_until_complete(controller.attach_to_window(window))
+        loop.run_until_complete(controller.attach_to_window(
+            window, mode=Controller.LOOP_EVENT))
 
 
 if __name__ == '__main__':
@@ -20,5 +20,8 @@ setup(
     long_description=long_description,
     keywords=['curses', 'terminal'],
     license='MIT',
+    extras_require={
+        'numpy': ['numpy'],
+    },
     classifiers=[],
 )
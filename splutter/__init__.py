@@ -1,5 +1,7 @@
 import os
+import sys
 import curses
+import locale
 from contextlib import contextmanager
 
 from splutter.keys import *  # noqa
@@ -8,21 +10,48 @@ from splutter.core import View
 from splutter.core import Controller
 from splutter.art import Border
 
-ESCDELAY = '25'
+# Escape sequences are decoded by the window as they arrive, so curses
+# has no need to wait after an ESC key.
+ESCDELAY = '0'
 
+BRACKETED_PASTE_ON = '\x1b[?2004h'
+BRACKETED_PASTE_OFF = '\x1b[?2004l'
+# Report every button press, release and movement in the SGR format.
+MOUSE_ON = '\x1b[?1003h\x1b[?1006h'
+MOUSE_OFF = '\x1b[?1006l\x1b[?1003l'
 
-def init(curses_lib=curses):
+
+def _write_terminal(sequence, curses_lib=curses):
+    # Stand-ins for curses, such as splutter.headless, capture the output.
+    write = getattr(curses_lib, 'write_terminal', None)
+    if write is not None:
+        write(sequence)
+        return
+    sys.stdout.write(sequence)
+    sys.stdout.flush()
+
+
+def init(curses_lib=curses, bracketed_paste=True, mouse=False):
     os.environ.setdefault('ESCDELAY', ESCDELAY)
+    # Needed for curses to draw the box drawing characters borders use.
+    locale.setlocale(locale.LC_ALL, '')
     screen = curses_lib.initscr()
     curses_lib.noecho()
     curses_lib.cbreak()
     screen.keypad(1)
     curses_lib.start_color()
     screen.nodelay(1)
-    return Window(screen)
+    if bracketed_paste:
+        _write_terminal(BRACKETED_PASTE_ON, curses_lib)
+    if mouse:
+        _write_terminal(MOUSE_ON, curses_lib)
+    # Curses screens read stdin, but stand-ins may have their own input.
+    input_fd = screen.fileno() if hasattr(screen, 'fileno') else None
+    return Window(screen, curses_lib=curses_lib, input_fd=input_fd)
 
 
 def cleanup(window, curses_lib=curses):
+    _write_terminal(BRACKETED_PASTE_OFF + MOUSE_OFF, curses_lib)
     curses_lib.nocbreak()
     window.curses_window.keypad(0)
     curses_lib.echo()
@@ -30,14 +59,14 @@ def cleanup(window, curses_lib=curses):
 
 
 @contextmanager
-def splutter_window(curses_lib=curses):
+def splutter_window(curses_lib=curses, mouse=False):
     try:
-        screen = init(curses_lib)
+        screen = init(curses_lib, mouse=mouse)
         yield screen
     finally:
         close_reason = None
         if 'screen' in locals():
-            cleanup(screen)
+            cleanup(screen, curses_lib)
             close_reason = screen.close_reason
         if close_reason:
             print(close_reason)
@@ -1,52 +1,186 @@
-from curses.textpad import rectangle
+from array import array
 
 from splutter.core import Component
+from splutter.window import _CHAR_TYPECODE
+
+
+def _runs(rows):
+    """Group sorted row numbers into ``(first, end)`` runs of neighbours."""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row:
+            runs[-1][1] = row + 1
+        else:
+            runs.append([row, row + 1])
+    return runs
 
 
 class Art(Component):
+    """Text art drawn from a grid of cells.
+
+    Each cell holds a character and a color, in flat arrays with one entry
+    per cell in row major order, so a cell is written in constant time by
+    :meth:`set_entry` and rectangles of cells by :meth:`blit` and
+    :meth:`fill`. Only the rows that were written are redrawn on the next
+    frame.
+
+    Spaces at the end of a row are not drawn, so whatever is beneath the
+    art shows through them.
+    """
     def __init__(self, x, y, raw_source, bind_to=Component.BIND_TOP_LEFT):
         super().__init__(x, y, bind_to=bind_to)
         self._bind_to = bind_to
         self._raw_source = raw_source
         self._width = 0
         self._height = 0
-        self._lines = []
+        self._chars = array(_CHAR_TYPECODE)
+        # Indexes into the palette, 0 draws in the window's current color.
+        self._colors = array('i')
+        self._palette = [None]
+        # Palette indexes by color pair number.
+        self._palette_indexes = {}
+        # The rows written since the last frame, None if all of them must
+        # be redrawn.
+        self._dirty_rows = None
         self.set_lines(raw_source)
 
     @property
     def width(self):
         return self._width
 
-    def _render(self, x, y, window):
-        y_offset = y
-        for line in self._lines:
-            window.add_string(x, y_offset, line.rstrip())
-            y_offset += 1
+    def invalidate(self):
+        self._dirty_rows = None
+        super().invalidate()
+
+    def _rows_changed(self, first, end):
+        if self._dirty_rows is not None:
+            self._dirty_rows.update(range(first, end))
+        super().invalidate()
+
+    def _mark_drawn(self, zero_x, zero_y):
+        super()._mark_drawn(zero_x, zero_y)
+        self._dirty_rows = set()
+
+    def damage(self, zero_x=0, zero_y=0):
+        if not self._dirty:
+            return []
+        rows = self._dirty_rows
+        bounds = self.bounds(zero_x, zero_y)
+        if not rows or self.opaque or bounds != self._rendered_bounds:
+            return super().damage(zero_x, zero_y)
+        left, top, right, _ = bounds
+        return [(left, top + first, right, top + end)
+                for first, end in _runs(sorted(rows))]
+
+    def _color_index(self, color):
+        if color is None:
+            return 0
+        # Colors that look the same share a pair number and so a palette
+        # entry, which keeps the palette as small as the number of pairs.
+        number = color.COLOR_UID
+        index = self._palette_indexes.get(number)
+        if index is None or self._palette[index].COLOR_UID != number:
+            # New, or the color of the entry was changed since.
+            index = self._palette_indexes[number] = len(self._palette)
+            self._palette.append(color)
+        return index
+
+    def _check(self, x, y):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise IndexError('(%d, %d) is outside the art' % (x, y))
+
+    def get_entry(self, x, y):
+        """Get the character in a cell."""
+        self._check(x, y)
+        return self._chars[y * self._width + x]
 
-    def _pad(self, line):
-        length = len(line)
-        pad_right_length = self._width - length
-        return '%s%s' % (line, ' ' * pad_right_length)
+    def set_entry(self, x, y, char, color=None):
+        """Write a character into a cell.
 
-    def set_entry(self, x, y, char):
-        line = self._pad(self._lines[y])
-        new_line = '%s%s%s' % (line[:x], char, line[x+1:])
-        self._lines[y] = new_line
+        :type color: :class:`splutter.colors.Color`
+        :param color: The color of the cell, None for the window's current
+            color.
+        """
+        self._check(x, y)
+        index = y * self._width + x
+        self._chars[index] = char
+        self._colors[index] = self._color_index(color)
+        self._rows_changed(y, y + 1)
+
+    def blit(self, x, y, source, color=None):
+        """Write a rectangle of characters with its top left at a cell.
+
+        Spaces in the source are written like any other character. Parts
+        that fall outside of the art are dropped.
+
+        :param source: The rows to write, as a string of lines or a list.
+        """
+        if isinstance(source, str):
+            source = source.split('\n')
+        first = max(y, 0)
+        end = min(y + len(source), self._height)
+        if x >= self._width or first >= end:
+            return
+        width = self._width
+        color_index = self._color_index(color)
+        for row in range(first, end):
+            line = source[row - y]
+            if x < 0:
+                line = line[-x:]
+            line = line[:width - max(x, 0)]
+            start = row * width + max(x, 0)
+            self._chars[start:start + len(line)] = array(_CHAR_TYPECODE, line)
+            self._colors[start:start + len(line)] = (
+                array('i', [color_index]) * len(line))
+        self._rows_changed(first, end)
+
+    def fill(self, x, y, width, height, char=' ', color=None):
+        """Set every cell of a rectangle to one character and color."""
+        self.blit(x, y, [char * width] * height, color)
 
     def set_lines(self, raw_source):
-        self._lines = raw_source.split('\n')
-        self._height = len(self._lines)
-        self._width = 0
-        for line in self._lines:
-            self._width = max(self._width, len(line))
+        lines = raw_source.split('\n')
+        self._height = len(lines)
+        self._width = max(len(line) for line in lines)
+        self._chars = array(_CHAR_TYPECODE,
+                            ''.join(line.ljust(self._width) for line in lines))
+        self._colors = array('i', [0]) * len(self._chars)
+        self._palette = [None]
+        self._palette_indexes = {}
+        self.invalidate()
 
-    def move(self, x=None, y=None):
-        if x is None:
-            x = self._x
-        if y is None:
-            y = self._y
-        self._x = x
-        self._y = y
+    def _row_spans(self, row):
+        start = row * self._width
+        text = self._chars[start:start + self._width].tounicode().rstrip()
+        colors = self._colors[start:start + len(text)]
+        if not any(colors):
+            return ((text, None),)
+        palette = self._palette
+        spans = []
+        run_start = 0
+        for i in range(1, len(text) + 1):
+            if i == len(text) or colors[i] != colors[run_start]:
+                spans.append((text[run_start:i], palette[colors[run_start]]))
+                run_start = i
+        return spans
+
+    def _draw_rows(self, x, y, rows, window):
+        for row in rows:
+            window.add_spans(x, y + row, self._row_spans(row))
+
+    def _render(self, x, y, window):
+        self._draw_rows(x, y, range(self._height), window)
+
+    def render_damaged(self, zero_x, zero_y, window, damage):
+        x, y = self._origin(zero_x, zero_y)
+        right = x + self._width
+        rows = set()
+        for left, top, other_right, bottom in damage:
+            if left < right and x < other_right:
+                rows.update(range(max(top - y, 0),
+                                  min(bottom - y, self._height)))
+        self._draw_rows(x, y, sorted(rows), window)
+        self._mark_drawn(zero_x, zero_y)
 
 
 class Border(Component):
@@ -55,6 +189,15 @@ class Border(Component):
         self._width = w
         self._height = h
 
+    def bounds(self, zero_x=0, zero_y=0):
+        # The rectangle includes both its top left and bottom right corners.
+        x, y = self._origin(zero_x, zero_y)
+        return x, y, x + self._width + 1, y + self._height + 1
+
     def _render(self, x, y, window):
-        rectangle(window.curses_window,
-                  y, x, y + self._height, self._x + self._width)
+        inner = '\u2500' * (self._width - 1)
+        window.add_string(x, y, '\u250c%s\u2510' % inner)
+        for y_offset in range(y + 1, y + self._height):
+            window.add_char(x, y_offset, '\u2502')
+            window.add_char(x + self._width, y_offset, '\u2502')
+        window.add_string(x, y + self._height, '\u2514%s\u2518' % inner)
@@ -1,22 +1,125 @@
 import curses
 import logging
+from collections import OrderedDict
 
 
-_COLOR_UID = 1
-
 BLACK = curses.COLOR_BLACK
+RED = curses.COLOR_RED
+GREEN = curses.COLOR_GREEN
+YELLOW = curses.COLOR_YELLOW
+BLUE = curses.COLOR_BLUE
+MAGENTA = curses.COLOR_MAGENTA
+CYAN = curses.COLOR_CYAN
 WHITE = curses.COLOR_WHITE
 
+# Used until curses is started and reports how many pairs it has.
+DEFAULT_COLOR_PAIRS = 256
+
+
+class ColorPairs(object):
+    """Hand out curses color pair numbers, one per pair of colors.
+
+    Every :class:`Color` with the same foreground and background shares a
+    pair number, and counts as a reference to it. Pairs nothing refers to
+    keep their number so they can be picked up again cheaply. They are
+    only reused, least recently used first, once every pair the terminal
+    has is taken.
+
+    Windows call ``curses.init_pair`` themselves the first time they draw
+    with a pair, so colors can be made before curses is started.
+    :attr:`generation` changes whenever a number is reused for other
+    colors, which tells windows to set their pairs up again.
+
+    :type limit: int
+    :param limit: The number of pairs the terminal has. By default this is
+        ``curses.COLOR_PAIRS``, which is known once curses is started.
+    """
+    def __init__(self, limit=None):
+        self._limit = limit
+        self._numbers = {}
+        self._colors = {}
+        self._refs = {}
+        self._unused = OrderedDict()
+        self._next = 1
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._colors)
+
+    @property
+    def limit(self):
+        if self._limit is not None:
+            return self._limit
+        return getattr(curses, 'COLOR_PAIRS', DEFAULT_COLOR_PAIRS)
+
+    def colors(self, number):
+        """Get the ``(fg, bg)`` colors of a pair number."""
+        return self._colors[number]
+
+    def acquire(self, fg, bg):
+        """Get the pair number for a pair of colors and refer to it.
+
+        :returns: The pair number, or 0, the terminal's default colors, if
+            every pair is in use.
+        """
+        number = self._numbers.get((fg, bg))
+        if number is None:
+            number = self._allocate(fg, bg)
+            if not number:
+                return 0
+        else:
+            self._unused.pop(number, None)
+        self._refs[number] = self._refs.get(number, 0) + 1
+        return number
+
+    def _allocate(self, fg, bg):
+        if self._next < self.limit:
+            number = self._next
+            self._next += 1
+        elif self._unused:
+            number, _ = self._unused.popitem(last=False)
+            del self._numbers[self._colors[number]]
+            self.generation += 1
+        else:
+            logging.warning('Out of color pairs, drawing %d on %d in the '
+                            'default colors', fg, bg)
+            return 0
+        self._numbers[(fg, bg)] = number
+        self._colors[number] = (fg, bg)
+        return number
+
+    def release(self, number):
+        """Drop a reference to a pair number taken with :meth:`acquire`."""
+        if not number:
+            return
+        refs = self._refs[number] - 1
+        if refs:
+            self._refs[number] = refs
+        else:
+            del self._refs[number]
+            self._unused[number] = None
+
+
+PAIRS = ColorPairs()
+
 
 class Color(object):
-    def __init__(self, fg=WHITE, bg=BLACK, curses_lib=curses):
-        global _COLOR_UID
-        self.COLOR_UID = _COLOR_UID
-        _COLOR_UID += 1
+    """A foreground and background color to draw with.
+
+    ``COLOR_UID`` is the curses color pair number for the colors, which is
+    shared with every other color that looks the same.
+    """
+    def __init__(self, fg=WHITE, bg=BLACK):
         self._fg = fg
         self._bg = bg
-        self._curses = curses_lib
-        self.flush()
+        self._pairs = PAIRS
+        self.COLOR_UID = self._pairs.acquire(fg, bg)
+
+    def __del__(self):
+        # Colors that fail to initialise have no pair.
+        number = getattr(self, 'COLOR_UID', 0)
+        if number:
+            self._pairs.release(number)
 
     def change_color(self, fg=None, bg=None, flush=True):
         self._fg = fg if fg is not None else self._fg
@@ -25,9 +128,10 @@ class Color(object):
             self.flush()
 
     def flush(self):
-        logging.error('Assigning %d, %d, %d',
-                      self.COLOR_UID, self._fg, self._bg)
-        self._curses.init_pair(self.COLOR_UID, self._fg, self._bg)
+        """Switch to the color pair for the current colors."""
+        number = self._pairs.acquire(self._fg, self._bg)
+        self._pairs.release(self.COLOR_UID)
+        self.COLOR_UID = number
 
 
 LIGHT_GRAY = 237
@@ -1,9 +1,47 @@
+import signal
 import asyncio
 
+from splutter.keys import KEY_RESIZE
 from splutter.window import EventBus
+from splutter.spatial import GridIndex
+from splutter.scheduler import FrameScheduler
 from splutter.exceptions import CloseSplutterWindow
 
 
+def _intersects(a, b):
+    """Check if two ``(left, top, right, bottom)`` rectangles intersect."""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _intersection(a, b):
+    """Get the overlap of two rectangles, or None if they do not overlap."""
+    if not _intersects(a, b):
+        return None
+    return max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])
+
+
+def _subtract(rect, cut):
+    """Get the parts of a rectangle outside of another one.
+
+    :returns: Up to four rectangles that together cover what is left.
+    """
+    if not _intersects(rect, cut):
+        return [rect]
+    left, top, right, bottom = rect
+    pieces = []
+    if top < cut[1]:
+        pieces.append((left, top, right, cut[1]))
+        top = cut[1]
+    if cut[3] < bottom:
+        pieces.append((left, cut[3], right, bottom))
+        bottom = cut[3]
+    if left < cut[0]:
+        pieces.append((left, top, cut[0], bottom))
+    if cut[2] < right:
+        pieces.append((cut[2], top, right, bottom))
+    return pieces
+
+
 class Component(object):
     BIND_TOP_LEFT = 1
     BIND_MIDDLE = 2
@@ -14,6 +52,11 @@ class Component(object):
         self._width = 0
         self._height = 0
         self._bind_to = bind_to
+        self._parent = None
+        self._dirty = True
+        self._rendered_bounds = None
+        self._z = 0
+        self._opaque = False
 
     @property
     def x(self):
@@ -22,6 +65,7 @@ class Component(object):
     @x.setter
     def x(self, new_x):
         self._x = new_x
+        self.invalidate()
 
     @property
     def y(self):
@@ -30,6 +74,7 @@ class Component(object):
     @y.setter
     def y(self, new_y):
         self._y = new_y
+        self.invalidate()
 
     @property
     def width(self):
@@ -48,23 +93,120 @@ class Component(object):
         return self._x + self.width
 
     def overlaps(self, other):
-        """Check if this component and the other one overlap."""
-        pass
+        """Check if this component and the other one overlap.
+
+        Both components are assumed to be in the same view. Components
+        with no width or height never overlap anything.
+        """
+        return _intersects(self.bounds(), other.bounds())
+
+    @property
+    def z(self):
+        """The layer of the component, higher layers are drawn on top.
+
+        Components in the same layer are drawn in the order they were added
+        to their view.
+        """
+        return self._z
+
+    @z.setter
+    def z(self, z):
+        self._z = z
+        if self._parent is not None:
+            self._parent._order_changed()
+        self.invalidate()
+
+    @property
+    def opaque(self):
+        """Whether the component hides everything beneath it.
+
+        The area of an opaque component is erased before it is drawn, and
+        components it completely covers are not drawn at all.
+        """
+        return self._opaque
+
+    @opaque.setter
+    def opaque(self, opaque):
+        self._opaque = opaque
+        self.invalidate()
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def invalidate(self):
+        """Mark this component as needing to be redrawn.
+
+        Anything that changes what a component draws, or where it draws it,
+        should call this so the next frame repaints it.
+        """
+        self._dirty = True
+        if self._parent is not None:
+            self._parent.child_invalidated(self)
+
+    def _origin(self, zero_x, zero_y):
+        if self._bind_to == self.BIND_MIDDLE:
+            return (zero_x + self.x - self.width // 2,
+                    zero_y + self.y - self.height // 2)
+        return zero_x + self.x, zero_y + self.y
+
+    def bounds(self, zero_x=0, zero_y=0):
+        """Get the ``(left, top, right, bottom)`` rectangle drawn into.
+
+        The right and bottom edges are exclusive.
+        """
+        x, y = self._origin(zero_x, zero_y)
+        return x, y, x + self.width, y + self.height
+
+    def damage(self, zero_x=0, zero_y=0):
+        """Get the rectangles that must be repainted on the next frame.
+
+        This is where the component is now plus where it was last drawn.
+        """
+        if not self._dirty:
+            return []
+        rects = [self.bounds(zero_x, zero_y)]
+        previous = self._rendered_bounds
+        if previous is not None and previous != rects[0]:
+            rects.append(previous)
+        return rects
 
     def _render(self, x, y, window):
         raise NotImplementedError('_render')
 
     def render(self, zero_x, zero_y, window):
-        if self._bind_to == self.BIND_TOP_LEFT:
-            self._render(zero_x + self.x, zero_y + self.y, window)
-        elif self._bind_to == self.BIND_MIDDLE:
-            x = self.x - self.width // 2
-            y = self.y - self.height // 2
-            self._render(zero_x + x, zero_y + y, window)
+        x, y = self._origin(zero_x, zero_y)
+        self._render(x, y, window)
+        self._mark_drawn(zero_x, zero_y)
+
+    def render_damaged(self, zero_x, zero_y, window, damage):
+        """Render a dirty component when only part of the window changed.
+
+        ``damage`` lists the rectangles of the window that were erased or
+        drawn over so far this frame, which includes this component's own
+        :meth:`damage`. Components that report smaller damage than their
+        bounds can redraw just the parts these cover. By default the whole
+        component is rendered.
+        """
+        self.render(zero_x, zero_y, window)
+
+    def _mark_drawn(self, zero_x, zero_y):
+        """Record that the component is up to date on the screen."""
+        self._rendered_bounds = self.bounds(zero_x, zero_y)
+        self._dirty = False
 
     def move(self, x=None, y=None):
         self._x = x if x is not None else self._x
         self._y = y if y is not None else self._y
+        self.invalidate()
+
+    def handle_event(self, event, window):
+        """Handle an event sent to this component.
+
+        Components get key events while they are active, and mouse events
+        when they are under the pointer. This does nothing by default.
+        """
+        pass
 
 
 class View(Component):
@@ -72,6 +214,12 @@ class View(Component):
         super().__init__(x, y, bind_to=bind_to)
         self._components = {}
         self._active_component = None
+        self._removed = []
+        # Where each component is, relative to the view, for hit testing.
+        self._index = GridIndex()
+        self._ranks = {}
+        self._next_rank = 0
+        self._order = None
 
     @property
     def active_component(self):
@@ -80,14 +228,24 @@ class View(Component):
     @active_component.setter
     def active_component(self, new_active_component):
         self._active_component = new_active_component
+        self._focus_changed()
+
+    def _focus_changed(self):
+        """Called when the focus in this view or a nested one changes."""
+        if self._parent is not None:
+            self._parent._focus_changed()
 
     def get_active_component_stack(self, stack):
-        if isinstance(self.active_component, View):
-            stack.append(self)
-            stack.extend(self.active_component.get_active_component_stack)
+        """Append this view and its active components, outermost first.
+
+        Nested views add their own active components after themselves.
+        """
+        stack.append(self)
+        active = self.active_component
+        if isinstance(active, View):
+            active.get_active_component_stack(stack)
         else:
-            stack.append(self)
-            stack.append(self.active_component)
+            stack.append(active)
         return stack
 
     def size_to_components(self):
@@ -99,11 +257,40 @@ class View(Component):
                 self._height = max(self._height, component.bottom)
 
     def add_component(self, name, component):
+        previous = self._components.get(name)
+        rank = self._ranks.get(previous)
+        self._detach(previous)
         self._components[name] = component
+        if component is not None:
+            if rank is None:
+                rank = self._next_rank
+                self._next_rank += 1
+            # A component replacing another keeps its place in the order.
+            self._ranks[component] = rank
+            self._order = None
+            component._parent = self
+            component.invalidate()
+        if name == self._active_component:
+            self._focus_changed()
 
     def remove_component(self, name):
         if name in self._components:
-            del self._components[name]
+            self._detach(self._components.pop(name))
+            self.child_invalidated(None)
+            if name == self._active_component:
+                self._focus_changed()
+
+    def _detach(self, component):
+        """Forget a component, remembering where it was last drawn."""
+        if component is None:
+            return
+        self._index.remove(component)
+        self._ranks.pop(component, None)
+        self._order = None
+        if component._rendered_bounds is not None:
+            self._removed.append(component._rendered_bounds)
+            component._rendered_bounds = None
+        component._parent = None
 
     def get_component(self, name):
         return self._components[name]
@@ -112,10 +299,216 @@ class View(Component):
     def components(self):
         return self._components
 
-    def render(self, window):
+    def invalidate(self):
         for component in self._components.values():
-            if component:
-                component.render(self._x, self._y, window)
+            if component is not None:
+                component._dirty = True
+        super().invalidate()
+
+    def child_invalidated(self, component):
+        """Called when one of this view's components is invalidated."""
+        if component is not None and component._parent is self:
+            self._index.insert(component, component.bounds())
+        if self._parent is not None:
+            self._parent.child_invalidated(self)
+
+    def _order_changed(self):
+        self._order = None
+
+    def _draw_key(self, component):
+        return component.z, self._ranks[component]
+
+    def _drawing_order(self):
+        """Get the components bottom first, in the order they are drawn."""
+        if self._order is None:
+            self._order = sorted(self._ranks, key=self._draw_key)
+        return self._order
+
+    def query_point(self, x, y):
+        """Get the components drawn at a point of this view.
+
+        The point is relative to the view, like component positions.
+
+        :returns: The components, bottom first in drawing order.
+        """
+        return sorted(self._index.query_point(x, y),
+                      key=self._draw_key)
+
+    def query_rect(self, rect):
+        """Get the components that overlap a rectangle of this view.
+
+        :type rect: tuple
+        :param rect: A ``(left, top, right, bottom)`` rectangle relative to
+            the view, with exclusive right and bottom edges.
+
+        :returns: The components, bottom first in drawing order.
+        """
+        return sorted(self._index.query_rect(rect),
+                      key=self._draw_key)
+
+    def bounds(self, zero_x=0, zero_y=0):
+        """Get the rectangle the view covers.
+
+        A view that was not given a size covers all of its components.
+        """
+        if self._width or self._height:
+            return super().bounds(zero_x, zero_y)
+        x, y = self._origin(zero_x, zero_y)
+        rects = [component.bounds(x, y) for component in self._ranks]
+        rects = [rect for rect in rects
+                 if rect[0] < rect[2] and rect[1] < rect[3]]
+        if not rects:
+            return x, y, x, y
+        return (min(rect[0] for rect in rects),
+                min(rect[1] for rect in rects),
+                max(rect[2] for rect in rects),
+                max(rect[3] for rect in rects))
+
+    def component_at(self, x, y):
+        """Get the topmost component drawn at a point of the window.
+
+        Components in higher layers, or added later to the same layer, are
+        drawn on top of others.
+
+        :returns: None if there is no component at the point.
+        """
+        origin_x, origin_y = self._origin(0, 0)
+        return self._component_at(x - origin_x, y - origin_y)
+
+    def _component_at(self, x, y):
+        hits = self._index.query_point(x, y)
+        if not hits:
+            return None
+        return max(hits, key=self._draw_key)
+
+    def get_component_stack_at(self, x, y, stack):
+        """Like :meth:`get_active_component_stack`, but for a point.
+
+        This is the path mouse events at the point of the window are sent
+        along.
+        """
+        origin_x, origin_y = self._origin(0, 0)
+        return self._component_stack_at(x - origin_x, y - origin_y, stack)
+
+    def _component_stack_at(self, x, y, stack):
+        stack.append(self)
+        component = self._component_at(x, y)
+        if isinstance(component, View):
+            origin_x, origin_y = component._origin(0, 0)
+            component._component_stack_at(x - origin_x, y - origin_y, stack)
+        elif component is not None:
+            stack.append(component)
+        return stack
+
+    def damage(self, zero_x=0, zero_y=0):
+        x, y = self._origin(zero_x, zero_y)
+        rects = list(self._removed)
+        for component in self._ranks:
+            rects.extend(component.damage(x, y))
+        return rects
+
+    def _occluded(self, component, rect, x, y):
+        """Check if opaque components drawn later cover a rectangle.
+
+        The rectangle is in window coordinates and ``(x, y)`` is where the
+        view's origin is in the window.
+        """
+        key = self._draw_key(component)
+        local = rect[0] - x, rect[1] - y, rect[2] - x, rect[3] - y
+        remaining = [local]
+        for other in self._index.query_rect(local):
+            if (other is component or not other.opaque or
+                    self._draw_key(other) < key):
+                continue
+            cut = other.bounds()
+            remaining = [piece for part in remaining
+                         for piece in _subtract(part, cut)]
+            if not remaining:
+                return True
+        return False
+
+    def render(self, window, damage=None, profiler=None):
+        """Render the components in this view.
+
+        Components are drawn bottom layer first, each clipped to its own
+        bounds. Components outside of the window, or hidden behind opaque
+        components, are skipped. Nested views are drawn in place, relative
+        to this one.
+
+        :type damage: list
+        :param damage: Rectangles of the window that were erased for this
+            frame. Only components that are dirty or intersect one of them
+            are repainted, and the rectangles of repainted components are
+            appended so that components drawn on top of them are repainted
+            too. ``None`` repaints everything.
+
+        :type profiler: :class:`splutter.profiler.FrameProfiler`
+        :param profiler: Records how long each component takes to render,
+            by name, if given.
+        """
+        x, y = self._origin(0, 0)
+        self._render_components(x, y, window, damage, profiler)
+        self._dirty = False
+
+    def _render(self, x, y, window):
+        self._render_components(x, y, window, None)
+
+    def _component_names(self):
+        return dict((component, name)
+                    for name, component in self._components.items()
+                    if component is not None)
+
+    def _render_components(self, x, y, window, damage, profiler=None,
+                           prefix=''):
+        cols, rows = window.size
+        screen = (0, 0, cols, rows)
+        if profiler is not None:
+            names = self._component_names()
+        for component in self._drawing_order():
+            if isinstance(component, View):
+                origin_x, origin_y = component._origin(x, y)
+                nested = None
+                if profiler is not None:
+                    nested = '%s%s/' % (prefix, names[component])
+                component._render_components(origin_x, origin_y, window,
+                                              damage, profiler, nested)
+                component._mark_drawn(x, y)
+                self._index.insert(component, component.bounds())
+                continue
+            visible = _intersection(component.bounds(x, y), screen)
+            if visible is None:
+                component._mark_drawn(x, y)
+                continue
+            repaint = damage is not None and not component.dirty
+            # Most components are clean, so check damage before the more
+            # costly occlusion query.
+            if repaint and not any(_intersects(visible, rect)
+                                   for rect in damage):
+                continue
+            if self._occluded(component, visible, x, y):
+                component._mark_drawn(x, y)
+                continue
+            if repaint:
+                damage.append(visible)
+            if profiler is not None:
+                start = profiler.clock()
+            window.clip = visible
+            try:
+                if component.opaque:
+                    window.erase_rect(visible[0], visible[1],
+                                      visible[2] - visible[0],
+                                      visible[3] - visible[1])
+                if damage is None or repaint:
+                    component.render(x, y, window)
+                else:
+                    component.render_damaged(x, y, window, damage)
+            finally:
+                window.clip = None
+            if profiler is not None:
+                profiler.component(prefix + names[component], start)
+            # Components can change size while drawing.
+            self._index.insert(component, component.bounds())
+        self._removed = []
 
     def has_focus(self, x, y, window):
         if self.active_component is not None:
@@ -137,12 +530,23 @@ class View(Component):
 
 
 class Controller(object):
-    def __init__(self, bus=None):
+    LOOP_POLL = 1
+    LOOP_EVENT = 2
+
+    def __init__(self, bus=None, fps=None):
         self._views = {}
+        self._view_order = None
         if bus is None:
             bus = EventBus(self)
         self._event_bus = bus
         self._active_view = None
+        self._scheduler = FrameScheduler(fps)
+        self._full_redraw = True
+        self._damage = None
+        self._wakeup = None
+        self._callbacks = []
+        self._focus_chain = None
+        self._profiler = None
 
     @property
     def active_view(self):
@@ -151,6 +555,64 @@ class Controller(object):
     @active_view.setter
     def active_view(self, new_active_view):
         self._active_view = new_active_view
+        self._focus_changed()
+
+    @property
+    def focus_chain(self):
+        """The views and component that key events are sent to.
+
+        This is the active view followed by its active component, and the
+        active components of any views nested inside it, outermost first.
+        It is worked out again only after the focus changes.
+
+        :rtype: tuple
+        """
+        if self._focus_chain is None:
+            view = self.active_view
+            stack = [] if view is None else view.get_active_component_stack([])
+            self._focus_chain = tuple(c for c in stack if c is not None)
+        return self._focus_chain
+
+    def _focus_changed(self):
+        self._focus_chain = None
+
+    def _order_changed(self):
+        self._view_order = None
+        self.invalidate()
+
+    def _drawing_order(self):
+        """Get the views bottom first, in the order they are drawn.
+
+        Views are drawn by layer, and in the order they were added within a
+        layer, like the components of a view.
+        """
+        if self._view_order is None:
+            ranks = dict((view, rank)
+                         for rank, view in enumerate(self._views.values()))
+            self._view_order = sorted(
+                ranks, key=lambda view: (view.z, ranks[view]))
+        return self._view_order
+
+    @property
+    def fps(self):
+        """The maximum number of frames drawn per second, None for no cap."""
+        return self._scheduler.fps
+
+    @fps.setter
+    def fps(self, fps):
+        self._scheduler.fps = fps
+
+    @property
+    def profiler(self):
+        """The :class:`splutter.profiler.FrameProfiler` timing each frame.
+
+        None, the default, turns profiling off.
+        """
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, profiler):
+        self._profiler = profiler
 
     @property
     def active_view_name(self):
@@ -158,15 +620,61 @@ class Controller(object):
 
     def add_view(self, name, view):
         self._views[name] = view
+        self._view_order = None
+        view._parent = self
+        self.invalidate()
         if self._active_view is None:
-            self._active_view = view
+            self._active_view = name
+        self._focus_changed()
 
     def get_view(self, name):
         return self._views.get(name)
 
+    def invalidate(self):
+        """Request that the whole window is erased and redrawn.
+
+        When attached with :attr:`LOOP_EVENT` this wakes up the main loop so
+        a new frame is rendered even if no input has arrived.
+        """
+        self._full_redraw = True
+        self._request_frame()
+
+    def child_invalidated(self, view):
+        """Called when a component inside one of the views is invalidated.
+
+        Only the invalidated components are repainted on the next frame.
+        """
+        self._request_frame()
+
+    def _request_frame(self):
+        self._scheduler.request()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def call_later(self, delay, callback, *args):
+        """Run ``callback(*args)`` from the main loop after ``delay`` seconds.
+
+        The callback runs inside :meth:`attach_to_window`, so it may raise
+        :class:`splutter.exceptions.CloseSplutterWindow`. The window is
+        redrawn after it runs.
+
+        :returns: An :class:`asyncio.TimerHandle` that can be cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        return loop.call_later(delay, self._queue_callback, callback, args)
+
+    def _queue_callback(self, callback, args):
+        self._callbacks.append((callback, args))
+        self._request_frame()
+
+    def _run_callbacks(self):
+        callbacks, self._callbacks = self._callbacks, []
+        for callback, args in callbacks:
+            callback(*args)
+
     def render(self, window):
-        for _, view in self._views.items():
-            view.render(window)
+        for view in self._drawing_order():
+            view.render(window, self._damage, self._profiler)
         if self.active_view is not None:
             self.active_view.has_focus(0, 0, window)
 
@@ -176,6 +684,9 @@ class Controller(object):
         An event first trickles down to the bottom level view, and then
         bubbles back up the view stack.
         """
+        if event == KEY_RESIZE:
+            # The window's buffers are reallocated on the next full redraw.
+            self.invalidate()
         if self.active_view is None:
             return
         self._event_bus.propagate_event(event, self.active_view, window)
@@ -193,7 +704,8 @@ class Controller(object):
         """
         raise NotImplementedError('handle_key')
 
-    async def attach_to_window(self, window):
+    async def attach_to_window(self, window, mode=LOOP_POLL,
+                               profiler=None):
         """Attach this controller to a window.
 
         Once a controller is attached to a window it will block. Events in the
@@ -201,23 +713,155 @@ class Controller(object):
         close the window raise a
         :class:`splutter.exceptions.CloseSplutterWindow` exception.
 
+        With :attr:`LOOP_POLL` the window is polled and redrawn on every turn
+        of the event loop. With :attr:`LOOP_EVENT` the window's input file
+        descriptor is registered with the event loop and the controller only
+        wakes up on input, a :meth:`call_later` timer or :meth:`invalidate`,
+        so an idle window uses no CPU.
+
+        In both modes no more than :attr:`fps` frames are drawn per second,
+        and every invalidation between two frames is drawn by one frame.
+
         :type window: :class:`splutter.window.Window`
         :param window: The window class to attach this controller to.
+
+        :type mode: int
+        :param mode: Either :attr:`LOOP_POLL` or :attr:`LOOP_EVENT`.
+
+        :type profiler: :class:`splutter.profiler.FrameProfiler`
+        :param profiler: Record the timings of every frame, see
+            :attr:`profiler`.
         """
+        if profiler is not None:
+            self._profiler = profiler
         try:
-            while True:
-                self._poll(window)
-                window.erase()
-                self.render(window)
-                window.update_cursor()
-                window.refresh()
-                await asyncio.sleep(0)
+            if mode == self.LOOP_EVENT:
+                await self._run_event_loop(window)
+            else:
+                await self._run_poll_loop(window)
         except KeyboardInterrupt:
             window.close_reason = 'Ctrl-C'
         except CloseSplutterWindow as e:
             window.close_reason = str(e)
 
-    def _poll(self, window):
-        event = window.get_event()
-        if event is not None:
+    async def _run_poll_loop(self, window):
+        self._full_redraw = True
+        while True:
+            self._run_callbacks()
+            self._poll_all(window)
+            self._draw(window)
+            await asyncio.sleep(self._scheduler.next_frame_in())
+
+    async def _run_event_loop(self, window):
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        fd = window.fileno()
+        loop.add_reader(fd, self._wakeup.set)
+        resize_signal = self._add_resize_handler(loop, window)
+        timer = None
+        input_timer = None
+        try:
+            self._full_redraw = True
+            self._scheduler.request()
+            while True:
+                self._wakeup.clear()
+                self._run_callbacks()
+                if self._poll_all(window):
+                    self._scheduler.request()
+                if input_timer is not None:
+                    input_timer.cancel()
+                    input_timer = None
+                input_delay = window.input_timeout()
+                if input_delay is not None:
+                    # Input is held back waiting to see if an escape
+                    # sequence follows, poll again once it times out.
+                    input_timer = loop.call_later(input_delay,
+                                                  self._wakeup.set)
+                if self._scheduler.pending:
+                    if timer is not None:
+                        timer.cancel()
+                        timer = None
+                    delay = self._scheduler.next_frame_in()
+                    if delay <= 0:
+                        self._draw(window)
+                    else:
+                        # Too soon after the last frame, so wait and draw
+                        # everything requested until then in one frame. The
+                        # timer is set again on every wake up, in case it
+                        # fired a little early.
+                        timer = loop.call_later(delay, self._wakeup.set)
+                await self._wakeup.wait()
+        finally:
+            for handle in (timer, input_timer):
+                if handle is not None:
+                    handle.cancel()
+            loop.remove_reader(fd)
+            if resize_signal is not None:
+                loop.remove_signal_handler(resize_signal)
+            self._wakeup = None
+
+    def _add_resize_handler(self, loop, window):
+        """Redraw when the terminal is resized, even while idle.
+
+        Curses only reports a resize once it next reads input, which an
+        idle event loop does not do until a key is pressed.
+
+        :returns: The signal handled, or None if it cannot be.
+        """
+        resize_signal = getattr(signal, 'SIGWINCH', None)
+        if resize_signal is None:
+            return None
+
+        def _resized():
+            window.terminal_resized()
+            self.invalidate()
+
+        try:
+            loop.add_signal_handler(resize_signal, _resized)
+        except RuntimeError:
+            # Signals can only be handled in the main thread.
+            return None
+        return resize_signal
+
+    def _draw(self, window):
+        """Draw a frame, only repainting the damaged parts of the window."""
+        # Requests made while drawing, such as by a component updated when
+        # the frame is recorded, are left pending for the next frame.
+        self._scheduler.frame_drawn()
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.begin('erase')
+        if self._full_redraw:
+            self._full_redraw = False
+            self._damage = None
+            window.erase()
+        else:
+            self._damage = []
+            for view in self._views.values():
+                self._damage.extend(view.damage())
+            for left, top, right, bottom in self._damage:
+                window.erase_rect(left, top, right - left, bottom - top)
+        if profiler is not None:
+            profiler.begin('render')
+        try:
+            self.render(window)
+        finally:
+            self._damage = None
+        if profiler is not None:
+            profiler.begin('refresh')
+        window.refresh()
+        if profiler is not None:
+            profiler.end_frame()
+
+    def _poll_all(self, window):
+        """Handle every pending event, returning True if there were any."""
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.begin('poll')
+        events = window.get_events()
+        for event in events:
             self._propagate_event(event, window)
+        window.release_events(events)
+        if profiler is not None:
+            profiler.end_phase()
+        return bool(events)
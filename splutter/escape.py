@@ -0,0 +1,281 @@
+import time
+
+from splutter import keys
+from splutter.events import WindowEvent
+
+
+_GROUND = 0
+_ESCAPE = 1
+_CSI = 2
+_SS3 = 3
+_PASTE = 4
+
+_PASTE_START = '200'
+_PASTE_END = [ord(c) for c in '\x1b[201~']
+
+# Final bytes of CSI and SS3 sequences that need no parameters.
+_FINAL_KEYS = {
+    'A': keys.KEY_UP,
+    'B': keys.KEY_DOWN,
+    'C': keys.KEY_RIGHT,
+    'D': keys.KEY_LEFT,
+    'H': keys.KEY_HOME,
+    'F': keys.KEY_END,
+    'Z': keys.KEY_BACKTAB,
+    'P': keys.KEY_F(1),
+    'Q': keys.KEY_F(2),
+    'R': keys.KEY_F(3),
+    'S': keys.KEY_F(4),
+}
+
+# Keys sent as ``CSI <number> ~``.
+_TILDE_KEYS = {
+    1: keys.KEY_HOME,
+    2: keys.KEY_INSERT,
+    3: keys.KEY_DELETE_CHAR,
+    4: keys.KEY_END,
+    5: keys.KEY_PAGE_UP,
+    6: keys.KEY_PAGE_DOWN,
+    7: keys.KEY_HOME,
+    8: keys.KEY_END,
+    11: keys.KEY_F(1),
+    12: keys.KEY_F(2),
+    13: keys.KEY_F(3),
+    14: keys.KEY_F(4),
+    15: keys.KEY_F(5),
+    17: keys.KEY_F(6),
+    18: keys.KEY_F(7),
+    19: keys.KEY_F(8),
+    20: keys.KEY_F(9),
+    21: keys.KEY_F(10),
+    23: keys.KEY_F(11),
+    24: keys.KEY_F(12),
+}
+
+# Bits of the xterm modifier parameter, which is sent plus one.
+_MODIFIER_ALT = 2
+
+
+class EscapeParser(object):
+    """Decode the codes read from curses into window events.
+
+    Codes are fed in one at a time and events come out as soon as the
+    sequence they belong to is complete, so nothing waits on a fixed
+    delay. Besides the keys curses decodes itself this understands:
+
+    * ``ESC`` followed by a key, which is that key with Alt held.
+    * CSI (``ESC [``) and SS3 (``ESC O``) function key sequences.
+    * Bracketed paste, ``ESC [200~`` text ``ESC [201~``, which becomes a
+      single :attr:`WindowEvent.PASTE_EVENT`.
+    * SGR mouse reports, ``ESC [<b;x;yM`` and ``ESC [<b;x;ym``.
+
+    The only ambiguous input is an ``ESC`` that may be the start of a
+    sequence whose remaining bytes have not arrived yet. If nothing
+    follows within ``timeout`` seconds :meth:`flush_expired` gives the
+    codes back as plain keys.
+
+    Events are taken from ``pool``, a :class:`splutter.events.EventPool`,
+    if one is given.
+    """
+    DEFAULT_TIMEOUT = 0.025
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, clock=time.monotonic,
+                 pool=None):
+        self._new_event = WindowEvent if pool is None else pool.acquire
+        self._timeout = timeout
+        self._clock = clock
+        self._state = _GROUND
+        self._codes = []
+        self._paste = []
+        self._escape_time = None
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, timeout):
+        self._timeout = timeout
+
+    @property
+    def pending(self):
+        """True if an incomplete escape sequence is waiting for input."""
+        return self._state in (_ESCAPE, _CSI, _SS3)
+
+    def pending_timeout(self):
+        """Seconds until an incomplete sequence is given up on.
+
+        :returns: None if no sequence is waiting.
+        """
+        if not self.pending:
+            return None
+        elapsed = self._clock() - self._escape_time
+        return max(self._timeout - elapsed, 0)
+
+    def feed(self, code):
+        """Parse one code read from curses.
+
+        :returns: A list of the events completed by the code.
+        """
+        if self._state == _PASTE:
+            return self._feed_paste(code)
+        if self._state == _GROUND:
+            if code == keys.KEY_ESC:
+                self._start_escape()
+                return []
+            if code == keys.KEY_MOUSE:
+                # Curses recognised the start of a mouse report from the
+                # terminal description, the rest of it follows as is.
+                self._start_escape()
+                self._state = _CSI
+                self._codes = [ord('['), ord('<')]
+                return []
+            return [self._new_event(code, WindowEvent.KEY_EVENT)]
+        if self._state == _ESCAPE:
+            return self._feed_escape(code)
+        if code == keys.KEY_ESC:
+            # A new sequence starts before this one ended, drop this one.
+            self._start_escape()
+            return []
+        self._codes.append(code)
+        if self._state == _SS3:
+            return self._finish_ss3(code)
+        return self._feed_csi(code)
+
+    def flush_expired(self):
+        """Give up on an incomplete sequence once it has timed out.
+
+        :returns: The events for the codes that were held back.
+        """
+        if self.pending_timeout() == 0:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Give up on an incomplete sequence right away.
+
+        A lone ``ESC`` becomes the Escape key. Otherwise the code after it
+        is reported with Alt held and the rest as plain keys.
+        """
+        if not self.pending:
+            return []
+        codes = self._codes
+        self._reset()
+        if not codes:
+            return [self._new_event(keys.KEY_ESC, WindowEvent.KEY_EVENT)]
+        events = [self._new_event(codes[0], WindowEvent.KEY_EVENT,
+                              modifier=keys.KEY_ALT)]
+        for code in codes[1:]:
+            events.extend(self.feed(code))
+        return events
+
+    def _start_escape(self):
+        self._state = _ESCAPE
+        self._codes = []
+        self._escape_time = self._clock()
+
+    def _reset(self):
+        self._state = _GROUND
+        self._codes = []
+        self._escape_time = None
+
+    def _feed_escape(self, code):
+        if code == keys.KEY_ESC:
+            # Escape pressed twice, the second may start a sequence.
+            self._start_escape()
+            return [self._new_event(keys.KEY_ESC, WindowEvent.KEY_EVENT)]
+        if code == ord('['):
+            self._state = _CSI
+            self._codes.append(code)
+            return []
+        if code == ord('O'):
+            self._state = _SS3
+            self._codes.append(code)
+            return []
+        self._reset()
+        return [self._new_event(code, WindowEvent.KEY_EVENT,
+                            modifier=keys.KEY_ALT)]
+
+    def _finish_ss3(self, code):
+        self._reset()
+        key = _FINAL_KEYS.get(chr(code)) if 0 <= code < 0x80 else None
+        if key is None:
+            return []
+        return [self._new_event(key, WindowEvent.KEY_EVENT)]
+
+    def _feed_csi(self, code):
+        if 0x20 <= code < 0x40:
+            # Parameter or intermediate byte, the sequence goes on.
+            return []
+        sequence = ''.join(chr(c) for c in self._codes[1:])
+        self._reset()
+        if not 0x40 <= code < 0x7f:
+            # Not a sequence after all, drop it.
+            return []
+        params, final = sequence[:-1], sequence[-1]
+        if params.startswith('<') and final in 'Mm':
+            return self._mouse_event(params[1:], final)
+        if final == '~' and params == _PASTE_START:
+            self._state = _PASTE
+            self._paste = []
+            return []
+        return self._key_event(params, final)
+
+    def _key_event(self, params, final):
+        numbers = _numbers(params)
+        if final == '~':
+            key = _TILDE_KEYS.get(numbers[0] if numbers else None)
+        else:
+            key = _FINAL_KEYS.get(final)
+        if key is None:
+            return []
+        modifier = None
+        if len(numbers) > 1 and (numbers[1] - 1) & _MODIFIER_ALT:
+            modifier = keys.KEY_ALT
+        return [self._new_event(key, WindowEvent.KEY_EVENT,
+                                modifier=modifier)]
+
+    def _mouse_event(self, params, final):
+        numbers = _numbers(params)
+        if len(numbers) != 3:
+            return []
+        flags, x, y = numbers
+        if flags & 64:
+            button = WindowEvent.BUTTON_WHEEL_UP + (flags & 1)
+        else:
+            button = flags & 3
+        if flags & 32:
+            action = WindowEvent.MOUSE_MOVE
+        elif final == 'm':
+            action = WindowEvent.MOUSE_RELEASE
+        else:
+            action = WindowEvent.MOUSE_PRESS
+        modifier = keys.KEY_ALT if flags & 8 else None
+        # Terminals count from one, windows from zero.
+        return [self._new_event(button, WindowEvent.MOUSE_EVENT, modifier,
+                                x=x - 1, y=y - 1, action=action)]
+
+    def _feed_paste(self, code):
+        paste = self._paste
+        paste.append(code)
+        if paste[-len(_PASTE_END):] != _PASTE_END:
+            return []
+        del paste[-len(_PASTE_END):]
+        self._paste = []
+        self._state = _GROUND
+        # Pasted text arrives as the bytes of its UTF-8 encoding, and
+        # terminals send line breaks in it as carriage returns.
+        text = bytes(c for c in paste if 0 <= c < 256).decode('utf-8',
+                                                              'replace')
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return [WindowEvent.paste(text)]
+
+
+def _numbers(params):
+    numbers = []
+    for param in params.split(';'):
+        try:
+            numbers.append(int(param))
+        except ValueError:
+            numbers.append(0)
+    return numbers
@@ -0,0 +1,151 @@
+import string
+
+
+_PRINTABLE_SET = set(string.printable)
+
+# The printable character for each key code that has one, else None.
+_PRINTABLE_CHARS = tuple(chr(code) if chr(code) in _PRINTABLE_SET else None
+                         for code in range(128))
+
+
+class WindowEvent(object):
+    __slots__ = ('_propagate', '_code', '_event_type', '_modifier', '_text',
+                 '_x', '_y', '_action')
+
+    KEY_EVENT = 1
+    MOUSE_EVENT = 2
+    PASTE_EVENT = 3
+
+    # Mouse event codes are the button.
+    BUTTON_LEFT = 0
+    BUTTON_MIDDLE = 1
+    BUTTON_RIGHT = 2
+    BUTTON_NONE = 3
+    BUTTON_WHEEL_UP = 4
+    BUTTON_WHEEL_DOWN = 5
+
+    MOUSE_PRESS = 1
+    MOUSE_RELEASE = 2
+    MOUSE_MOVE = 3
+
+    def __init__(self, code, event_type, modifier=None, text=None,
+                 x=None, y=None, action=None):
+        self._propagate = True
+        self._code = code
+        self._event_type = event_type
+        self._modifier = modifier
+        self._text = text
+        self._x = x
+        self._y = y
+        self._action = action
+
+    @classmethod
+    def paste(cls, text):
+        """Create an event for a block of pasted text."""
+        return cls(-1, cls.PASTE_EVENT, text=text)
+
+    @classmethod
+    def mouse(cls, button, x, y, action, modifier=None):
+        """Create an event for a mouse button or movement at a cell."""
+        return cls(button, cls.MOUSE_EVENT, modifier=modifier, x=x, y=y,
+                   action=action)
+
+    def stop_propagation(self):
+        self._propagate = False
+
+    @property
+    def should_handle(self):
+        return self._propagate
+
+    @property
+    def code(self):
+        return self._code
+
+    @property
+    def event_type(self):
+        return self._event_type
+
+    @property
+    def modifier(self):
+        return self._modifier
+
+    @property
+    def text(self):
+        """The text of a paste event."""
+        return self._text
+
+    @property
+    def x(self):
+        """The column of a mouse event."""
+        return self._x
+
+    @property
+    def y(self):
+        """The row of a mouse event."""
+        return self._y
+
+    @property
+    def action(self):
+        """Whether a mouse event is a press, release or move."""
+        return self._action
+
+    def __hash__(self):
+        return self._code
+
+    def __eq__(self, other):
+        if isinstance(other, WindowEvent):
+            return self._code == other._code
+        elif self._event_type != self.KEY_EVENT:
+            # Only keys compare equal to key codes and characters.
+            return False
+        elif isinstance(other, int):
+            return self._code == other
+        elif isinstance(other, str):
+            return chr(self._code).lower() == other.lower()
+        return False
+
+    def printable(self):
+        """Return a printable character if possible."""
+        code = self._code
+        if self._event_type != self.KEY_EVENT or not 0 <= code < 128:
+            return None
+        return _PRINTABLE_CHARS[code]
+
+    def __neq__(self, other):
+        return not self == other
+
+
+class EventPool(object):
+    """A free list of events to reuse instead of allocating new ones.
+
+    Events given back with :meth:`release` are handed out again by
+    :meth:`acquire`, so only release events nothing holds on to.
+
+    Pooling does not make input faster. On CPython creating a
+    :class:`WindowEvent` costs about as much as reusing one, and releasing
+    events adds work, so ``python -m benchmarks.events`` measures pooled
+    input as a little slower. A pool only cuts the number of objects
+    allocated while reading input.
+    """
+    DEFAULT_SIZE = 256
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self._size = size
+        self._free = []
+
+    def __len__(self):
+        return len(self._free)
+
+    def acquire(self, code, event_type, modifier=None, text=None,
+                x=None, y=None, action=None):
+        """Get an event, reusing a released one if there is one."""
+        if not self._free:
+            return WindowEvent(code, event_type, modifier, text, x, y, action)
+        event = self._free.pop()
+        event.__init__(code, event_type, modifier, text, x, y, action)
+        return event
+
+    def release(self, event):
+        """Give an event back to be reused."""
+        if len(self._free) < self._size:
+            self._free.append(event)
@@ -0,0 +1,232 @@
+"""An in-memory terminal for running splutter without a TTY.
+
+:class:`HeadlessCurses` stands in for the :mod:`curses` module and
+:class:`HeadlessScreen` for its screen window. Both can be passed to
+:func:`splutter.init` and :class:`splutter.window.Window`::
+
+    curses_lib = HeadlessCurses(width=80, height=24)
+    window = splutter.init(curses_lib)
+    curses_lib.screen.feed('hello\\n')
+
+The screen keeps the characters and attributes drawn on it in a grid, so
+tests can check what is shown, and counts the calls and bytes sent to it,
+so benchmarks can measure how much a frame costs to draw.
+"""
+import os
+import curses
+from collections import Counter
+from collections import deque
+
+
+class HeadlessScreen(object):
+    """A curses window that draws into memory and reads scripted input.
+
+    Input is queued with :meth:`feed`. The descriptor returned by
+    :meth:`fileno` is readable while input is waiting, so the screen works
+    with event loops that wait on it.
+
+    :type script: iterable
+    :param script: Chunks of input to deliver one per :meth:`refresh`,
+        as if a user answered each frame. See :meth:`feed` for the forms
+        a chunk can take.
+    """
+    def __init__(self, width=80, height=24, script=()):
+        self._width = width
+        self._height = height
+        self._input = deque()
+        self._script = deque(script)
+        self._read_fd = self._write_fd = None
+        self._cursor = (0, 0)
+        self.call_counts = Counter()
+        self.bytes_written = 0
+        self.erase()
+        self.call_counts.clear()
+
+    def close(self):
+        """Close the input descriptor, if one was made."""
+        if self._read_fd is not None:
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+            self._read_fd = self._write_fd = None
+
+    def fileno(self):
+        # The pipe is only made for callers that wait on it.
+        if self._read_fd is None:
+            self._read_fd, self._write_fd = os.pipe()
+            os.set_blocking(self._read_fd, False)
+            if self._input:
+                os.write(self._write_fd, b'\0')
+        return self._read_fd
+
+    @property
+    def frames(self):
+        """The number of times the screen was refreshed."""
+        return self.call_counts['refresh']
+
+    def resize(self, width, height):
+        """Change the size of the screen, blanking it."""
+        self._width = width
+        self._height = height
+        self.erase()
+
+    def feed(self, data):
+        """Queue input to be read by :meth:`getch`.
+
+        :param data: A str, which is read as its UTF-8 encoding like a
+            terminal sends it, bytes, or an iterable of key codes such as
+            :data:`splutter.keys.KEY_UP`.
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if not self._input and self._write_fd is not None:
+            os.write(self._write_fd, b'\0')
+        self._input.extend(data)
+
+    @property
+    def pending_input(self):
+        """The number of key codes waiting to be read."""
+        return len(self._input)
+
+    def getch(self):
+        self.call_counts['getch'] += 1
+        if not self._input:
+            return -1
+        code = self._input.popleft()
+        if not self._input:
+            self._drain()
+        return code
+
+    def _drain(self):
+        if self._read_fd is None:
+            return
+        try:
+            while os.read(self._read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def getmaxyx(self):
+        return self._height, self._width
+
+    def getyx(self):
+        return self._cursor
+
+    def _check(self, y, x):
+        if not (0 <= y < self._height and 0 <= x < self._width):
+            raise curses.error('position (%d, %d) is outside the screen' %
+                               (y, x))
+
+    def addstr(self, y, x, string, attr=0):
+        self._check(y, x)
+        self.call_counts['addstr'] += 1
+        self.bytes_written += len(string.encode('utf-8'))
+        string = string[:self._width - x]
+        end = x + len(string)
+        self.chars[y][x:end] = string
+        self.attrs[y][x:end] = [attr] * len(string)
+        self._cursor = (y, min(end, self._width - 1))
+
+    def addch(self, y, x, char, attr=0):
+        self._check(y, x)
+        self.call_counts['addch'] += 1
+        if isinstance(char, int):
+            char = chr(char)
+        self.bytes_written += len(char.encode('utf-8'))
+        self.chars[y][x] = char
+        self.attrs[y][x] = attr
+        self._cursor = (y, min(x + 1, self._width - 1))
+
+    def erase(self):
+        self.call_counts['erase'] += 1
+        self.chars = [[' '] * self._width for _ in range(self._height)]
+        self.attrs = [[0] * self._width for _ in range(self._height)]
+
+    def refresh(self):
+        self.call_counts['refresh'] += 1
+        if self._script and not self._input:
+            self.feed(self._script.popleft())
+
+    def move(self, y, x):
+        self._check(y, x)
+        self.call_counts['move'] += 1
+        self._cursor = (y, x)
+
+    def cursyncup(self):
+        pass
+
+    def keypad(self, flag):
+        pass
+
+    def nodelay(self, flag):
+        pass
+
+    def row(self, y):
+        """Get the text shown on a row."""
+        return ''.join(self.chars[y])
+
+    def lines(self):
+        """Get the text shown on every row, without trailing spaces."""
+        return [''.join(row).rstrip() for row in self.chars]
+
+    def attr_at(self, x, y):
+        """Get the attribute a cell was drawn with."""
+        return self.attrs[y][x]
+
+
+class HeadlessCurses(object):
+    """Stands in for the :mod:`curses` module, drawing to a
+    :class:`HeadlessScreen`.
+
+    The arguments are passed on to the screen :meth:`initscr` returns.
+    """
+    COLORS = 256
+    COLOR_PAIRS = 256
+
+    def __init__(self, width=80, height=24, script=()):
+        self.screen = HeadlessScreen(width, height, script)
+        self.pairs = {}
+        self.terminal_output = []
+
+    def initscr(self):
+        return self.screen
+
+    def noecho(self):
+        pass
+
+    def echo(self):
+        pass
+
+    def cbreak(self):
+        pass
+
+    def nocbreak(self):
+        pass
+
+    def start_color(self):
+        pass
+
+    def endwin(self):
+        pass
+
+    def write_terminal(self, sequence):
+        """Record escape sequences that would be written to the terminal."""
+        self.terminal_output.append(sequence)
+
+    def init_pair(self, pair_number, fg, bg):
+        if not 0 < pair_number < self.COLOR_PAIRS:
+            raise curses.error('pair %d is out of range' % pair_number)
+        self.screen.call_counts['init_pair'] += 1
+        self.pairs[pair_number] = (fg, bg)
+
+    def color_pair(self, pair_number):
+        return pair_number << 8
+
+    def pair_number(self, attr):
+        return (attr >> 8) & 0xff
+
+    def colors_at(self, x, y):
+        """Get the ``(fg, bg)`` colors a cell of the screen is shown in.
+
+        Cells drawn with pair 0 have no colors and give None.
+        """
+        return self.pairs.get(self.pair_number(self.screen.attr_at(x, y)))
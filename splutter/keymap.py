@@ -0,0 +1,208 @@
+from splutter import keys as key_codes
+from splutter.events import WindowEvent
+
+
+_ALT_PREFIX = 'alt+'
+
+# Names of the special keys for listing bindings.
+_KEY_NAMES = dict(
+    (code, name[len('KEY_'):].lower())
+    for name, code in vars(key_codes).items()
+    if name.startswith('KEY_') and isinstance(code, int) and
+    name != 'KEY_ALT')
+_KEY_NAMES.update((key_codes.KEY_F(n), 'f%d' % n) for n in range(1, 13))
+_KEY_CODES = dict((name, code) for code, name in _KEY_NAMES.items())
+
+
+def key(spec):
+    """Turn a key into the ``(code, modifier)`` pair keymaps look up.
+
+    :param spec: A key code such as :data:`splutter.keys.KEY_UP`, a single
+        character, a key name such as ``'up'``, any of those prefixed with
+        ``alt+``, a :class:`splutter.events.WindowEvent` or a pair.
+    """
+    if (isinstance(spec, tuple) and len(spec) == 2 and
+            isinstance(spec[0], int)):
+        return spec
+    if isinstance(spec, WindowEvent):
+        return spec.code, spec.modifier
+    if isinstance(spec, int):
+        return spec, None
+    if isinstance(spec, str):
+        if len(spec) == 1:
+            return ord(spec), None
+        if spec.startswith(_ALT_PREFIX):
+            code, _ = key(spec[len(_ALT_PREFIX):])
+            return code, key_codes.KEY_ALT
+        if spec in _KEY_CODES:
+            return _KEY_CODES[spec], None
+    raise ValueError('Not a key: %r' % (spec,))
+
+
+def key_name(pair):
+    """Get a readable name for a ``(code, modifier)`` pair."""
+    code, modifier = pair
+    name = _KEY_NAMES.get(code)
+    if name is None:
+        name = chr(code)
+    if modifier == key_codes.KEY_ALT:
+        name = _ALT_PREFIX + name
+    return name
+
+
+class Keymap(object):
+    """Bindings from keys and key sequences to actions.
+
+    Bindings are kept in a trie of dicts keyed by ``(code, modifier)``
+    pairs, so finding the action for a key is one dict lookup. A sequence
+    of keys, a chord, is bound by passing a tuple of keys.
+
+    Bindings can belong to a mode, such as an editor's insert mode. Keys
+    are looked up in the bindings of the current mode first and then in
+    the bindings that have no mode.
+
+    Actions are names. :meth:`dispatch` calls the method named
+    ``action_<name>`` on a target with the event and window, so a
+    component's bindings can be listed and changed while it runs.
+    """
+    # Returned by lookup for keys that start a sequence.
+    PREFIX = object()
+
+    def __init__(self, bindings=None):
+        self._modes = {}
+        self._pending = None
+        if bindings:
+            for keys, action in bindings.items():
+                self.bind(keys, action)
+
+    def copy(self):
+        """Get a keymap with the same bindings that can change separately."""
+        keymap = Keymap()
+        keymap._modes = dict((mode, _copy_node(node))
+                             for mode, node in self._modes.items())
+        return keymap
+
+    def _sequence(self, keys):
+        if not isinstance(keys, (tuple, list)):
+            keys = (keys,)
+        if not keys:
+            raise ValueError('Cannot bind an empty key sequence')
+        return tuple(key(k) for k in keys)
+
+    def bind(self, keys, action, mode=None):
+        """Bind a key, or a tuple of keys pressed in turn, to an action.
+
+        Any binding of the same keys is replaced. A sequence cannot start
+        with keys bound on their own, or the other way around.
+        """
+        sequence = self._sequence(keys)
+        node = self._modes.setdefault(mode, {})
+        for pair in sequence[:-1]:
+            child = node.setdefault(pair, {})
+            if not isinstance(child, dict):
+                raise ValueError('%s is already bound to %r' %
+                                 (key_name(pair), child))
+            node = child
+        if isinstance(node.get(sequence[-1]), dict):
+            raise ValueError('%s starts other bindings' %
+                             key_name(sequence[-1]))
+        node[sequence[-1]] = action
+        self._pending = None
+
+    def unbind(self, keys, mode=None):
+        """Remove a binding, doing nothing if the keys are not bound."""
+        sequence = self._sequence(keys)
+        path = [self._modes.get(mode, {})]
+        for pair in sequence[:-1]:
+            child = path[-1].get(pair)
+            if not isinstance(child, dict):
+                return
+            path.append(child)
+        if isinstance(path[-1].get(sequence[-1]), dict):
+            return
+        path[-1].pop(sequence[-1], None)
+        # Drop the parts of the trie that lead nowhere any more.
+        for node, pair in reversed(list(zip(path[:-1], sequence[:-1]))):
+            if node[pair]:
+                break
+            del node[pair]
+        self._pending = None
+
+    def bindings(self, mode=None):
+        """List the ``(sequence, action)`` bindings of a mode.
+
+        Sequences are tuples of ``(code, modifier)`` pairs, see
+        :func:`key_name` for showing them.
+        """
+        found = []
+        stack = [((), self._modes.get(mode, {}))]
+        while stack:
+            prefix, node = stack.pop()
+            for pair, target in node.items():
+                if isinstance(target, dict):
+                    stack.append((prefix + (pair,), target))
+                else:
+                    found.append((prefix + (pair,), target))
+        return found
+
+    def describe(self, mode=None):
+        """List the bindings of a mode as ``(keys, action)`` strings."""
+        return sorted((' '.join(key_name(pair) for pair in sequence), action)
+                      for sequence, action in self.bindings(mode))
+
+    @property
+    def pending(self):
+        """True if the keys so far are the start of a longer sequence."""
+        return self._pending is not None
+
+    def reset(self):
+        """Forget any partly entered sequence."""
+        self._pending = None
+
+    def lookup(self, event, mode=None):
+        """Find the action bound to a key event.
+
+        :returns: The action, :attr:`PREFIX` if the key starts a sequence
+            that needs more keys, or None if the key is not bound.
+        """
+        if event.event_type != WindowEvent.KEY_EVENT:
+            return None
+        pair = event.code, event.modifier
+        pending = self._pending
+        self._pending = None
+        if pending is not None:
+            target = pending.get(pair)
+            if target is None:
+                # The sequence was abandoned, start again from this key.
+                return self.lookup(event, mode)
+        else:
+            target = None
+            if mode is not None:
+                target = self._modes.get(mode, {}).get(pair)
+            if target is None:
+                target = self._modes.get(None, {}).get(pair)
+        if isinstance(target, dict):
+            self._pending = target
+            return self.PREFIX
+        return target
+
+    def dispatch(self, event, target, window, mode=None):
+        """Run the action bound to an event.
+
+        The action ``name`` calls ``target.action_name(event, window)``.
+
+        :returns: True if the event was used, either by an action or as
+            part of a sequence.
+        """
+        action = self.lookup(event, mode)
+        if action is None:
+            return False
+        if action is not self.PREFIX:
+            getattr(target, 'action_%s' % action)(event, window)
+        return True
+
+
+def _copy_node(node):
+    return dict((pair, _copy_node(target) if isinstance(target, dict)
+                 else target)
+                for pair, target in node.items())
@@ -8,8 +8,24 @@ KEY_RIGHT = curses.KEY_RIGHT
 
 KEYS_ARROW = {KEY_UP, KEY_DOWN, KEY_LEFT, KEY_RIGHT}
 
+KEY_RESIZE = curses.KEY_RESIZE
+KEY_MOUSE = curses.KEY_MOUSE
+
 KEY_ESC = 27
 KEY_ALT = KEY_ESC
 KEY_SPACE = 32
 KEY_ENTER = 10
 KEY_DELETE = 127
+
+KEY_HOME = curses.KEY_HOME
+KEY_END = curses.KEY_END
+KEY_INSERT = curses.KEY_IC
+KEY_DELETE_CHAR = curses.KEY_DC
+KEY_PAGE_UP = curses.KEY_PPAGE
+KEY_PAGE_DOWN = curses.KEY_NPAGE
+KEY_BACKTAB = curses.KEY_BTAB
+
+
+def KEY_F(n):
+    """The code of function key ``n``."""
+    return curses.KEY_F0 + n
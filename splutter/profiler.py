@@ -0,0 +1,272 @@
+import json
+import time
+from collections import deque
+
+from splutter.core import Component
+
+
+class FrameRecord(object):
+    """The timings of one frame.
+
+    Times are in seconds from the profiler's clock. ``phases`` and
+    ``components`` are lists of ``(name, start, duration)`` tuples, in the
+    order they happened.
+    """
+    __slots__ = ('start', 'end', 'phases', 'components')
+
+    def __init__(self, start):
+        self.start = start
+        self.end = None
+        self.phases = []
+        self.components = []
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def as_dict(self):
+        return {
+            'start': self.start,
+            'end': self.end,
+            'phases': [list(span) for span in self.phases],
+            'components': [list(span) for span in self.components],
+        }
+
+
+class FrameProfiler(object):
+    """Record how long each frame, and each component in it, takes.
+
+    Give one to :meth:`splutter.core.Controller.attach_to_window` to time
+    the phases of every frame: ``poll``, ``erase``, ``render`` and
+    ``refresh``, and the rendering of every component drawn. The last
+    ``capacity`` frames are kept.
+
+    Nothing is timed unless a controller has a profiler, so the cost when
+    profiling is off is a check for None per frame and per component.
+
+    :param clock: A function returning the current time in seconds.
+    """
+    DEFAULT_CAPACITY = 240
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, clock=time.perf_counter):
+        self.clock = clock
+        self._frames = deque(maxlen=capacity)
+        self._frame = None
+        self._phase = None
+        self._phase_start = None
+        self._listeners = []
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def frames(self):
+        """The recorded frames, oldest first.
+
+        :rtype: list of :class:`FrameRecord`
+        """
+        return list(self._frames)
+
+    def clear(self):
+        self._frames.clear()
+        self._frame = None
+        self._phase = None
+
+    def subscribe(self, callback):
+        """Call ``callback(frame)`` with each frame once it is recorded."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self._listeners.remove(callback)
+
+    def _open(self, now):
+        if self._frame is None:
+            self._frame = FrameRecord(now)
+        return self._frame
+
+    def begin(self, phase):
+        """Start timing a phase, ending the phase before it."""
+        now = self.clock()
+        self._end_phase(now)
+        self._open(now)
+        self._phase = phase
+        self._phase_start = now
+
+    def end_phase(self):
+        self._end_phase(self.clock())
+
+    def _end_phase(self, now):
+        if self._phase is not None:
+            start = self._phase_start
+            self._frame.phases.append((self._phase, start, now - start))
+            self._phase = None
+
+    def component(self, name, start):
+        """Record a component that started rendering at ``start``."""
+        now = self.clock()
+        self._open(start).components.append((name, start, now - start))
+
+    def end_frame(self):
+        """Finish the current frame and add it to the record."""
+        now = self.clock()
+        self._end_phase(now)
+        frame = self._open(now)
+        frame.end = now
+        self._frame = None
+        self._frames.append(frame)
+        for callback in list(self._listeners):
+            callback(frame)
+
+    def summary(self):
+        """Get the average cost of each phase and component per frame.
+
+        :returns: A dict with the number of ``frames``, the ``fps`` they
+            were drawn at, the mean ``frame_ms``, and dicts of the mean
+            milliseconds per frame spent in each of the ``phases`` and
+            ``components``.
+        """
+        frames = self._frames
+        count = len(frames)
+        phases = {}
+        components = {}
+        for frame in frames:
+            for name, _, duration in frame.phases:
+                phases[name] = phases.get(name, 0) + duration
+            for name, _, duration in frame.components:
+                components[name] = components.get(name, 0) + duration
+        fps = None
+        if count > 1:
+            elapsed = frames[-1].end - frames[0].end
+            if elapsed > 0:
+                fps = (count - 1) / elapsed
+
+        def _mean_ms(totals):
+            return dict((name, 1000 * total / count)
+                        for name, total in totals.items())
+
+        return {
+            'frames': count,
+            'fps': fps,
+            'frame_ms': (1000 * sum(f.duration for f in frames) / count
+                         if count else None),
+            'phases': _mean_ms(phases),
+            'components': _mean_ms(components),
+        }
+
+    def to_json(self):
+        """Export the recorded frames and their summary as JSON."""
+        return json.dumps({
+            'summary': self.summary(),
+            'frames': [frame.as_dict() for frame in self._frames],
+        })
+
+    def to_chrome_trace(self):
+        """Export the recorded frames in the Chrome trace event format.
+
+        The result can be loaded into ``chrome://tracing`` or Perfetto.
+        Frames, phases and components are complete (``X``) events, with
+        times in microseconds from the start of the first frame.
+        """
+        events = []
+        origin = self._frames[0].start if self._frames else 0
+
+        def _event(name, category, start, duration):
+            events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': 1e6 * (start - origin),
+                'dur': 1e6 * duration,
+                'pid': 1,
+                'tid': 1,
+            })
+
+        for frame in self._frames:
+            _event('frame', 'frame', frame.start, frame.duration)
+            for name, start, duration in frame.phases:
+                _event(name, 'phase', start, duration)
+            for name, start, duration in frame.components:
+                _event(name, 'component', start, duration)
+        return json.dumps({'traceEvents': events,
+                           'displayTimeUnit': 'ms'})
+
+
+class ProfilerOverlay(Component):
+    """Show the timings a :class:`FrameProfiler` records, on top of a view.
+
+    The overlay lists the frame rate, the average time of each phase and
+    the components that take longest to render. It is updated at most
+    every ``interval`` seconds, when frames are drawn, and takes up no
+    space while hidden.
+
+    :type rows: int
+    :param rows: How many of the slowest components to list.
+    """
+    PHASES = ('poll', 'erase', 'render', 'refresh')
+    Z = 1000
+
+    def __init__(self, profiler, x=0, y=0, rows=5, interval=0.5,
+                 bind_to=Component.BIND_TOP_LEFT):
+        super().__init__(x, y, bind_to=bind_to)
+        self._profiler = profiler
+        self._rows = rows
+        self._interval = interval
+        self._updated = None
+        self._shown = True
+        self._lines = ['profiling...']
+        self._z = self.Z
+        self._opaque = True
+        profiler.subscribe(self._frame_recorded)
+
+    @property
+    def shown(self):
+        return self._shown
+
+    @shown.setter
+    def shown(self, shown):
+        self._shown = shown
+        self._updated = None
+        self.invalidate()
+
+    def toggle(self):
+        self.shown = not self._shown
+
+    @property
+    def width(self):
+        if not self._shown:
+            return 0
+        return max(len(line) for line in self._lines)
+
+    @property
+    def height(self):
+        return len(self._lines) if self._shown else 0
+
+    def _frame_recorded(self, frame):
+        if not self._shown:
+            return
+        if (self._updated is not None and
+                frame.end - self._updated < self._interval):
+            return
+        self._updated = frame.end
+        lines = self._format(self._profiler.summary())
+        if lines != self._lines:
+            self._lines = lines
+            self.invalidate()
+
+    def _format(self, summary):
+        fps = summary['fps']
+        lines = ['%s fps  %.2f ms/frame' % (
+            '-' if fps is None else '%.1f' % fps, summary['frame_ms'])]
+        phases = summary['phases']
+        lines.append('  '.join('%s %.2f' % (name, phases[name])
+                               for name in self.PHASES if name in phases))
+        slowest = sorted(summary['components'].items(),
+                         key=lambda item: item[1], reverse=True)
+        for name, cost in slowest[:self._rows]:
+            lines.append('%8.3f ms  %s' % (cost, name))
+        return lines
+
+    def _render(self, x, y, window):
+        width = self.width
+        for y_offset, line in enumerate(self._lines, y):
+            window.add_spans(x, y_offset, ((line.ljust(width), None),))
@@ -0,0 +1,222 @@
+import bisect
+from array import array
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class RowStore(object):
+    """Rows looked up by a key and kept sorted for display in a Table.
+
+    The store is a sequence of rows in sort order, so it can be assigned
+    straight to :attr:`splutter.table.Table.rows`. Inserting, updating and
+    deleting a row finds its position with a binary search over the sorted
+    keys instead of re-sorting every row, and a table showing the store
+    keeps the same logical row selected across changes.
+
+    :param sort_key: A function that takes a row and returns the value to
+        sort it by. Rows with equal sort values are ordered by their keys,
+        so keys must be comparable. By default rows are sorted by key.
+    """
+    def __init__(self, sort_key=None):
+        self._sort_key = sort_key
+        self._rows = {}
+        self._positions = {}
+        self._order = []
+        self._listeners = []
+
+    def _position(self, key, row):
+        if self._sort_key is None:
+            return (key,)
+        return (self._sort_key(row), key)
+
+    def subscribe(self, callback):
+        """Call ``callback(key)`` whenever the row for a key changes."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self._listeners.remove(callback)
+
+    def _notify(self, key):
+        for callback in self._listeners:
+            callback(key)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, index):
+        return self._rows[self._order[index][-1]]
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def get(self, key, default=None):
+        return self._rows.get(key, default)
+
+    def key_at(self, index):
+        """Get the key of the row at a position."""
+        return self._order[index][-1]
+
+    def index(self, key):
+        """Get the position of the row with a key."""
+        position = self._positions[key]
+        return bisect.bisect_left(self._order, position)
+
+    def position(self, key):
+        """Get the value rows are sorted by for the row with a key."""
+        return self._positions[key]
+
+    def keys(self):
+        """Iterate over the keys in sort order."""
+        for position in self._order:
+            yield position[-1]
+
+    def set(self, key, row):
+        """Insert a row, or replace the row that has the same key."""
+        position = self._position(key, row)
+        old_position = self._positions.get(key)
+        if old_position != position:
+            if old_position is not None:
+                del self._order[bisect.bisect_left(self._order, old_position)]
+            bisect.insort(self._order, position)
+            self._positions[key] = position
+        self._rows[key] = row
+        self._notify(key)
+
+    def update(self, rows):
+        """Set many rows from ``(key, row)`` pairs or a dict."""
+        if isinstance(rows, dict):
+            rows = rows.items()
+        for key, row in rows:
+            self.set(key, row)
+
+    def delete(self, key):
+        """Remove the row with a key."""
+        position = self._positions.pop(key)
+        del self._order[bisect.bisect_left(self._order, position)]
+        del self._rows[key]
+        self._notify(key)
+
+    def clear(self):
+        keys = list(self._rows)
+        self._rows.clear()
+        self._positions.clear()
+        self._order = []
+        for key in keys:
+            self._notify(key)
+
+
+class ColumnarRows(object):
+    """Rows stored as one sequence of values per column.
+
+    Columns can be NumPy arrays, :class:`array.array` or any other sequence,
+    and all must have the same length. When every column is a NumPy array
+    the visible rows are formatted, sorted and filtered a whole column at a
+    time with NumPy; otherwise plain Python is used. Rows are never built as
+    lists except when a single row is read by index.
+
+    Sorting and filtering return a new view over the same columns, so
+    assign the result to :attr:`splutter.table.Table.rows`. If the values
+    in the columns change, invalidate the table to redraw it.
+
+    :type columns: list
+    :param columns: The sequence of values for each column.
+    """
+    def __init__(self, columns, _index=None):
+        self._columns = list(columns)
+        lengths = set(len(column) for column in self._columns)
+        if len(lengths) > 1:
+            raise ValueError('Columns have different lengths: %s' %
+                             sorted(lengths))
+        self._vectorized = numpy is not None and all(
+            isinstance(column, numpy.ndarray) for column in self._columns)
+        self._index = _index
+        if _index is not None:
+            self._length = len(_index)
+        else:
+            self._length = lengths.pop() if lengths else 0
+
+    @property
+    def columns(self):
+        return self._columns
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        if self._index is not None:
+            index = self._index[index]
+        return [column[index] for column in self._columns]
+
+    def _column_slice(self, column, start, stop):
+        """Get the values of a column for a range of displayed rows."""
+        column = self._columns[column]
+        if self._index is None:
+            return column[start:stop]
+        positions = self._index[start:stop]
+        if self._vectorized:
+            return column[positions]
+        return [column[i] for i in positions]
+
+    def _positions(self):
+        if self._index is not None:
+            return self._index
+        if self._vectorized:
+            return numpy.arange(self._length)
+        return array('q', range(self._length))
+
+    def format_rows(self, start, stop, col_specs):
+        """Format the rows in ``[start, stop)`` as table lines."""
+        cells = []
+        for column, spec in enumerate(col_specs[:len(self._columns)]):
+            values = self._column_slice(column, start, stop)
+            if self._vectorized:
+                cells.append(self._format_array(values, spec))
+            else:
+                cells.append([spec.format(value) for value in values])
+        return [' '.join(row) for row in zip(*cells)]
+
+    def _format_array(self, values, spec):
+        if spec.fmt is None:
+            text = values.astype(str)
+        else:
+            text = numpy.char.mod(spec.fmt, values)
+        # Casting to a shorter string type truncates each value.
+        text = text.astype('<U%d' % spec.max_width)
+        return numpy.char.ljust(text, spec.max_width).tolist()
+
+    def sorted_by(self, column, reverse=False):
+        """Get a view of the rows sorted by the values in a column."""
+        positions = self._positions()
+        values = self._column_slice(column, 0, self._length)
+        if self._vectorized:
+            order = numpy.argsort(values, kind='stable')
+            if reverse:
+                order = order[::-1]
+            index = positions[order]
+        else:
+            order = sorted(range(self._length), key=values.__getitem__,
+                           reverse=reverse)
+            index = array('q', (positions[i] for i in order))
+        return ColumnarRows(self._columns, _index=index)
+
+    def filtered(self, column, op, value):
+        """Get a view of the rows where ``op(row[column], value)`` is true.
+
+        :param op: A comparison from the :mod:`operator` module, such as
+            :func:`operator.gt`, which NumPy applies to the whole column.
+        """
+        positions = self._positions()
+        values = self._column_slice(column, 0, self._length)
+        if self._vectorized:
+            index = positions[op(values, value)]
+        else:
+            index = array('q', (position for position, v
+                                in zip(positions, values) if op(v, value)))
+        return ColumnarRows(self._columns, _index=index)
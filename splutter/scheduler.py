@@ -0,0 +1,51 @@
+import time
+
+
+class FrameScheduler(object):
+    """Decide when the next frame should be drawn.
+
+    Any number of frame requests made between two frames are merged into a
+    single frame, and when ``fps`` is set frames are spaced at least
+    ``1 / fps`` seconds apart.
+
+    :type fps: int
+    :param fps: The maximum number of frames per second, or None to draw
+        frames as soon as they are requested.
+
+    :param clock: A function returning the current time in seconds.
+    """
+    def __init__(self, fps=None, clock=time.monotonic):
+        self._clock = clock
+        self._pending = False
+        self._last_frame = None
+        self._interval = 0
+        self.fps = fps
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @fps.setter
+    def fps(self, fps):
+        if fps is not None and fps <= 0:
+            raise ValueError('fps must be positive, got %r' % fps)
+        self._fps = fps
+        self._interval = 1.0 / fps if fps else 0
+
+    @property
+    def pending(self):
+        """True if a frame has been requested since the last one."""
+        return self._pending
+
+    def request(self):
+        self._pending = True
+
+    def next_frame_in(self):
+        """Get the number of seconds until another frame may be drawn."""
+        if self._last_frame is None:
+            return 0
+        return max(0, self._last_frame + self._interval - self._clock())
+
+    def frame_drawn(self):
+        self._pending = False
+        self._last_frame = self._clock()
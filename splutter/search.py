@@ -0,0 +1,164 @@
+import bisect
+
+
+def _row_text(row):
+    return '\t'.join(str(col) for col in row).lower()
+
+
+class TextIndex(object):
+    """A lowercase text index of rows for searching as the user types.
+
+    The text of every row is built once. Searching for a query that extends
+    the previous query only checks the rows that matched the previous one,
+    and going back to an earlier query reuses its matches.
+
+    Keyed rows such as :class:`splutter.rows.RowStore` keep the index up to
+    date as rows change, and the matches of every remembered query are
+    patched rather than searched again. For other rows call
+    :meth:`refresh` when a row changes in place.
+    """
+    def __init__(self, rows):
+        self._rows = rows
+        self._keyed = hasattr(rows, 'key_at')
+        self._results = []
+        self._listeners = []
+        if self._keyed:
+            self._texts = {}
+            self._positions = {}
+            for i in range(len(rows)):
+                key = rows.key_at(i)
+                self._texts[key] = _row_text(rows[i])
+                self._positions[key] = rows.position(key)
+            rows.subscribe(self._row_changed)
+        else:
+            self._texts = [_row_text(rows[i]) for i in range(len(rows))]
+
+    def close(self):
+        """Stop following changes to the rows."""
+        if self._keyed:
+            self._rows.unsubscribe(self._row_changed)
+
+    def subscribe(self, callback):
+        """Call ``callback(key)`` after a change to keyed rows is indexed."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self._listeners.remove(callback)
+
+    def _text(self, token):
+        if self._keyed:
+            return self._texts[token[-1]]
+        return self._texts[token]
+
+    def _all_tokens(self):
+        if self._keyed:
+            return sorted(self._positions.values())
+        return list(range(len(self._texts)))
+
+    def search(self, query):
+        """Get a view of the rows containing ``query``, ignoring case."""
+        query = query.lower()
+        while self._results and not query.startswith(self._results[-1][0]):
+            self._results.pop()
+        if self._results and self._results[-1][0] == query:
+            matches = self._results[-1][1]
+        else:
+            if self._results:
+                candidates = self._results[-1][1]
+            else:
+                candidates = self._all_tokens()
+            matches = [token for token in candidates
+                       if query in self._text(token)]
+            self._results.append((query, matches))
+        if self._keyed:
+            return KeyedFilteredRows(self, matches)
+        return FilteredRows(self, matches)
+
+    def _update(self, old_token, new_token, text):
+        for query, matches in self._results:
+            if old_token is not None:
+                i = bisect.bisect_left(matches, old_token)
+                if i < len(matches) and matches[i] == old_token:
+                    del matches[i]
+            if new_token is not None and query in text:
+                bisect.insort(matches, new_token)
+
+    def refresh(self, index):
+        """Re-index the row at an index after it changed in place."""
+        text = _row_text(self._rows[index])
+        self._texts[index] = text
+        self._update(index, index, text)
+
+    def _row_changed(self, key):
+        old_position = self._positions.pop(key, None)
+        self._texts.pop(key, None)
+        new_position = text = None
+        if key in self._rows:
+            new_position = self._positions[key] = self._rows.position(key)
+            text = self._texts[key] = _row_text(self._rows.get(key))
+        self._update(old_position, new_position, text)
+        for callback in self._listeners:
+            callback(key)
+
+
+class FilteredRows(object):
+    """The rows matching a search, in the same order as the searched rows.
+
+    The view of the most recent search stays up to date as keyed rows
+    change.
+    """
+    def __init__(self, text_index, matches):
+        self._text_index = text_index
+        self._rows = text_index._rows
+        self._matches = matches
+
+    def __len__(self):
+        return len(self._matches)
+
+    def __getitem__(self, index):
+        return self._rows[self._matches[index]]
+
+    def source_index(self, index):
+        """Get the index in the searched rows of a matching row."""
+        return self._matches[index]
+
+
+class KeyedFilteredRows(FilteredRows):
+    """The rows matching a search of keyed rows."""
+    def __getitem__(self, index):
+        return self._rows.get(self._matches[index][-1])
+
+    def source_index(self, index):
+        return self._rows.index(self._matches[index][-1])
+
+    def key_at(self, index):
+        return self._matches[index][-1]
+
+    def _find(self, key):
+        position = self._text_index._positions.get(key)
+        if position is None:
+            return None
+        i = bisect.bisect_left(self._matches, position)
+        if i < len(self._matches) and self._matches[i] == position:
+            return i
+        return None
+
+    def index(self, key):
+        i = self._find(key)
+        if i is None:
+            raise ValueError('%r is not in the filtered rows' % (key,))
+        return i
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._rows.get(key)
+        return default
+
+    def subscribe(self, callback):
+        self._text_index.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self._text_index.unsubscribe(callback)
@@ -0,0 +1,110 @@
+class GridIndex(object):
+    """Index items by the rectangles they cover for fast hit testing.
+
+    The plane is split into square cells and every item is listed in each
+    cell its rectangle touches, so a point or rectangle query only looks
+    at the items in the cells it covers instead of at every item.
+
+    Rectangles are ``(left, top, right, bottom)`` tuples with exclusive
+    right and bottom edges, as returned by
+    :meth:`splutter.core.Component.bounds`. Items must be hashable.
+    """
+    CELL_SIZE = 16
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self._cell_size = cell_size
+        self._cells = {}
+        self._rects = {}
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, item):
+        return item in self._rects
+
+    def rect(self, item):
+        """Get the rectangle an item was indexed with."""
+        return self._rects[item]
+
+    def _cell_range(self, rect):
+        size = self._cell_size
+        left, top, right, bottom = rect
+        if right <= left or bottom <= top:
+            return range(0), range(0)
+        return (range(left // size, (right - 1) // size + 1),
+                range(top // size, (bottom - 1) // size + 1))
+
+    def insert(self, item, rect):
+        """Add an item, or move it if it is already in the index."""
+        previous = self._rects.get(item)
+        if previous == rect:
+            return
+        if previous is not None:
+            self.remove(item)
+        self._rects[item] = rect
+        columns, rows = self._cell_range(rect)
+        cells = self._cells
+        for column in columns:
+            for row in rows:
+                bucket = cells.get((column, row))
+                if bucket is None:
+                    bucket = cells[(column, row)] = set()
+                bucket.add(item)
+
+    def remove(self, item):
+        """Remove an item, doing nothing if it is not in the index."""
+        rect = self._rects.pop(item, None)
+        if rect is None:
+            return
+        columns, rows = self._cell_range(rect)
+        cells = self._cells
+        for column in columns:
+            for row in rows:
+                bucket = cells[(column, row)]
+                bucket.discard(item)
+                if not bucket:
+                    del cells[(column, row)]
+
+    def clear(self):
+        self._cells = {}
+        self._rects = {}
+
+    def query_point(self, x, y):
+        """Get the items whose rectangles contain a point.
+
+        :rtype: list
+        """
+        size = self._cell_size
+        bucket = self._cells.get((x // size, y // size))
+        if not bucket:
+            return []
+        rects = self._rects
+        hits = []
+        for item in bucket:
+            left, top, right, bottom = rects[item]
+            if left <= x < right and top <= y < bottom:
+                hits.append(item)
+        return hits
+
+    def query_rect(self, rect):
+        """Get the items whose rectangles intersect a rectangle.
+
+        :rtype: list
+        """
+        left, top, right, bottom = rect
+        columns, rows = self._cell_range(rect)
+        cells = self._cells
+        rects = self._rects
+        seen = set()
+        hits = []
+        for column in columns:
+            for row in rows:
+                for item in cells.get((column, row), ()):
+                    if item in seen:
+                        continue
+                    seen.add(item)
+                    other = rects[item]
+                    if (left < other[2] and other[0] < right and
+                            top < other[3] and other[1] < bottom):
+                        hits.append(item)
+        return hits
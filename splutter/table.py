@@ -1,4 +1,6 @@
 from splutter.core import Component
+from splutter.keymap import Keymap
+from splutter.search import TextIndex
 from splutter.colors import Color
 from splutter.colors import WHITE, LIGHT_GRAY
 from splutter.keys import KEY_UP
@@ -6,10 +8,17 @@ from splutter.keys import KEY_DOWN
 
 
 class ColumnSpec(object):
-    def __init__(self, title, max_width):
+    """Describe a column of a :class:`Table`.
+
+    :type fmt: str
+    :param fmt: An optional ``%`` format for values in the column, for
+        example ``'%.2f'``. Values are formatted with ``str()`` otherwise.
+    """
+    def __init__(self, title, max_width, fmt=None):
         assert len(title) < max_width
         self._title = title
         self._max_width = max_width
+        self._fmt = fmt
 
     @property
     def title(self):
@@ -19,9 +28,22 @@ class ColumnSpec(object):
     def max_width(self):
         return self._max_width
 
+    @property
+    def fmt(self):
+        return self._fmt
+
     def trailing_space(self, value):
         return self._max_width - len(value)
 
+    def format(self, value):
+        """Format a value as a cell exactly ``max_width`` characters wide."""
+        if self._fmt is None:
+            value = str(value)
+        else:
+            value = self._fmt % value
+        value = value[:self._max_width]
+        return value + ' ' * self.trailing_space(value)
+
     def render(self, x, y, window):
         window.add_string(x, y, self._title)
 
@@ -40,23 +62,200 @@ class TableRow(object):
 
 
 class Table(Component):
+    """A table of rows with one selected row.
+
+    Rows can be any sequence supporting ``len()`` and indexing, so a large
+    result set can be shown without building a list of every row. Only the
+    rows inside the viewport are read when rendering.
+
+    Each row is formatted into a single line the first time it is shown
+    and the line is cached until the rows or column specs change. If a row
+    is changed in place call :meth:`invalidate_row`.
+
+    Rows that provide ``format_rows(start, stop, col_specs)``, such as
+    :class:`splutter.rows.ColumnarRows`, format the visible rows themselves
+    in one batch every frame instead of being cached.
+
+    Rows that also provide ``key_at(index)``, ``index(key)``, ``in`` and
+    ``subscribe(callback)``, such as :class:`splutter.rows.RowStore`, are
+    tracked by key: only changed rows are reformatted and the selection
+    stays on the same logical row as rows are added and removed.
+
+    :meth:`filter` shows only the rows containing some text. The text of
+    every row is indexed the first time the table is searched, and the
+    index is kept up to date as keyed rows change.
+
+    :type height: int
+    :param height: The number of rows visible at once. The table scrolls to
+        keep the selected row visible. None shows every row.
+    """
     DEFAULT_SELECTED_BG_COLOR = LIGHT_GRAY
+    MIN_LINE_CACHE_SIZE = 256
+    KEYMAP = Keymap({KEY_UP: 'up', KEY_DOWN: 'down'})
 
-    def __init__(self, x, y, col_specs, bg_color=None):
+    def __init__(self, x, y, col_specs, bg_color=None, height=None):
         super().__init__(x, y)
         if bg_color is None:
             bg_color = self.DEFAULT_SELECTED_BG_COLOR
-        self._col_specs = col_specs
-        self._width = sum(s.max_width for s in col_specs)
+        self._viewport_height = height
+        self._lines = {}
+        self.col_specs = col_specs
         self._rows = []
+        self._key_at = None
+        self._unfiltered = None
+        self._text_index = None
         self._selected = 0
+        self._selected_key = None
+        self._scroll = 0
         self._selected_color = Color(fg=WHITE, bg=bg_color)
+        self._keymap = self.KEYMAP.copy()
+        self._resize()
 
     def up(self):
-        self._selected = max(0, self._selected - 1)
+        self._select(self._selected - 1)
 
     def down(self):
-        self._selected = max(len(self._rows), self._selected + 1)
+        self._select(self._selected + 1)
+
+    def _select(self, index):
+        index = max(min(index, len(self._rows) - 1), 0)
+        if index != self._selected:
+            self._selected = index
+            self._anchor_selection()
+            self._scroll_to_selected()
+            self.invalidate()
+
+    def _anchor_selection(self):
+        """Remember the key of the selected row so it can be found again."""
+        if self._key_at is not None and self._rows:
+            self._selected_key = self._key_at(self._selected)
+        else:
+            self._selected_key = None
+
+    def _restore_selection(self):
+        """Select the remembered row again after the rows changed.
+
+        The selection stays at the same index if that row is gone.
+        """
+        if (self._key_at is not None and self._selected_key is not None and
+                self._selected_key in self._rows):
+            self._selected = self._rows.index(self._selected_key)
+        else:
+            self._selected = max(min(self._selected, len(self._rows) - 1), 0)
+            self._anchor_selection()
+
+    def _visible_rows(self):
+        if self._viewport_height is None:
+            return len(self._rows)
+        return min(self._viewport_height, len(self._rows))
+
+    def _resize(self):
+        self._height = self._visible_rows() + 1
+
+    def _scroll_to_selected(self):
+        """Move the viewport the least distance that shows the selection."""
+        visible = self._visible_rows()
+        scroll = min(self._scroll, self._selected)
+        scroll = max(scroll, self._selected - visible + 1)
+        self._scroll = min(max(scroll, 0), len(self._rows) - visible)
+
+    @property
+    def col_specs(self):
+        return self._col_specs
+
+    @col_specs.setter
+    def col_specs(self, col_specs):
+        self._col_specs = col_specs
+        # Columns are separated by a single space.
+        self._width = sum(s.max_width + 1 for s in col_specs) - 1
+        self._header = ' '.join(s.title + ' ' * s.trailing_space(s.title)
+                                for s in col_specs)
+        self._lines.clear()
+        self.invalidate()
+
+    def invalidate_row(self, index):
+        """Redraw a row that was changed in place."""
+        key = self._row_key(index)
+        if self._text_index is not None and self._key_at is None:
+            if self._unfiltered is not None:
+                # The row may now be in or out of the filtered rows, which
+                # moves the rows after it.
+                self._lines.clear()
+                index = self._rows.source_index(index)
+            self._text_index.refresh(index)
+        self._row_changed(key)
+
+    def search(self, query):
+        """Get a view of all rows containing ``query``, ignoring case.
+
+        The view is a sequence that can be assigned to :attr:`rows`.
+        """
+        if self._text_index is None:
+            self._text_index = TextIndex(self.unfiltered_rows)
+        return self._text_index.search(query)
+
+    def filter(self, query):
+        """Only show the rows containing ``query``, ignoring case.
+
+        An empty query shows every row again.
+        """
+        if not query:
+            if self._unfiltered is not None:
+                self._set_rows(self._unfiltered)
+                self._unfiltered = None
+            return
+        rows = self.search(query)
+        if self._unfiltered is None:
+            self._unfiltered = self._rows
+        self._set_rows(rows)
+
+    @property
+    def unfiltered_rows(self):
+        """The rows shown when the table is not filtered."""
+        if self._unfiltered is not None:
+            return self._unfiltered
+        return self._rows
+
+    def _row_key(self, index):
+        if self._key_at is None:
+            return index
+        return self._key_at(index)
+
+    def _line(self, index):
+        key = self._row_key(index)
+        line = self._lines.get(key)
+        if line is None:
+            if len(self._lines) >= max(self.MIN_LINE_CACHE_SIZE,
+                                       4 * self._visible_rows()):
+                self._lines.clear()
+            line = ' '.join(spec.format(col) for col, spec
+                            in zip(self._rows[index], self._col_specs))
+            self._lines[key] = line
+        return line
+
+    def _row_changed(self, key):
+        """Called by keyed rows when the row for a key changes."""
+        self._lines.pop(key, None)
+        self._restore_selection()
+        self._resize()
+        self._scroll_to_selected()
+        self.invalidate()
+
+    @property
+    def viewport_height(self):
+        return self._viewport_height
+
+    @viewport_height.setter
+    def viewport_height(self, height):
+        self._viewport_height = height
+        self._resize()
+        self._scroll_to_selected()
+        self.invalidate()
+
+    @property
+    def scroll(self):
+        """The index of the first visible row."""
+        return self._scroll
 
     @property
     def selected_row(self):
@@ -68,45 +267,59 @@ class Table(Component):
 
     @rows.setter
     def rows(self, rows):
+        if self._text_index is not None:
+            self._text_index.close()
+            self._text_index = None
+        self._unfiltered = None
+        self._set_rows(rows)
+
+    def _set_rows(self, rows):
+        if self._key_at is not None:
+            self._rows.unsubscribe(self._row_changed)
         self._rows = rows
-        self._height = len(self._col_specs) + 1
-        self._selected = min(self._selected, len(self._rows) - 1)
+        self._key_at = getattr(rows, 'key_at', None)
+        if self._key_at is not None:
+            rows.subscribe(self._row_changed)
+        self._lines.clear()
+        self._resize()
+        self._restore_selection()
+        self._scroll_to_selected()
+        self.invalidate()
+
+    def _visible_lines(self):
+        start = self._scroll
+        stop = start + self._visible_rows()
+        format_rows = getattr(self._rows, 'format_rows', None)
+        if format_rows is not None:
+            return format_rows(start, stop, self._col_specs)
+        return [self._line(i) for i in range(start, stop)]
 
     def _render(self, x, y, window):
-        x_offset = x
-        y_offset = y
-        for col_spec in self._col_specs:
-            col_spec.render(x_offset, y_offset, window)
-            x_offset += col_spec.max_width + 1
-
-        y_offset += 1
-        x_offset = x
-        for i, row in enumerate(self._rows):
-            for col, spec in zip(row, self._col_specs):
-                col = str(col)
-                color = None
-                if i == self._selected:
-                    color = self._selected_color
-                else:
-                    color = window.default_color
-                window.add_string(x_offset, y_offset, col, color)
-                right_pad = ' ' * spec.trailing_space(col)
-                window.add_string(x_offset + len(col), y_offset, right_pad,
-                                  color)
-                x_offset += spec.max_width + 1
-            x_offset = x
+        window.add_spans(x, y, ((self._header, None),))
+        y_offset = y + 1
+        for i, line in enumerate(self._visible_lines(), self._scroll):
+            if i == self._selected:
+                color = self._selected_color
+            else:
+                color = window.default_color
+            window.add_spans(x, y_offset, ((line, color),))
             y_offset += 1
 
     def has_focus(self, x, y, window):
-        window.move_cursor(self.right + x, self._selected + self.y + y + 1)
+        window.move_cursor(self.right + x,
+                           self._selected - self._scroll + self.y + y + 1)
+
+    @property
+    def keymap(self):
+        """The :class:`splutter.keymap.Keymap` of the table's bindings."""
+        return self._keymap
+
+    def action_up(self, event, window):
+        self.up()
 
-    def _handle_event(self, event, delta_select):
-        max_select = len(self._rows) - 1
-        self._selected = min(max(self._selected + delta_select, 0), max_select)
-        event.stop_propagation()
+    def action_down(self, event, window):
+        self.down()
 
     def handle_event(self, event, window):
-        if event == KEY_UP:
-            self._handle_event(event, -1)
-        elif event == KEY_DOWN:
-            self._handle_event(event, 1)
+        if self._keymap.dispatch(event, self, window):
+            event.stop_propagation()
@@ -1,56 +1,190 @@
+from array import array
+
 from splutter.core import Component
-from splutter.keys import KEY_LEFT, KEY_RIGHT, KEY_ENTER,  KEY_DELETE, \
-    KEYS_ARROW
+from splutter.keymap import Keymap
+from splutter.keys import KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN, KEY_ENTER, \
+    KEY_DELETE
+from splutter.window import WindowEvent
+from splutter.window import _CHAR_TYPECODE
+
+
+def _pasteable(text, allowed='\t'):
+    """Drop the characters of pasted text that cannot be shown.
+
+    Any printable character is kept, not only the ASCII ones that can be
+    typed as single keys, along with the control characters in
+    ``allowed``.
+    """
+    return ''.join(c for c in text if c.isprintable() or c in allowed)
+
+
+class GapBuffer(object):
+    """Text stored with a gap of free space at the last edit.
+
+    Inserting or deleting next to the previous edit only moves the edges of
+    the gap, so typing at a cursor is amortized O(1) however long the text
+    is. Moving the gap costs the distance it moves.
+    """
+    MIN_GAP = 64
+
+    def __init__(self, text=''):
+        self._buffer = array(_CHAR_TYPECODE, text)
+        self._gap_start = self._gap_end = len(text)
+
+    def __len__(self):
+        return len(self._buffer) - (self._gap_end - self._gap_start)
+
+    def __str__(self):
+        return (self._buffer[:self._gap_start].tounicode() +
+                self._buffer[self._gap_end:].tounicode())
+
+    def _move_gap(self, index):
+        buffer = self._buffer
+        if index < self._gap_start:
+            count = self._gap_start - index
+            buffer[self._gap_end - count:self._gap_end] = \
+                buffer[index:self._gap_start]
+            self._gap_start = index
+            self._gap_end -= count
+        elif index > self._gap_start:
+            count = index - self._gap_start
+            buffer[self._gap_start:index] = \
+                buffer[self._gap_end:self._gap_end + count]
+            self._gap_start = index
+            self._gap_end += count
+
+    def _ensure_gap(self, size):
+        gap = self._gap_end - self._gap_start
+        if gap >= size:
+            return
+        # Grow in proportion to the text so repeated inserts are amortized.
+        grow = max(size - gap, len(self), self.MIN_GAP)
+        self._buffer[self._gap_end:self._gap_end] = \
+            array(_CHAR_TYPECODE, ' ') * grow
+        self._gap_end += grow
+
+    def insert(self, index, text):
+        """Insert text before the character at ``index``."""
+        index = min(max(index, 0), len(self))
+        self._move_gap(index)
+        self._ensure_gap(len(text))
+        end = self._gap_start + len(text)
+        self._buffer[self._gap_start:end] = array(_CHAR_TYPECODE, text)
+        self._gap_start = end
+
+    def delete(self, index, count=1):
+        """Delete ``count`` characters starting at ``index``."""
+        index = min(max(index, 0), len(self))
+        count = min(count, len(self) - index)
+        if count <= 0:
+            return
+        self._move_gap(index)
+        self._gap_end += count
+
+    def slice(self, start, end):
+        """Get the text between two indexes, like ``str(buffer)[start:end]``.
+
+        This does not move the gap.
+        """
+        length = len(self)
+        start = min(max(start, 0), length)
+        end = min(max(end, start), length)
+        gap = self._gap_end - self._gap_start
+        if end <= self._gap_start:
+            return self._buffer[start:end].tounicode()
+        if start >= self._gap_start:
+            return self._buffer[start + gap:end + gap].tounicode()
+        return (self._buffer[start:self._gap_start].tounicode() +
+                self._buffer[self._gap_end:end + gap].tounicode())
 
 
 class TextField(Component):
+    """A single line text input.
+
+    The text is kept in a :class:`GapBuffer` so typing and deleting at the
+    cursor do not copy the whole text, and the visible part of the text is
+    only rebuilt when the text or the scroll position changes.
+    """
+    KEYMAP = Keymap({
+        KEY_LEFT: 'left',
+        KEY_RIGHT: 'right',
+        KEY_DELETE: 'delete',
+        KEY_ENTER: 'enter',
+    })
+
     def __init__(self, x, y, width=12, max_length=None, text='',
                  bind_to=Component.BIND_TOP_LEFT):
         super().__init__(x, y, bind_to=bind_to)
+        self._keymap = self.KEYMAP.copy()
         self._max_width = width
         if max_length is None:
             max_length = width
         self._max_length = max_length
         self._x_offset = len(text)
         self._text_offset = 0
+        self._buffer = GapBuffer(text)
         self._text = text
+        self._visible_text = None
         self._left_boundry = 0
+        self._width = width + 1
+        self._height = 1
 
     @property
     def text(self):
+        if self._text is None:
+            self._text = str(self._buffer)
         return self._text
 
     @text.setter
     def text(self, new_text):
+        self._buffer = GapBuffer(new_text)
+        self._text_changed()
         self._text = new_text
 
+    def _text_changed(self):
+        self._text = None
+        self._visible_text = None
+        self.invalidate()
+
     def _text_window(self):
         """Get the window of the text that should be visible."""
-        start = self._left_boundry
-        end = start + self._max_width
-        return self._text[start:end+1]
+        if self._visible_text is None:
+            start = self._left_boundry
+            end = start + self._max_width
+            self._visible_text = self._buffer.slice(start, end + 1)
+        return self._visible_text
 
     def _render(self, x, y, window):
-        window.add_string(x, y, self._text_window())
+        window.add_spans(x, y, ((self._text_window(), None),))
 
     def _move(self, dx):
         """Move the cursor in a direction."""
-        self._x_offset = min(max(self._x_offset + dx, 0), len(self._text))
+        self._x_offset = min(max(self._x_offset + dx, 0), len(self._buffer))
         self._recalculate_boundary(jump=True)
 
-    def _handle_arrow(self, event, window):
-        if event == KEY_LEFT:
-            self._move(-1)
-        elif event == KEY_RIGHT:
-            self._move(1)
+    @property
+    def keymap(self):
+        """The :class:`splutter.keymap.Keymap` of the field's bindings."""
+        return self._keymap
+
+    def action_left(self, event, window):
+        self._move(-1)
+
+    def action_right(self, event, window):
+        self._move(1)
+
+    def action_delete(self, event, window):
+        self._handle_delete()
+
+    def action_enter(self, event, window):
+        self._handle_enter()
 
     def _handle_delete(self):
         if self._x_offset == 0:
             return
-        new_text = '%s%s' % (self._text[:self._x_offset-1],
-                             self._text[self._x_offset:])
+        self._buffer.delete(self._x_offset - 1)
         self._x_offset -= 1
-        self._text = new_text
+        self._text_changed()
         self._recalculate_boundary()
 
     def _recalculate_boundary(self, jump=False):
@@ -58,6 +192,7 @@ class TextField(Component):
         offset = 1
         if jump is True:
             offset = self._max_width // 2
+        left_boundry = self._left_boundry
         if self._cursor_location() > self._max_width:
             self._left_boundry += offset
         if self._cursor_location() < 0:
@@ -65,17 +200,34 @@ class TextField(Component):
 
         if self._left_boundry < 0:
             self._left_boundry = 0
+        if self._left_boundry != left_boundry:
+            self._visible_text = None
+            self.invalidate()
 
     def _handle_printable(self, printable, event, window):
-        if len(self._text) > self._max_length:
+        if len(self._buffer) > self._max_length:
             return
-        new_text = '%s%s%s' % (self._text[:self._x_offset],
-                               printable,
-                               self._text[self._x_offset:])
-        self.text = new_text
+        self._buffer.insert(self._x_offset, printable)
         self._x_offset += 1
+        self._text_changed()
         self._recalculate_boundary()
 
+    def _handle_paste(self, text):
+        """Insert pasted text in one edit, pressing enter for newlines."""
+        for i, line in enumerate(text.split('\n')):
+            if i:
+                self._handle_enter()
+            line = _pasteable(line)
+            room = self._max_length + 1 - len(self._buffer)
+            line = line[:max(room, 0)]
+            if line:
+                self._buffer.insert(self._x_offset, line)
+                self._x_offset += len(line)
+                self._text_changed()
+        if self._cursor_location() > self._max_width:
+            self._left_boundry = self._x_offset - self._max_width
+            self._visible_text = None
+
     def _handle_enter(self):
         """Action to perform when enter is pressed.
 
@@ -85,13 +237,10 @@ class TextField(Component):
         pass
 
     def handle_event(self, event, window):
-        if event in KEYS_ARROW:
-            self._handle_arrow(event, window)
-        elif event == KEY_DELETE:
-            self._handle_delete()
-        elif event == KEY_ENTER:
-            self._handle_enter()
-        else:
+        if event.event_type == WindowEvent.PASTE_EVENT:
+            self._handle_paste(event.text)
+            event.stop_propagation()
+        elif not self._keymap.dispatch(event, self, window):
             printable = event.printable()
             if printable:
                 self._handle_printable(printable, event, window)
@@ -102,3 +251,236 @@ class TextField(Component):
     def has_focus(self, x, y, window):
         window.move_cursor(x + self._cursor_location() + self.x,
                            y + self.y)
+
+
+class _LineIndex(object):
+    """The offset each line starts at in a text, kept up to date on edits.
+
+    Every edit shifts the starts of all the lines after it. Rather than
+    updating them all, the shift is remembered as a pending step that
+    applies to every line after ``_step_line``. Consecutive edits close to
+    each other, like typing, only move the step a short distance, and
+    finding the line an offset is on is a binary search.
+    """
+    def __init__(self, text=''):
+        self._starts = array('q', [0])
+        offset = text.find('\n')
+        while offset != -1:
+            self._starts.append(offset + 1)
+            offset = text.find('\n', offset + 1)
+        self._step_line = 0
+        self._step_length = 0
+
+    def __len__(self):
+        return len(self._starts)
+
+    def start(self, line):
+        """Get the offset of the first character of a line."""
+        if line > self._step_line:
+            return self._starts[line] + self._step_length
+        return self._starts[line]
+
+    def line_of(self, offset):
+        """Get the line containing an offset."""
+        low, high = 0, len(self._starts)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.start(middle) <= offset:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def _move_step(self, line):
+        """Apply the pending step to lines up to ``line`` only."""
+        starts = self._starts
+        step = self._step_length
+        if step == 0:
+            pass
+        elif line > self._step_line:
+            for i in range(self._step_line + 1, line + 1):
+                starts[i] += step
+        elif line < self._step_line:
+            for i in range(line + 1, self._step_line + 1):
+                starts[i] -= step
+        self._step_line = line
+
+    def insert(self, offset, text):
+        line = self.line_of(offset)
+        self._move_step(line)
+        new_starts = []
+        newline = text.find('\n')
+        while newline != -1:
+            new_starts.append(offset + newline + 1)
+            newline = text.find('\n', newline + 1)
+        if new_starts:
+            # The new lines come before the step, so they are stored as is.
+            self._starts[line + 1:line + 1] = array('q', new_starts)
+            self._step_line = line + len(new_starts)
+        self._step_length += len(text)
+
+    def delete(self, offset, count):
+        first = self.line_of(offset)
+        last = self.line_of(offset + count)
+        self._move_step(first)
+        del self._starts[first + 1:last + 1]
+        self._step_length -= count
+
+
+class TextArea(Component):
+    """A multi-line text input that scrolls to show its cursor.
+
+    Text is stored in a :class:`GapBuffer` with an index of where each line
+    starts, so looking up a line and typing cost the same however long the
+    text is, and only the lines inside the area are drawn.
+
+    :type width: int
+    :param width: The number of columns visible at once.
+
+    :type height: int
+    :param height: The number of lines visible at once.
+    """
+    KEYMAP = Keymap({
+        KEY_LEFT: 'left',
+        KEY_RIGHT: 'right',
+        KEY_UP: 'up',
+        KEY_DOWN: 'down',
+        KEY_DELETE: 'delete',
+        KEY_ENTER: 'enter',
+    })
+
+    def __init__(self, x, y, width, height, text='',
+                 bind_to=Component.BIND_TOP_LEFT):
+        super().__init__(x, y, bind_to=bind_to)
+        self._keymap = self.KEYMAP.copy()
+        self._width = width
+        self._height = height
+        self._top = 0
+        self._left = 0
+        self._row = 0
+        self._col = 0
+        self.text = text
+
+    @property
+    def text(self):
+        return str(self._buffer)
+
+    @text.setter
+    def text(self, new_text):
+        self._buffer = GapBuffer(new_text)
+        self._lines = _LineIndex(new_text)
+        self._row = min(self._row, len(self._lines) - 1)
+        self._col = min(self._col, self._line_length(self._row))
+        self._scroll_to_cursor()
+        self.invalidate()
+
+    @property
+    def line_count(self):
+        return len(self._lines)
+
+    @property
+    def cursor(self):
+        """The ``(column, line)`` of the cursor."""
+        return self._col, self._row
+
+    def _line_end(self, line):
+        """Get the offset of the end of a line, before its newline."""
+        if line + 1 < len(self._lines):
+            return self._lines.start(line + 1) - 1
+        return len(self._buffer)
+
+    def _line_length(self, line):
+        return self._line_end(line) - self._lines.start(line)
+
+    def line(self, line):
+        """Get the text of a line without its newline."""
+        return self._buffer.slice(self._lines.start(line),
+                                  self._line_end(line))
+
+    def _offset(self):
+        return self._lines.start(self._row) + self._col
+
+    def insert(self, text):
+        """Insert text at the cursor and move the cursor after it."""
+        offset = self._offset()
+        self._buffer.insert(offset, text)
+        self._lines.insert(offset, text)
+        self._set_cursor(offset + len(text))
+
+    def _set_cursor(self, offset):
+        self._row = self._lines.line_of(offset)
+        self._col = offset - self._lines.start(self._row)
+        self._scroll_to_cursor()
+        self.invalidate()
+
+    def _scroll_to_cursor(self):
+        self._top = min(max(self._top, self._row - self._height + 1),
+                        self._row)
+        self._left = min(max(self._left, self._col - self._width + 1),
+                         self._col)
+
+    def _handle_delete(self):
+        offset = self._offset()
+        if offset == 0:
+            return
+        self._buffer.delete(offset - 1)
+        self._lines.delete(offset - 1, 1)
+        self._set_cursor(offset - 1)
+
+    @property
+    def keymap(self):
+        """The :class:`splutter.keymap.Keymap` of the area's bindings."""
+        return self._keymap
+
+    def action_left(self, event, window):
+        offset = self._offset()
+        if offset > 0:
+            self._set_cursor(offset - 1)
+
+    def action_right(self, event, window):
+        offset = self._offset()
+        if offset < len(self._buffer):
+            self._set_cursor(offset + 1)
+
+    def action_up(self, event, window):
+        if self._row > 0:
+            self._move_row(self._row - 1)
+
+    def action_down(self, event, window):
+        if self._row + 1 < len(self._lines):
+            self._move_row(self._row + 1)
+
+    def action_delete(self, event, window):
+        self._handle_delete()
+
+    def action_enter(self, event, window):
+        self.insert('\n')
+
+    def _move_row(self, row):
+        self._row = row
+        self._col = min(self._col, self._line_length(row))
+        self._scroll_to_cursor()
+        self.invalidate()
+
+    def handle_event(self, event, window):
+        if event.event_type == WindowEvent.PASTE_EVENT:
+            self.insert(_pasteable(event.text, '\t\n'))
+        elif not self._keymap.dispatch(event, self, window):
+            printable = event.printable()
+            if not printable:
+                return
+            self.insert(printable)
+        event.stop_propagation()
+
+    def _render(self, x, y, window):
+        last = min(self._top + self._height, len(self._lines))
+        for y_offset, line in enumerate(range(self._top, last), y):
+            start = self._lines.start(line) + self._left
+            end = min(start + self._width, self._line_end(line))
+            if start < end:
+                window.add_spans(x, y_offset,
+                                 ((self._buffer.slice(start, end), None),))
+
+    def has_focus(self, x, y, window):
+        window.move_cursor(x + self.x + self._col - self._left,
+                           y + self.y + self._row - self._top)
@@ -1,24 +1,46 @@
+import os
+import sys
 import curses
-import string
+from array import array
+from collections import deque
 
 from splutter.colors import Color
-from splutter.keys import KEY_ESC
+from splutter.colors import PAIRS
+from splutter.escape import EscapeParser
+from splutter.events import WindowEvent
 
-
-_PRINTABLE_SET = set(string.printable)
+# array('u') is deprecated from Python 3.13 in favour of array('w').
+_CHAR_TYPECODE = 'w' if sys.version_info >= (3, 13) else 'u'
 
 
 class Window(object):
-    def __init__(self, window, default_color=None, curses_lib=curses):
+    # A burst of at least this many printable keys read at once is treated
+    # as pasted text rather than typing.
+    PASTE_THRESHOLD = 8
+
+    def __init__(self, window, default_color=None, curses_lib=curses,
+                 input_fd=None, escape_timeout=EscapeParser.DEFAULT_TIMEOUT,
+                 event_pool=None):
         self._window = window
+        self._pool = event_pool
+        self._parser = EscapeParser(escape_timeout, pool=event_pool)
+        self._events = deque()
         if default_color is None:
             default_color = Color()
         self._curses = curses_lib
+        self._input_fd = input_fd
         self._close_reason = None
         self._color = None
         self.default_color = default_color
         self.set_color(default_color)
         self.cursor_location = (None, None)
+        self._attrs = {}
+        self._pairs_generation = PAIRS.generation
+        self._rows = 0
+        self._cols = 0
+        self._clip = None
+        self._clip_rect = (0, 0, 0, 0)
+        self._resize()
 
     def set_color(self, color):
         self._color = color
@@ -35,37 +57,299 @@ class Window(object):
     def curses_window(self):
         return self._window
 
-    def erase(self):
+    def fileno(self):
+        """File descriptor that becomes readable when input is waiting.
+
+        Curses reads from stdin unless an ``input_fd`` was given.
+        """
+        if self._input_fd is not None:
+            return self._input_fd
+        return sys.stdin.fileno()
+
+    def terminal_resized(self):
+        """Tell curses the terminal changed size.
+
+        Curses only notices a resize when it next reads input, so this is
+        called when the terminal reports one. The window's buffers follow
+        the new size on the next :meth:`erase`.
+        """
+        resizeterm = getattr(self._curses, 'resizeterm', None)
+        if resizeterm is None:
+            return
+        try:
+            size = os.get_terminal_size(self.fileno())
+        except OSError:
+            # Input is not a terminal, so there is no size to follow.
+            return
+        resizeterm(size.lines, size.columns)
+
+    @property
+    def size(self):
+        """The ``(width, height)`` of the window in cells."""
+        return self._cols, self._rows
+
+    def _resize(self):
+        """Reallocate the cell buffers if the terminal changed size.
+
+        Drawing happens in a back buffer of characters and color ids, one
+        cell per entry in row major order. The front buffer holds what was
+        last sent to curses so :meth:`refresh` only sends changed cells.
+        """
+        rows, cols = self._window.getmaxyx()
+        if (rows, cols) == (self._rows, self._cols):
+            return
+        self._rows, self._cols = rows, cols
+        cells = rows * cols
+        self._blank_chars = array(_CHAR_TYPECODE, ' ') * cells
+        self._blank_colors = array('i', [self.default_color.COLOR_UID]) * cells
+        self._chars = array(_CHAR_TYPECODE, self._blank_chars)
+        self._colors = array('i', self._blank_colors)
+        self._front_chars = array(_CHAR_TYPECODE, self._blank_chars)
+        self._front_colors = array('i', self._blank_colors)
+        self.clip = self._clip
+        # The front buffer is blank, so make the terminal match it.
         self._window.erase()
 
+    def erase(self):
+        self._resize()
+        self._chars[:] = self._blank_chars
+        self._colors[:] = self._blank_colors
+
     def refresh(self):
+        self._flush()
+        # Drawing moves the curses cursor, so put it where it belongs.
+        self.update_cursor()
         self._window.refresh()
 
+    def _attr(self, color_uid):
+        attr = self._attrs.get(color_uid)
+        if attr is None:
+            # Pairs are set up the first time they are drawn with.
+            if color_uid:
+                self._curses.init_pair(color_uid, *PAIRS.colors(color_uid))
+            attr = self._attrs[color_uid] = self._curses.color_pair(color_uid)
+        return attr
+
+    def _flush(self):
+        """Send the cells that changed since the last flush to curses.
+
+        Rows that did not change are skipped with a single comparison. In a
+        changed row each run of cells with the same color is sent with one
+        ``addstr`` call, trimmed to the cells in it that changed.
+        """
+        if self._pairs_generation != PAIRS.generation:
+            # Some pair numbers now stand for other colors.
+            self._attrs = {}
+            self._pairs_generation = PAIRS.generation
+        cols = self._cols
+        chars, colors = self._chars, self._colors
+        front_chars, front_colors = self._front_chars, self._front_colors
+        for row in range(self._rows):
+            start = row * cols
+            end = start + cols
+            if (chars[start:end] == front_chars[start:end] and
+                    colors[start:end] == front_colors[start:end]):
+                continue
+            run_start = start
+            while run_start < end:
+                color = colors[run_start]
+                run_end = run_start + 1
+                while run_end < end and colors[run_end] == color:
+                    run_end += 1
+                first = last = None
+                for i in range(run_start, run_end):
+                    if (chars[i] != front_chars[i] or
+                            colors[i] != front_colors[i]):
+                        if first is None:
+                            first = i
+                        last = i
+                if first is not None:
+                    self._add_run(row, first - start,
+                                  chars[first:last + 1].tounicode(),
+                                  self._attr(color))
+                run_start = run_end
+            front_chars[start:end] = chars[start:end]
+            front_colors[start:end] = colors[start:end]
+
+    def _add_run(self, y, x, text, attr):
+        try:
+            self._window.addstr(y, x, text, attr)
+        except curses.error:
+            # Writing the bottom right cell moves the cursor off the
+            # screen, which curses reports as an error after drawing.
+            pass
+
+    @property
+    def clip(self):
+        """The ``(left, top, right, bottom)`` rectangle drawing is limited to.
+
+        None, the default, allows drawing anywhere in the window.
+        """
+        return self._clip
+
+    @clip.setter
+    def clip(self, rect):
+        self._clip = rect
+        left, top, right, bottom = 0, 0, self._cols, self._rows
+        if rect is not None:
+            left, top = max(left, rect[0]), max(top, rect[1])
+            right, bottom = min(right, rect[2]), min(bottom, rect[3])
+        self._clip_rect = left, top, right, bottom
+
+    def _fill(self, x, y, text, color_uid):
+        """Write text into the back buffer, clipped to the clip rectangle."""
+        left, top, right, bottom = self._clip_rect
+        if not top <= y < bottom or x >= right:
+            return
+        if x < left:
+            text = text[left - x:]
+            x = left
+        text = text[:right - x]
+        if not text:
+            return
+        start = y * self._cols + x
+        end = start + len(text)
+        self._chars[start:end] = array(_CHAR_TYPECODE, text)
+        self._colors[start:end] = array('i', [color_uid]) * len(text)
+
+    def erase_rect(self, x, y, width, height):
+        """Erase a rectangle of the window, clipped to the clip rectangle."""
+        if width <= 0:
+            return
+        blank = ' ' * width
+        color_uid = self.default_color.COLOR_UID
+        for row in range(max(y, 0), min(y + height, self._rows)):
+            self._fill(x, row, blank, color_uid)
+
     def add_string(self, x, y, string, color=None):
         if color is None:
             color = self._color
-        attr = self._curses.color_pair(color.COLOR_UID)
-        self._window.addstr(y, x, string, attr)
+        self._fill(x, y, string, color.COLOR_UID)
+
+    def add_spans(self, x, y, spans):
+        """Draw a line made of ``(text, color)`` spans, one after another.
+
+        A color of None draws in the current color. The spans are clipped
+        to the clip rectangle before anything is written and the line goes
+        into the back buffer as a single slice. Neighbouring spans with the
+        same color are sent to curses as one ``addstr`` when the window is
+        refreshed.
+        """
+        left, top, right, bottom = self._clip_rect
+        if not top <= y < bottom or x >= right:
+            return
+        texts = []
+        colors = array('i')
+        start = None
+        column = x
+        for text, color in spans:
+            end = column + len(text)
+            if end > left:
+                if column < left:
+                    text = text[left - column:]
+                    column = left
+                if start is None:
+                    start = column
+                text = text[:right - column]
+                if color is None:
+                    color = self._color
+                texts.append(text)
+                colors.extend(array('i', [color.COLOR_UID]) * len(text))
+            column = end
+            if column >= right:
+                break
+        if not colors:
+            return
+        start += y * self._cols
+        end = start + len(colors)
+        self._chars[start:end] = array(_CHAR_TYPECODE, ''.join(texts))
+        self._colors[start:end] = colors
 
     def add_char(self, x, y, char, color=None):
         if color is None:
             color = self._color
-        attr = self._curses.color_pair(color.COLOR_UID)
-        self._window.addch(y, x, char, attr)
+        if isinstance(char, int):
+            char = chr(char)
+        self._fill(x, y, char, color.COLOR_UID)
+
+    @property
+    def escape_timeout(self):
+        """Seconds to wait for the rest of an escape sequence."""
+        return self._parser.timeout
+
+    @escape_timeout.setter
+    def escape_timeout(self, timeout):
+        self._parser.timeout = timeout
+
+    def input_timeout(self):
+        """Seconds until held back input is delivered without more input.
 
-    def _create_event_from_code(self, code):
-        if code < 0:
-            return None
-        if code == KEY_ESC:
-            real_key = self._window.getch()
-            return WindowEvent(real_key, WindowEvent.KEY_EVENT, modifier=code)
-        return WindowEvent(code, WindowEvent.KEY_EVENT)
+        After an ``ESC`` key the window waits briefly to see whether it
+        starts an escape sequence. Event loops should poll again after
+        this long even if no more input arrives.
+
+        :returns: None if no input is held back.
+        """
+        return self._parser.pending_timeout()
+
+    def _read_events(self):
+        """Read all waiting input, returning the events it completes."""
+        parser = self._parser
+        events = []
+        code = self._window.getch()
+        while code >= 0:
+            events.extend(parser.feed(code))
+            code = self._window.getch()
+        events.extend(parser.flush_expired())
+        return events
 
     def get_event(self):
         """Get an event from the window system."""
-        input_ch = self._window.getch()
-        event = self._create_event_from_code(input_ch)
-        return event
+        if not self._events:
+            self._events.extend(self._read_events())
+        if self._events:
+            return self._events.popleft()
+        return None
+
+    def get_events(self):
+        """Get every event that is waiting in the window system.
+
+        Runs of :attr:`PASTE_THRESHOLD` or more printable keys, as produced
+        by pasting text, are returned as a single
+        :attr:`WindowEvent.PASTE_EVENT` so they can be handled at once.
+        """
+        events = list(self._events)
+        self._events.clear()
+        events.extend(self._read_events())
+        return self._coalesce_pastes(events)
+
+    def release_events(self, events):
+        """Recycle events once they have been handled.
+
+        This does nothing unless the window was given an ``event_pool``.
+        """
+        if self._pool is not None:
+            for event in events:
+                self._pool.release(event)
+
+    def _coalesce_pastes(self, events):
+        coalesced = []
+        run = []
+        for event in events + [None]:
+            if (event is not None and event.modifier is None and
+                    event.printable() is not None):
+                run.append(event)
+                continue
+            if len(run) >= self.PASTE_THRESHOLD:
+                text = ''.join(chr(key.code) for key in run)
+                coalesced.append(WindowEvent.paste(text))
+                self.release_events(run)
+            else:
+                coalesced.extend(run)
+            run = []
+            if event is not None:
+                coalesced.append(event)
+        return coalesced
 
     def get_cursor_location(self):
         y, x = self._window.getyx()
@@ -81,46 +365,6 @@ class Window(object):
             self._window.cursyncup()
 
 
-class WindowEvent(object):
-    KEY_EVENT = 1
-    MOUSE_EVENT = 2
-
-    def __init__(self, code, event_type, modifier=None):
-        self._propagate = True
-        self._code = code
-        self._event_type = event_type
-        self._modifier = modifier
-
-    def stop_propagation(self):
-        self._propagate = False
-
-    @property
-    def should_handle(self):
-        return self._propagate
-
-    def __hash__(self):
-        return self._code
-
-    def __eq__(self, other):
-        if isinstance(other, WindowEvent):
-            return self._code == other._code
-        elif isinstance(other, int):
-            return self._code == other
-        elif isinstance(other, str):
-            return chr(self._code).lower() == other.lower()
-        return False
-
-    def printable(self):
-        """Return a printable character if possible."""
-        strcode = chr(self._code)
-        if set(strcode).issubset(_PRINTABLE_SET):
-            return strcode
-        return None
-
-    def __neq__(self, other):
-        return not self == other
-
-
 class EventBus(object):
     def __init__(self, controller):
         self._controller = controller
@@ -131,10 +375,28 @@ class EventBus(object):
         An event first trickles down to the bottom level view, and then
         bubbles back up the view stack, and lastly calls the handle_event
         method defined on the parent controller.
+
+        Mouse events go to the component under the pointer instead of the
+        active one. Paste events that no component handles are sent again
+        as one key event per character.
         """
-        stack = top_view.get_active_component_stack([])
+        if event.event_type == WindowEvent.MOUSE_EVENT:
+            stack = top_view.get_component_stack_at(event.x, event.y, [])
+        elif top_view is self._controller.active_view:
+            stack = self._controller.focus_chain
+        else:
+            stack = top_view.get_active_component_stack([])
         for component in reversed(stack):
-            if component is not None and event.should_handle:
+            if not event.should_handle:
+                break
+            if component is not None:
                 component.handle_event(event, window)
-        if event.should_handle:
+        if not event.should_handle:
+            return
+        if event.event_type == WindowEvent.PASTE_EVENT:
+            for char in event.text:
+                self.propagate_event(
+                    WindowEvent(ord(char), WindowEvent.KEY_EVENT),
+                    top_view, window)
+        else:
             self._controller.handle_event(event, window)
@@ -1,5 +1,25 @@
 import pytest
 
+from splutter.headless import HeadlessCurses
+from splutter.headless import HeadlessScreen
 
-class FakeCurses(object):
-    pass
+
+FakeCurses = HeadlessCurses
+
+
+class FakeScreen(HeadlessScreen):
+    """Headless screen that also logs the strings drawn on it."""
+    def __init__(self):
+        super().__init__()
+        self.strings = []
+
+    def addstr(self, y, x, string, attr=0):
+        self.strings.append((x, y, string))
+        super().addstr(y, x, string, attr)
+
+
+@pytest.fixture
+def fake_screen():
+    screen = FakeScreen()
+    yield screen
+    screen.close()
@@ -0,0 +1,82 @@
+import pytest
+
+from tests.conftest import FakeCurses
+
+from splutter.art import Art
+from splutter.colors import Color
+from splutter.colors import RED
+from splutter.core import Controller
+from splutter.core import View
+from splutter.window import Window
+
+
+class IgnoringController(Controller):
+    def handle_event(self, event, window):
+        pass
+
+
+def _controller(*components):
+    controller = IgnoringController()
+    view = View()
+    for i, component in enumerate(components):
+        view.add_component('art%d' % i, component)
+    controller.add_view('main', view)
+    return controller
+
+
+class TestArtCells(object):
+    def test_entries(self):
+        art = Art(0, 0, 'ab\nc')
+        assert (art.width, art.height) == (2, 2)
+        art.set_entry(1, 1, 'd')
+        assert art.get_entry(1, 1) == 'd'
+        with pytest.raises(IndexError):
+            art.set_entry(2, 0, 'x')
+
+    def test_blit_is_clipped(self):
+        art = Art(0, 0, '\n'.join(['....'] * 3))
+        art.blit(-1, 1, 'abc\ndef\nghi')
+        art.fill(3, 0, 5, 1, '#')
+        assert [''.join(art.get_entry(x, y) for x in range(4))
+                for y in range(3)] == ['...#', 'bc..', 'ef..']
+
+    def test_colored_cells_are_drawn_as_spans(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        red = Color(fg=RED)
+        art = Art(0, 0, 'abcd  ')
+        art.fill(1, 0, 2, 1, 'x', red)
+        art.render(0, 0, window)
+        window.refresh()
+        assert fake_screen.strings == [(0, 0, 'a'), (1, 0, 'xx'),
+                                       (3, 0, 'd')]
+        assert fake_screen.attr_at(1, 0) == red.COLOR_UID << 8
+
+    def test_equal_colors_share_a_palette_entry(self):
+        art = Art(0, 0, '.' * 10)
+        for x in range(10):
+            art.set_entry(x, 0, '#', Color(fg=RED))
+        assert len(art._palette) == 2
+
+
+class TestArtDirtyRows(object):
+    def test_only_written_rows_are_redrawn(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        art = Art(0, 0, '\n'.join(['.' * 10] * 5))
+        controller = _controller(art)
+        controller._draw(window)
+        art.set_entry(3, 2, '#')
+        art.set_entry(4, 3, '#')
+        assert art.damage() == [(0, 2, 10, 4)]
+        fake_screen.strings = []
+        controller._draw(window)
+        assert fake_screen.strings == [(3, 2, '#'), (4, 3, '#')]
+
+    def test_rows_drawn_over_from_beneath_are_redrawn(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        lower = Art(0, 0, 'xxxxx\nxxxxx')
+        upper = Art(0, 0, 'ab\ncd')
+        controller = _controller(lower, upper)
+        controller._draw(window)
+        upper.set_entry(0, 0, 'Z')
+        controller._draw(window)
+        assert fake_screen.lines()[:2] == ['Zbxxx', 'cdxxx']
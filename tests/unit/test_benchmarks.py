@@ -0,0 +1,12 @@
+import json
+
+from benchmarks import suite
+
+
+def test_suite_runs_and_reports_json():
+    report = suite.run(frames=3)
+    assert set(report['results']) == set(name for name, _ in suite.BENCHMARKS)
+    table = report['results']['table_1k']
+    assert table['frames'] == 3
+    assert table['curses_calls_per_frame'] > 0
+    json.dumps(report)
@@ -0,0 +1,74 @@
+from tests.conftest import FakeCurses
+
+from splutter import colors
+from splutter.colors import BLACK
+from splutter.colors import BLUE
+from splutter.colors import Color
+from splutter.colors import ColorPairs
+from splutter.colors import GREEN
+from splutter.colors import RED
+from splutter.colors import WHITE
+from splutter.window import Window
+
+
+class RecordingCurses(FakeCurses):
+    def __init__(self):
+        self.pairs = []
+
+    def init_pair(self, pair_number, fg, bg):
+        self.pairs.append((pair_number, fg, bg))
+
+
+class TestColorPairs(object):
+    def test_identical_colors_share_a_pair(self):
+        pairs = ColorPairs(limit=8)
+        first = pairs.acquire(WHITE, BLACK)
+        assert pairs.acquire(WHITE, BLACK) == first
+        assert pairs.acquire(RED, BLACK) != first
+        assert len(pairs) == 2
+        assert pairs.colors(first) == (WHITE, BLACK)
+
+    def test_released_pairs_are_reused_least_recently_used_first(self):
+        pairs = ColorPairs(limit=3)
+        red = pairs.acquire(RED, BLACK)
+        green = pairs.acquire(GREEN, BLACK)
+        pairs.release(green)
+        pairs.release(red)
+        assert pairs.acquire(BLUE, BLACK) == green
+        assert pairs.generation == 1
+        # Red kept its pair while it was not needed.
+        assert pairs.acquire(RED, BLACK) == red
+        assert pairs.generation == 1
+
+    def test_pairs_in_use_are_never_reused(self):
+        pairs = ColorPairs(limit=2)
+        red = pairs.acquire(RED, BLACK)
+        pairs.acquire(RED, BLACK)
+        pairs.release(red)
+        assert pairs.acquire(GREEN, BLACK) == 0
+        assert pairs.colors(red) == (RED, BLACK)
+
+
+class TestColor(object):
+    def test_colors_share_pairs_and_release_them(self, monkeypatch):
+        monkeypatch.setattr(colors, 'PAIRS', ColorPairs(limit=3))
+        first = Color(fg=RED)
+        second = Color(fg=RED)
+        assert first.COLOR_UID == second.COLOR_UID
+        second.change_color(fg=GREEN)
+        assert second.COLOR_UID != first.COLOR_UID
+        red = first.COLOR_UID
+        del first
+        assert colors.PAIRS.acquire(GREEN, BLUE) == red
+
+    def test_window_initialises_pairs_once_when_drawn(self, fake_screen):
+        curses_lib = RecordingCurses()
+        window = Window(fake_screen, curses_lib=curses_lib)
+        color = Color(fg=BLUE, bg=WHITE)
+        assert curses_lib.pairs == []
+        window.add_string(0, 0, 'ab', color)
+        window.add_string(0, 1, 'cd', color)
+        window.refresh()
+        window.add_string(0, 0, 'ef', color)
+        window.refresh()
+        assert curses_lib.pairs == [(color.COLOR_UID, BLUE, WHITE)]
@@ -0,0 +1,407 @@
+import os
+import signal
+import asyncio
+import threading
+
+import pytest
+
+from tests.conftest import FakeCurses
+
+from splutter.art import Art
+from splutter.core import Controller
+from splutter.core import View
+from splutter.exceptions import CloseSplutterWindow
+from splutter.scheduler import FrameScheduler
+from splutter.text import TextField
+from splutter.window import Window
+from splutter.window import WindowEvent
+
+
+class QuitController(Controller):
+    def __init__(self, fps=None):
+        super().__init__(fps=fps)
+        self.events = []
+        self.add_view('main', View())
+        self.active_view = 'main'
+
+    def handle_event(self, event, window):
+        self.events.append(event)
+        if event == 'q':
+            raise CloseSplutterWindow('quit')
+
+
+class EarlyTimerScheduler(FrameScheduler):
+    """Acts as if the frame timer fires just before each frame is due."""
+    def __init__(self):
+        super().__init__(fps=20)
+        self._early = 0
+
+    def next_frame_in(self):
+        if self._early:
+            self._early -= 1
+            return 0.001
+        return 0
+
+    def frame_drawn(self):
+        super().frame_drawn()
+        # Enough checks for the timer to be set and then fire early.
+        self._early = 3
+
+
+def _run(controller, window, *timers):
+    async def _attach():
+        for delay, callback, args in timers:
+            controller.call_later(delay, callback, *args)
+        await asyncio.wait_for(
+            controller.attach_to_window(window, mode=Controller.LOOP_EVENT),
+            2)
+    asyncio.run(_attach())
+
+
+class TestEventLoop(object):
+    def test_idle_loop_does_not_redraw(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController()
+        _run(controller, window, (0.05, fake_screen.feed, (b'q',)))
+        assert window.close_reason == 'quit'
+        # Only the initial frame is drawn while waiting for input.
+        assert fake_screen.frames == 1
+
+    def test_input_is_drained_in_one_wakeup(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController()
+        fake_screen.feed(b'ab')
+        _run(controller, window, (0.05, fake_screen.feed, (b'q',)))
+        assert controller.events == ['a', 'b', 'q']
+        # The first frame covers both queued keys.
+        assert fake_screen.frames == 1
+
+    def test_unhandled_paste_is_sent_as_keys(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController()
+        fake_screen.feed(b'pasted text q')
+        _run(controller, window)
+        assert controller.events == list('pasted text q')
+
+    def test_invalidate_wakes_loop(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController()
+
+        def _stop():
+            raise CloseSplutterWindow('done')
+
+        _run(controller, window,
+             (0.01, controller.invalidate, ()), (0.05, _stop, ()))
+        assert window.close_reason == 'done'
+        assert fake_screen.frames == 2
+
+    def test_frame_is_drawn_if_timer_fires_early(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController()
+        controller._scheduler = EarlyTimerScheduler()
+
+        def _stop():
+            raise CloseSplutterWindow('done')
+
+        _run(controller, window,
+             (0.01, controller.invalidate, ()), (0.1, _stop, ()))
+        assert fake_screen.frames == 2
+
+    @pytest.mark.skipif(not hasattr(signal, 'SIGWINCH'),
+                        reason='No resize signal on this platform')
+    def test_resize_signal_wakes_loop(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController()
+
+        def _stop():
+            raise CloseSplutterWindow('done')
+
+        # Sent from another thread, as timers of the loop ask for a frame.
+        resize = threading.Timer(0.01, os.kill,
+                                 (os.getpid(), signal.SIGWINCH))
+        resize.start()
+        _run(controller, window, (0.05, _stop, ()))
+        resize.join()
+        assert fake_screen.frames == 2
+        # The handler is removed with the loop.
+        assert signal.getsignal(signal.SIGWINCH) == signal.SIG_DFL
+
+    def test_updates_are_merged_into_capped_frames(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController(fps=20)
+        field = TextField(0, 0)
+        controller.get_view('main').add_component('field', field)
+
+        def _update(count):
+            field.text = str(count)
+            if count < 300:
+                controller.call_later(0.001, _update, count + 1)
+
+        def _stop():
+            raise CloseSplutterWindow('done')
+
+        _run(controller, window, (0, _update, (0,)), (0.25, _stop, ()))
+        # Roughly 5 frames at 20 fps rather than one per update.
+        assert 2 <= fake_screen.frames <= 7
+
+
+class CountingField(TextField):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.renders = 0
+
+    def _render(self, x, y, window):
+        self.renders += 1
+        super()._render(x, y, window)
+
+
+class TestDirtyRendering(object):
+    def _draw(self, fake_screen):
+        controller = QuitController()
+        view = controller.get_view('main')
+        view.add_component('first', CountingField(0, 0, width=5, text='one'))
+        view.add_component('second', CountingField(0, 1, width=5, text='two'))
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        controller._draw(window)
+        fake_screen.strings = []
+        return lambda: controller._draw(window), view
+
+    def test_clean_frame_draws_nothing(self, fake_screen):
+        draw, view = self._draw(fake_screen)
+        draw()
+        assert view.get_component('first').renders == 1
+        assert view.get_component('second').renders == 1
+        assert fake_screen.strings == []
+
+    def test_only_dirty_component_is_redrawn(self, fake_screen):
+        draw, view = self._draw(fake_screen)
+        view.get_component('second').text = 'three'
+        draw()
+        assert view.get_component('first').renders == 1
+        assert view.get_component('second').renders == 2
+        assert fake_screen.strings == [(1, 1, 'hree')]
+
+    def test_overlapping_components_are_redrawn(self, fake_screen):
+        draw, view = self._draw(fake_screen)
+        view.get_component('first').move(y=1)
+        draw()
+        assert view.get_component('first').renders == 2
+        assert view.get_component('second').renders == 2
+
+    def test_moved_component_erases_old_location(self, fake_screen):
+        draw, view = self._draw(fake_screen)
+        view.get_component('second').move(y=3)
+        draw()
+        assert fake_screen.strings == [(0, 1, '   '), (0, 3, 'two')]
+
+    def test_removed_component_is_erased(self, fake_screen):
+        draw, view = self._draw(fake_screen)
+        view.remove_component('first')
+        draw()
+        assert fake_screen.strings == [(0, 0, '   ')]
+
+
+class TestCulling(object):
+    def _draw(self, fake_screen, *components):
+        controller = QuitController()
+        view = controller.get_view('main')
+        for i, component in enumerate(components):
+            view.add_component(i, component)
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        controller._draw(window)
+        return lambda: controller._draw(window)
+
+    def test_higher_layers_are_drawn_on_top(self, fake_screen):
+        top = CountingField(0, 0, width=5, text='top')
+        top.z = 1
+        self._draw(fake_screen, top, CountingField(0, 0, width=5, text='low'))
+        assert fake_screen.strings == [(0, 0, 'top')]
+
+    def test_top_level_views_are_drawn_by_layer(self, fake_screen):
+        controller = QuitController()
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        views = {}
+        for name in 'ab':
+            views[name] = View()
+            views[name].add_component('art', Art(0, 0, name * 3))
+            controller.add_view(name, views[name])
+        views['a'].z = 5
+        views['b'].z = -5
+        controller._draw(window)
+        assert fake_screen.lines()[0] == 'aaa'
+        views['a'].z, views['b'].z = -5, 5
+        controller._draw(window)
+        assert fake_screen.lines()[0] == 'bbb'
+
+    def test_cursor_is_moved_once_per_frame(self, fake_screen):
+        controller = QuitController()
+        view = controller.get_view('main')
+        view.add_component('field', CountingField(0, 0, width=5, text='abc'))
+        view.active_component = 'field'
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        controller._draw(window)
+        assert fake_screen.call_counts['move'] == 1
+        # The cursor is put back even when nothing else is drawn.
+        controller._draw(window)
+        assert fake_screen.call_counts['move'] == 2
+
+    def test_occluded_components_are_skipped(self, fake_screen):
+        hidden = CountingField(1, 0, width=2, text='no')
+        left = CountingField(0, 0, width=2, text='ab')
+        right = CountingField(3, 0, width=2, text='cd')
+        left.opaque = right.opaque = True
+        draw = self._draw(fake_screen, hidden, left, right)
+        assert hidden.renders == 0
+        assert fake_screen.strings == [(0, 0, 'ab cd')]
+        # Moving the cover away shows what was beneath.
+        right.move(y=2)
+        draw()
+        assert hidden.renders == 1
+
+    def test_off_screen_components_are_skipped(self, fake_screen):
+        gone = CountingField(0, 30, width=5, text='gone')
+        self._draw(fake_screen, gone)
+        assert gone.renders == 0
+        assert fake_screen.strings == []
+
+    def test_components_are_clipped_to_their_bounds(self, fake_screen):
+        art = Art(78, 0, 'wide\ntall\nart')
+        art._height = 2
+        self._draw(fake_screen, art)
+        assert fake_screen.strings == [(78, 0, 'wi'), (78, 1, 'ta')]
+
+
+class RecordingField(TextField):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.events = []
+
+    def handle_event(self, event, window):
+        self.events.append(event)
+        if event.event_type == WindowEvent.MOUSE_EVENT:
+            event.stop_propagation()
+
+
+class TestMouseRouting(object):
+    def _view(self):
+        view = View(x=2, y=1)
+        view.add_component('under', RecordingField(0, 0, width=9))
+        view.add_component('over', RecordingField(4, 0, width=2))
+        return view
+
+    def test_component_at(self):
+        view = self._view()
+        under = view.get_component('under')
+        over = view.get_component('over')
+        assert view.component_at(2, 1) is under
+        assert view.component_at(7, 1) is over
+        assert view.component_at(1, 1) is None
+        assert view.component_at(2, 2) is None
+
+    def test_index_follows_moves_and_removals(self):
+        view = self._view()
+        over = view.get_component('over')
+        over.move(y=5)
+        assert view.component_at(7, 6) is over
+        assert view.component_at(7, 1) is view.get_component('under')
+        view.remove_component('over')
+        assert view.component_at(7, 6) is None
+
+    def test_replaced_component_keeps_its_place(self):
+        view = self._view()
+        under = RecordingField(0, 0, width=9)
+        view.add_component('under', under)
+        assert view.component_at(7, 1) is view.get_component('over')
+        assert view.component_at(2, 1) is under
+
+    def test_query_rect_and_point_use_view_coordinates(self):
+        view = self._view()
+        under = view.get_component('under')
+        over = view.get_component('over')
+        assert view.query_point(5, 0) == [under, over]
+        assert view.query_point(0, 0) == [under]
+        assert view.query_rect((7, 0, 20, 1)) == [under]
+        assert view.query_rect((0, 1, 20, 5)) == []
+
+    def test_overlaps(self):
+        view = self._view()
+        under = view.get_component('under')
+        over = view.get_component('over')
+        assert under.overlaps(over)
+        over.move(x=10)
+        assert not under.overlaps(over)
+        assert not under.overlaps(RecordingField(0, 0, width=-1))
+
+    def test_mouse_events_go_to_component_under_pointer(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController()
+        view = self._view()
+        controller.add_view('main', view)
+        controller.active_view = 'main'
+        view.active_component = 'under'
+        fake_screen.feed(b'\x1b[<0;8;2M\x1b[<0;1;1Mq')
+        _run(controller, window)
+        click = view.get_component('over').events
+        assert [(e.x, e.y) for e in click] == [(7, 1)]
+        assert view.get_component('under').events == ['q']
+        # Nothing was under the second click so only the controller sees it.
+        assert [e.event_type for e in controller.events] == [
+            WindowEvent.MOUSE_EVENT, WindowEvent.KEY_EVENT]
+
+
+class TestFocusChain(object):
+    def _controller(self):
+        controller = QuitController()
+        outer = controller.get_view('main')
+        inner = View(x=3, y=2)
+        inner.add_component('field', RecordingField(1, 1, width=4))
+        outer.add_component('inner', inner)
+        outer.active_component = 'inner'
+        inner.active_component = 'field'
+        return controller, outer, inner
+
+    def test_nested_views_are_in_the_chain(self):
+        controller, outer, inner = self._controller()
+        field = inner.get_component('field')
+        assert controller.focus_chain == (outer, inner, field)
+
+    def test_chain_is_cached_until_focus_changes(self):
+        controller, outer, inner = self._controller()
+        chain = controller.focus_chain
+        assert controller.focus_chain is chain
+        inner.active_component = None
+        assert controller.focus_chain == (outer, inner)
+        other = RecordingField(0, 0, width=1)
+        inner.add_component('other', other)
+        inner.active_component = 'other'
+        assert controller.focus_chain == (outer, inner, other)
+        controller.add_view('second', View())
+        controller.active_view = 'second'
+        assert controller.focus_chain == (controller.get_view('second'),)
+
+    def test_nested_views_render_relative_to_parent(self, fake_screen):
+        controller, outer, inner = self._controller()
+        outer.move(x=10)
+        inner.get_component('field').text = 'hi'
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        controller._draw(window)
+        assert fake_screen.strings == [(14, 3, 'hi')]
+        assert outer.component_at(14, 3) is inner
+        assert outer.get_component_stack_at(14, 3, []) == [
+            outer, inner, inner.get_component('field')]
+
+    def test_key_events_reach_nested_component(self, fake_screen):
+        controller, outer, inner = self._controller()
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        fake_screen.feed(b'xq')
+        _run(controller, window)
+        assert inner.get_component('field').events == ['x', 'q']
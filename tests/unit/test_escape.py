@@ -0,0 +1,106 @@
+import pytest
+
+from tests.conftest import FakeCurses
+from tests.unit.test_scheduler import FakeClock
+from tests.unit.test_window import ScriptedWindow
+
+from splutter import keys
+from splutter.escape import EscapeParser
+from splutter.window import Window
+from splutter.window import WindowEvent
+
+
+def _feed(parser, data):
+    events = []
+    for code in data:
+        if isinstance(code, str):
+            code = ord(code)
+        events.extend(parser.feed(code))
+    return events
+
+
+class TestEscapeParser(object):
+    def test_alt_key(self):
+        events = _feed(EscapeParser(), '\x1bx')
+        assert events == ['x']
+        assert events[0].modifier == keys.KEY_ALT
+
+    def test_lone_escape_waits_for_timeout(self):
+        clock = FakeClock()
+        parser = EscapeParser(timeout=0.05, clock=clock)
+        assert _feed(parser, '\x1b') == []
+        assert parser.pending_timeout() == pytest.approx(0.05)
+        assert parser.flush_expired() == []
+        clock.now += 0.06
+        events = parser.flush_expired()
+        assert events == [keys.KEY_ESC]
+        assert events[0].modifier is None
+        assert parser.pending_timeout() is None
+
+    def test_function_keys(self):
+        events = _feed(EscapeParser(), '\x1b[A\x1bOB\x1b[3~\x1b[15~\x1bOP')
+        assert [e.code for e in events] == [
+            keys.KEY_UP, keys.KEY_DOWN, keys.KEY_DELETE_CHAR, keys.KEY_F(5),
+            keys.KEY_F(1)]
+        assert all(e.modifier is None for e in events)
+
+    def test_alt_arrow(self):
+        events = _feed(EscapeParser(), '\x1b[1;3C')
+        assert events == [keys.KEY_RIGHT]
+        assert events[0].modifier == keys.KEY_ALT
+
+    def test_unknown_sequence_is_dropped(self):
+        assert _feed(EscapeParser(), '\x1b[99;99qa') == ['a']
+
+    def test_bracketed_paste(self):
+        events = _feed(EscapeParser(), '\x1b[200~one\r\x1b[Atwo\x1b[201~x')
+        assert [e.event_type for e in events] == [
+            WindowEvent.PASTE_EVENT, WindowEvent.KEY_EVENT]
+        assert events[0].text == 'one\n\x1b[Atwo'
+
+    def test_paste_is_decoded_as_utf8(self):
+        data = '\x1b[200~h\xe9llo \u2713\x1b[201~'.encode('utf-8')
+        events = _feed(EscapeParser(), data)
+        assert events[0].text == 'h\xe9llo \u2713'
+
+    def test_escape_interrupting_a_sequence_starts_a_new_one(self):
+        events = _feed(EscapeParser(), '\x1b[\x1bx')
+        assert events == ['x']
+        assert events[0].modifier == keys.KEY_ALT
+
+    def test_sgr_mouse(self):
+        events = _feed(EscapeParser(), '\x1b[<0;5;3M\x1b[<0;5;3m\x1b[<65;1;1M')
+        assert [e.event_type for e in events] == [WindowEvent.MOUSE_EVENT] * 3
+        press, release, wheel = events
+        assert press.code == WindowEvent.BUTTON_LEFT
+        assert (press.x, press.y) == (4, 2)
+        assert press.action == WindowEvent.MOUSE_PRESS
+        assert release.action == WindowEvent.MOUSE_RELEASE
+        assert wheel.code == WindowEvent.BUTTON_WHEEL_DOWN
+        assert press != 0
+
+    def test_incomplete_sequence_is_replayed_as_keys(self):
+        clock = FakeClock()
+        parser = EscapeParser(clock=clock)
+        assert _feed(parser, '\x1b[1') == []
+        clock.now += 1
+        events = parser.flush_expired()
+        assert events == ['[', '1']
+        assert [e.modifier for e in events] == [keys.KEY_ALT, None]
+
+
+class TestWindowInput(object):
+    def test_sequences_split_across_reads(self):
+        screen = ScriptedWindow(b'\x1b[')
+        window = Window(screen, curses_lib=FakeCurses(), escape_timeout=60)
+        assert window.get_events() == []
+        assert window.input_timeout() == pytest.approx(60, abs=1)
+        screen.feed(b'Dq')
+        assert window.get_events() == [keys.KEY_LEFT, 'q']
+        assert window.input_timeout() is None
+
+    def test_get_event_queues_decoded_events(self):
+        window = Window(ScriptedWindow(b'\x1bOAz'), curses_lib=FakeCurses())
+        assert window.get_event() == keys.KEY_UP
+        assert window.get_event() == 'z'
+        assert window.get_event() is None
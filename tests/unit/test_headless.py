@@ -0,0 +1,64 @@
+import curses
+
+import pytest
+
+from tests.unit.test_core import QuitController
+from tests.unit.test_core import _run
+
+import splutter
+from splutter.art import Art
+from splutter.colors import BLUE
+from splutter.colors import Color
+from splutter.colors import WHITE
+from splutter.headless import HeadlessCurses
+from splutter.headless import HeadlessScreen
+
+
+class TestHeadlessScreen(object):
+    def test_drawing_is_kept_and_counted(self):
+        screen = HeadlessScreen(width=10, height=2)
+        screen.addstr(0, 2, 'héllo world', 1 << 8)
+        screen.addch(1, 0, ord('x'))
+        assert screen.lines() == ['  héllo wo', 'x']
+        assert screen.attr_at(2, 0) == 1 << 8
+        assert screen.call_counts['addstr'] == 1
+        assert screen.call_counts['addch'] == 1
+        assert screen.bytes_written == len('héllo world'.encode()) + 1
+        with pytest.raises(curses.error):
+            screen.addstr(2, 0, 'off the screen')
+
+    def test_scripted_input_arrives_after_each_refresh(self):
+        screen = HeadlessScreen(script=['a', [curses.KEY_UP]])
+        screen.feed(b'x')
+        assert screen.getch() == ord('x')
+        assert screen.getch() == -1
+        screen.refresh()
+        assert screen.getch() == ord('a')
+        screen.refresh()
+        assert screen.getch() == curses.KEY_UP
+        screen.close()
+
+
+class TestHeadlessCurses(object):
+    def test_init_draws_into_memory(self):
+        curses_lib = HeadlessCurses(width=20, height=5)
+        window = splutter.init(curses_lib, mouse=True)
+        color = Color(fg=BLUE, bg=WHITE)
+        Art(1, 1, 'one\ntwo').render(0, 0, window)
+        window.add_string(0, 4, 'blue', color)
+        window.refresh()
+        assert curses_lib.screen.lines() == ['', ' one', ' two', '', 'blue']
+        assert curses_lib.colors_at(0, 4) == (BLUE, WHITE)
+        assert curses_lib.terminal_output == [
+            splutter.BRACKETED_PASTE_ON, splutter.MOUSE_ON]
+        splutter.cleanup(window, curses_lib)
+        curses_lib.screen.close()
+
+    def test_event_loop_reads_scripted_input(self):
+        curses_lib = HeadlessCurses()
+        window = splutter.init(curses_lib, bracketed_paste=False)
+        curses_lib.screen.feed('ab')
+        controller = QuitController()
+        _run(controller, window, (0.05, curses_lib.screen.feed, ('q',)))
+        assert controller.events == ['a', 'b', 'q']
+        curses_lib.screen.close()
@@ -0,0 +1,77 @@
+import pytest
+
+from splutter.keymap import Keymap
+from splutter.keymap import key
+from splutter.keys import KEY_ALT, KEY_DOWN, KEY_UP
+from splutter.window import WindowEvent
+
+
+def _key(char, modifier=None):
+    code = ord(char) if isinstance(char, str) else char
+    return WindowEvent(code, WindowEvent.KEY_EVENT, modifier=modifier)
+
+
+class Target(object):
+    def __init__(self):
+        self.actions = []
+
+    def action_up(self, event, window):
+        self.actions.append('up')
+
+    def action_top(self, event, window):
+        self.actions.append('top')
+
+
+class TestKeymap(object):
+    def test_key_specs(self):
+        assert key('a') == (ord('a'), None)
+        assert key(KEY_UP) == key('up') == (KEY_UP, None)
+        assert key('alt+x') == (ord('x'), KEY_ALT)
+        assert key(_key('x', KEY_ALT)) == (ord('x'), KEY_ALT)
+        with pytest.raises(ValueError):
+            key('nonsense')
+
+    def test_lookup(self):
+        keymap = Keymap({KEY_UP: 'up', 'alt+q': 'quit'})
+        assert keymap.lookup(_key(KEY_UP)) == 'up'
+        assert keymap.lookup(_key('q')) is None
+        assert keymap.lookup(_key('q', KEY_ALT)) == 'quit'
+        assert keymap.lookup(WindowEvent.paste('q')) is None
+
+    def test_sequences(self):
+        keymap = Keymap({('g', 'g'): 'top', 'j': 'down'})
+        assert keymap.lookup(_key('g')) is Keymap.PREFIX
+        assert keymap.pending
+        assert keymap.lookup(_key('g')) == 'top'
+        assert not keymap.pending
+        # An abandoned sequence starts over from the key that broke it.
+        keymap.lookup(_key('g'))
+        assert keymap.lookup(_key('j')) == 'down'
+
+    def test_modes_fall_back_to_global_bindings(self):
+        keymap = Keymap({'q': 'quit'})
+        keymap.bind('q', 'type', mode='insert')
+        keymap.bind('x', 'delete', mode='control')
+        assert keymap.lookup(_key('q'), mode='insert') == 'type'
+        assert keymap.lookup(_key('q'), mode='control') == 'quit'
+        assert keymap.lookup(_key('x'), mode='insert') is None
+
+    def test_bindings_can_be_listed_and_changed(self):
+        keymap = Keymap({KEY_UP: 'up', ('g', 'g'): 'top'})
+        assert keymap.describe() == [('g g', 'top'), ('up', 'up')]
+        copy = keymap.copy()
+        copy.bind('k', 'up')
+        copy.unbind(('g', 'g'))
+        assert copy.describe() == [('k', 'up'), ('up', 'up')]
+        assert keymap.describe() == [('g g', 'top'), ('up', 'up')]
+        with pytest.raises(ValueError):
+            keymap.bind('g', 'oops')
+
+    def test_dispatch(self):
+        keymap = Keymap({KEY_UP: 'up', ('g', 'g'): 'top'})
+        target = Target()
+        assert keymap.dispatch(_key(KEY_UP), target, None)
+        assert keymap.dispatch(_key('g'), target, None)
+        assert keymap.dispatch(_key('g'), target, None)
+        assert not keymap.dispatch(_key(KEY_DOWN), target, None)
+        assert target.actions == ['up', 'top']
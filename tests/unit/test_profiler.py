@@ -0,0 +1,119 @@
+import json
+
+from tests.conftest import FakeCurses
+from tests.unit.test_core import QuitController
+from tests.unit.test_core import _run
+from tests.unit.test_scheduler import FakeClock
+
+from splutter.art import Art
+from splutter.core import Controller
+from splutter.core import View
+from splutter.exceptions import CloseSplutterWindow
+from splutter.profiler import FrameProfiler
+from splutter.profiler import ProfilerOverlay
+from splutter.text import TextField
+from splutter.window import Window
+
+
+class IgnoringController(Controller):
+    def handle_event(self, event, window):
+        pass
+
+
+def _frame(profiler, clock, phases):
+    for phase, duration in phases:
+        profiler.begin(phase)
+        clock.now += duration
+    profiler.end_frame()
+
+
+class TestFrameProfiler(object):
+    def test_summary_averages_frames(self):
+        clock = FakeClock()
+        profiler = FrameProfiler(capacity=2, clock=clock)
+        for _ in range(3):
+            _frame(profiler, clock, [('poll', 0.001), ('render', 0.004)])
+            clock.now += 0.005
+        summary = profiler.summary()
+        assert len(profiler) == summary['frames'] == 2
+        assert round(summary['fps']) == 100
+        assert round(summary['frame_ms'], 6) == 5
+        assert round(summary['phases']['render'], 6) == 4
+
+    def test_chrome_trace_nests_components_in_phases(self):
+        clock = FakeClock()
+        profiler = FrameProfiler(clock=clock)
+        profiler.begin('render')
+        start = clock.now
+        clock.now += 0.002
+        profiler.component('table', start)
+        profiler.end_frame()
+        events = json.loads(profiler.to_chrome_trace())['traceEvents']
+        assert [(e['name'], e['cat'], e['ts'], round(e['dur']))
+                for e in events] == [
+            ('frame', 'frame', 0, 2000),
+            ('render', 'phase', 0, 2000),
+            ('table', 'component', 0, 2000)]
+        frames = json.loads(profiler.to_json())['frames']
+        assert frames[0]['components'][0][0] == 'table'
+
+
+class TestProfiledController(object):
+    def _controller(self):
+        controller = IgnoringController()
+        view = View()
+        view.add_component('field', TextField(0, 0, text='hi'))
+        inner = View(0, 2)
+        inner.add_component('label', Art(0, 0, 'label'))
+        view.add_component('inner', inner)
+        controller.add_view('main', view)
+        return controller
+
+    def test_frames_record_phases_and_components(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        controller = self._controller()
+        profiler = FrameProfiler()
+        controller.profiler = profiler
+        controller._poll_all(window)
+        controller._draw(window)
+        frame, = profiler.frames
+        assert [name for name, _, _ in frame.phases] == [
+            'poll', 'erase', 'render', 'refresh']
+        assert [name for name, _, _ in frame.components] == [
+            'field', 'inner/label']
+
+    def test_overlay_shows_and_hides(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        controller = self._controller()
+        profiler = FrameProfiler()
+        controller.profiler = profiler
+        overlay = ProfilerOverlay(profiler, x=40, rows=1)
+        controller.active_view.add_component('profiler', overlay)
+        controller._draw(window)
+        # The first frame's timings are shown by the next frame.
+        assert overlay.dirty
+        controller._draw(window)
+        assert overlay.height == 3
+        assert 'fps' in fake_screen.row(0)[40:]
+        overlay.toggle()
+        assert (overlay.width, overlay.height) == (0, 0)
+        controller._draw(window)
+        assert fake_screen.row(0)[40:].strip() == ''
+
+    def test_overlay_updates_in_event_loop(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses(),
+                        input_fd=fake_screen.fileno())
+        controller = QuitController()
+        profiler = FrameProfiler()
+        overlay = ProfilerOverlay(profiler, rows=1)
+        controller.get_view('main').add_component('profiler', overlay)
+        controller.profiler = profiler
+
+        def _stop():
+            raise CloseSplutterWindow('done')
+
+        _run(controller, window, (0.05, _stop, ()))
+        # The first frame invalidates the overlay, which draws it again.
+        assert fake_screen.frames == 2
+        assert 'fps' in fake_screen.row(0)
+        assert not overlay.dirty
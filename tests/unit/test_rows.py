@@ -0,0 +1,168 @@
+import operator
+from array import array
+
+import pytest
+
+from splutter.rows import ColumnarRows
+from splutter.rows import RowStore
+from splutter.table import ColumnSpec
+from splutter.table import Table
+
+
+def _store():
+    store = RowStore(sort_key=lambda row: row[1])
+    store.update({'b': ['b', 20], 'a': ['a', 30], 'c': ['c', 10]})
+    return store
+
+
+class TestRowStore(object):
+    def test_rows_are_in_sort_order(self):
+        store = _store()
+        assert list(store) == [['c', 10], ['b', 20], ['a', 30]]
+        assert list(store.keys()) == ['c', 'b', 'a']
+        assert store.index('a') == 2
+        assert store.key_at(0) == 'c'
+
+    def test_update_moves_row(self):
+        store = _store()
+        store.set('a', ['a', 15])
+        assert list(store.keys()) == ['c', 'a', 'b']
+        assert store.get('a') == ['a', 15]
+
+    def test_delete(self):
+        store = _store()
+        store.delete('b')
+        assert list(store.keys()) == ['c', 'a']
+        assert 'b' not in store
+        assert len(store) == 2
+
+    def test_equal_sort_values_are_ordered_by_key(self):
+        store = RowStore(sort_key=lambda row: 0)
+        store.update([(3, 'x'), (1, 'y'), (2, 'z')])
+        assert list(store) == ['y', 'z', 'x']
+
+    def test_default_order_is_by_key(self):
+        store = RowStore()
+        store.update([(3, 'x'), (1, 'y'), (2, 'z')])
+        assert list(store) == ['y', 'z', 'x']
+
+    def test_listeners_are_notified(self):
+        store = _store()
+        changed = []
+        store.subscribe(changed.append)
+        store.set('d', ['d', 0])
+        store.delete('a')
+        store.unsubscribe(changed.append)
+        store.delete('b')
+        assert changed == ['d', 'a']
+
+
+class TestKeyedTable(object):
+    def _table(self, store):
+        table = Table(0, 0, [ColumnSpec('Name', 5), ColumnSpec('Value', 6)])
+        table.rows = store
+        return table
+
+    def test_selection_follows_row(self):
+        store = _store()
+        table = self._table(store)
+        table.down()
+        assert table.selected_row == ['b', 20]
+        store.set('d', ['d', 0])
+        assert table.selected_row == ['b', 20]
+        store.set('b', ['b', 99])
+        assert table.selected_row == ['b', 99]
+
+    def test_deleting_selected_row_keeps_position(self):
+        store = _store()
+        table = self._table(store)
+        table.down()
+        store.delete('b')
+        assert table.selected_row == ['a', 30]
+        store.delete('a')
+        assert table.selected_row == ['c', 10]
+
+    def test_only_changed_row_is_reformatted(self):
+        store = _store()
+        table = self._table(store)
+        table._line(0)
+        table._line(1)
+        store.set('z', ['z', 1])
+        assert set(table._lines) == {'c', 'b'}
+        store.set('b', ['b', 21])
+        assert set(table._lines) == {'c'}
+        assert table.height == 5
+
+    def test_replacing_rows_unsubscribes(self):
+        store = _store()
+        table = self._table(store)
+        table.rows = [['x', 1]]
+        store.delete('a')
+        assert table.selected_row == ['x', 1]
+
+
+def _columns(module=None):
+    names = ['api', 'db', 'cache', 'queue']
+    latencies = [12.5, 3.25, 0.5, 40.0]
+    counts = [100, 20, 3000, 7]
+    if module is None:
+        return [names, array('d', latencies), array('q', counts)]
+    return [module.array(names), module.array(latencies),
+            module.array(counts)]
+
+
+_SPECS = [ColumnSpec('Name', 6), ColumnSpec('Latency', 8, fmt='%.1f'),
+          ColumnSpec('Count', 6, fmt='%d')]
+
+
+class TestColumnarRows(object):
+    def test_rows_by_index(self):
+        rows = ColumnarRows(_columns())
+        assert len(rows) == 4
+        assert rows[1] == ['db', 3.25, 20]
+        assert rows[-1] == ['queue', 40.0, 7]
+        with pytest.raises(IndexError):
+            rows[4]
+
+    def test_columns_must_have_same_length(self):
+        with pytest.raises(ValueError):
+            ColumnarRows([[1, 2], [1]])
+
+    def test_format_rows(self):
+        rows = ColumnarRows(_columns())
+        assert rows.format_rows(1, 3, _SPECS) == [
+            'db     3.2      20    ',
+            'cache  0.5      3000  ',
+        ]
+
+    def test_sorted_and_filtered_views(self):
+        rows = ColumnarRows(_columns())
+        by_latency = rows.sorted_by(1, reverse=True)
+        assert [row[0] for row in by_latency] == ['queue', 'api', 'db',
+                                                  'cache']
+        busy = by_latency.filtered(2, operator.ge, 20)
+        assert [row[0] for row in busy] == ['api', 'db', 'cache']
+        assert busy.format_rows(0, 1, _SPECS) == ['api    12.5     100   ']
+        assert len(rows) == 4
+
+    def test_numpy_matches_python(self):
+        numpy = pytest.importorskip('numpy')
+        plain = ColumnarRows(_columns())
+        vectorized = ColumnarRows(_columns(numpy))
+        for rows in (plain, vectorized):
+            rows = rows.sorted_by(2).filtered(1, operator.lt, 20)
+            assert rows.format_rows(0, len(rows), _SPECS) == [
+                'db     3.2      20    ',
+                'api    12.5     100   ',
+                'cache  0.5      3000  ',
+            ]
+
+    def test_table_draws_columnar_rows(self):
+        table = Table(0, 0, _SPECS, height=2)
+        table.rows = ColumnarRows(_columns()).sorted_by(0)
+        table.down()
+        assert table._visible_lines() == [
+            'api    12.5     100   ',
+            'cache  0.5      3000  ',
+        ]
+        assert table.selected_row == ['cache', 0.5, 3000]
@@ -0,0 +1,42 @@
+import pytest
+
+from splutter.scheduler import FrameScheduler
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFrameScheduler(object):
+    def test_uncapped_frames_are_due_immediately(self):
+        scheduler = FrameScheduler(clock=FakeClock())
+        scheduler.frame_drawn()
+        scheduler.request()
+        assert scheduler.pending
+        assert scheduler.next_frame_in() == 0
+
+    def test_requests_are_merged(self):
+        scheduler = FrameScheduler(fps=10, clock=FakeClock())
+        for _ in range(1000):
+            scheduler.request()
+        assert scheduler.pending
+        scheduler.frame_drawn()
+        assert not scheduler.pending
+
+    def test_frames_are_spaced_by_fps(self):
+        clock = FakeClock()
+        scheduler = FrameScheduler(fps=10, clock=clock)
+        assert scheduler.next_frame_in() == 0
+        scheduler.frame_drawn()
+        clock.now += 0.04
+        assert scheduler.next_frame_in() == pytest.approx(0.06)
+        clock.now += 0.1
+        assert scheduler.next_frame_in() == 0
+
+    def test_fps_must_be_positive(self):
+        with pytest.raises(ValueError):
+            FrameScheduler(fps=0)
@@ -0,0 +1,118 @@
+from splutter.rows import RowStore
+from splutter.search import TextIndex
+from splutter.table import ColumnSpec
+from splutter.table import Table
+
+
+class CountingRows(object):
+    def __init__(self, rows):
+        self._rows = rows
+        self.reads = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return self._rows[index]
+
+
+_HOSTS = [['web-1', 'UP'], ['web-2', 'down'], ['db-1', 'up'],
+          ['cache-1', 'Up']]
+
+
+class TestTextIndex(object):
+    def test_search_ignores_case(self):
+        index = TextIndex(_HOSTS)
+        assert list(index.search('UP')) == [['web-1', 'UP'], ['db-1', 'up'],
+                                            ['cache-1', 'Up']]
+        assert list(index.search('WEB')) == _HOSTS[:2]
+
+    def test_rows_are_read_once(self):
+        rows = CountingRows(_HOSTS)
+        index = TextIndex(rows)
+        assert rows.reads == 4
+        index.search('w')
+        index.search('we')
+        index.search('w')
+        assert rows.reads == 4
+
+    def test_extending_a_query_narrows_previous_matches(self):
+        index = TextIndex(_HOSTS)
+        index.search('web')
+        index._texts[2] = 'web-9'
+        # Only the previous matches are checked, so the edit is not seen.
+        assert len(index.search('web-')) == 2
+
+    def test_refresh_updates_remembered_matches(self):
+        rows = [list(row) for row in _HOSTS]
+        index = TextIndex(rows)
+        view = index.search('down')
+        rows[0][1] = 'down'
+        index.refresh(0)
+        assert list(view) == [['web-1', 'down'], ['web-2', 'down']]
+        assert view.source_index(1) == 1
+
+    def test_keyed_rows_are_indexed_as_they_change(self):
+        store = RowStore()
+        store.update((row[0], row) for row in _HOSTS)
+        index = TextIndex(store)
+        index.search('u')
+        view = index.search('up')
+        assert [row[0] for row in view] == ['cache-1', 'db-1', 'web-1']
+        store.set('db-1', ['db-1', 'down'])
+        store.set('app-1', ['app-1', 'up'])
+        store.delete('cache-1')
+        assert [row[0] for row in view] == ['app-1', 'web-1']
+        assert [row[0] for row in index.search('u')] == ['app-1', 'web-1']
+        assert view.index('web-1') == 1
+        assert 'db-1' not in view
+
+
+class TestTableFilter(object):
+    def _table(self, rows):
+        table = Table(0, 0, [ColumnSpec('Host', 8), ColumnSpec('State', 6)])
+        table.rows = rows
+        return table
+
+    def test_filter_and_clear(self):
+        table = self._table(_HOSTS)
+        table.filter('web')
+        assert list(table.rows) == _HOSTS[:2]
+        assert table.height == 3
+        assert table.unfiltered_rows is _HOSTS
+        table.filter('')
+        assert table.rows is _HOSTS
+
+    def test_filtered_keyed_table_follows_changes(self):
+        store = RowStore()
+        store.update((row[0], row) for row in _HOSTS)
+        table = self._table(store)
+        table.filter('web')
+        table.down()
+        assert table.selected_row == ['web-2', 'down']
+        store.set('web-0', ['web-0', 'up'])
+        assert len(table.rows) == 3
+        assert table.selected_row == ['web-2', 'down']
+
+    def test_filtering_keeps_the_selected_row(self):
+        store = RowStore()
+        store.update(('host-%d' % i, ['host-%d' % i, 'up'])
+                     for i in range(10))
+        table = self._table(store)
+        for _ in range(5):
+            table.down()
+        assert table.selected_row[0] == 'host-5'
+        table.filter('t-5')
+        assert table.selected_row[0] == 'host-5'
+        table.filter('')
+        assert table.selected_row[0] == 'host-5'
+
+    def test_invalidate_row_of_filtered_table(self):
+        rows = [list(row) for row in _HOSTS]
+        table = self._table(rows)
+        table.filter('web')
+        rows[1][0] = 'db-2'
+        table.invalidate_row(1)
+        assert list(table.rows) == [['web-1', 'UP']]
+        assert table.height == 2
@@ -0,0 +1,39 @@
+from splutter.spatial import GridIndex
+
+
+class TestGridIndex(object):
+    def test_query_point(self):
+        index = GridIndex(cell_size=4)
+        index.insert('a', (0, 0, 10, 2))
+        index.insert('b', (5, 1, 6, 9))
+        assert sorted(index.query_point(5, 1)) == ['a', 'b']
+        assert index.query_point(9, 1) == ['a']
+        assert index.query_point(10, 1) == []
+        assert index.query_point(-1, -1) == []
+
+    def test_query_rect(self):
+        index = GridIndex(cell_size=4)
+        index.insert('a', (0, 0, 10, 2))
+        index.insert('b', (5, 4, 6, 9))
+        assert sorted(index.query_rect((0, 0, 40, 40))) == ['a', 'b']
+        assert index.query_rect((6, 2, 20, 20)) == []
+        assert index.query_rect((3, 3, 3, 3)) == []
+
+    def test_move_and_remove(self):
+        index = GridIndex(cell_size=4)
+        index.insert('a', (0, 0, 2, 2))
+        index.insert('a', (20, 20, 22, 22))
+        assert index.query_point(0, 0) == []
+        assert index.query_point(21, 21) == ['a']
+        assert index.rect('a') == (20, 20, 22, 22)
+        index.remove('a')
+        index.remove('a')
+        assert 'a' not in index
+        assert len(index) == 0
+        assert index._cells == {}
+
+    def test_empty_rect_is_never_hit(self):
+        index = GridIndex()
+        index.insert('a', (3, 3, 3, 10))
+        assert 'a' in index
+        assert index.query_point(3, 3) == []
@@ -0,0 +1,132 @@
+import pytest
+
+from tests.conftest import FakeCurses
+
+from splutter.table import ColumnSpec
+from splutter.table import Table
+from splutter.window import Window
+from splutter.window import WindowEvent
+
+
+class LazyRows(object):
+    """A large sequence of rows that builds each row when it is read."""
+    def __init__(self, count):
+        self._count = count
+        self.reads = set()
+        self.read_count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        self.reads.add(index)
+        self.read_count += 1
+        return [index, 'row %d' % index]
+
+
+@pytest.fixture
+def window(fake_screen):
+    return Window(fake_screen, curses_lib=FakeCurses())
+
+
+def _table(rows, height=3):
+    table = Table(0, 0, [ColumnSpec('Id', 8), ColumnSpec('Name', 10)],
+                  height=height)
+    table.rows = rows
+    return table
+
+
+class TestVirtualizedTable(object):
+    def test_only_visible_rows_are_read(self, window):
+        rows = LazyRows(1000000)
+        table = _table(rows)
+        table.render(0, 0, window)
+        assert rows.reads == {0, 1, 2}
+        assert table.height == 4
+
+    def test_scrolls_to_keep_selection_visible(self, window):
+        rows = LazyRows(100)
+        table = _table(rows)
+        for _ in range(5):
+            table.down()
+        assert table.scroll == 3
+        rows.reads.clear()
+        table.render(0, 0, window)
+        assert rows.reads == {3, 4, 5}
+        for _ in range(4):
+            table.up()
+        assert table.scroll == 1
+
+    def test_selection_is_clamped(self):
+        table = _table(LazyRows(2))
+        table.up()
+        assert table.selected_row == [0, 'row 0']
+        for _ in range(5):
+            table.down()
+        assert table.selected_row == [1, 'row 1']
+        assert table.scroll == 0
+
+    def test_shrinking_rows_clamps_scroll(self):
+        table = _table(LazyRows(100))
+        for _ in range(50):
+            table.down()
+        table.rows = LazyRows(10)
+        assert table.selected_row == [9, 'row 9']
+        assert table.scroll == 7
+
+    def test_without_height_every_row_is_shown(self):
+        table = _table(LazyRows(20), height=None)
+        assert table.height == 21
+
+    def test_keys_are_bound_through_keymap(self):
+        table = _table(LazyRows(10))
+        table.keymap.bind('j', 'down')
+        event = WindowEvent(ord('j'), WindowEvent.KEY_EVENT)
+        table.handle_event(event, None)
+        assert table.selected_row == [1, 'row 1']
+        assert not event.should_handle
+        # Other tables keep the default bindings.
+        assert _table(LazyRows(1)).keymap.describe() == [
+            ('down', 'down'), ('up', 'up')]
+
+
+class TestRowCache(object):
+    def test_rows_are_formatted_once(self, window):
+        rows = LazyRows(10)
+        table = _table(rows)
+        table.render(0, 0, window)
+        table.render(0, 0, window)
+        assert rows.read_count == 3
+
+    def test_rows_are_one_padded_line(self, window, fake_screen):
+        table = _table(LazyRows(10), height=1)
+        table.render(0, 0, window)
+        window.refresh()
+        assert [s for _, _, s in fake_screen.strings] == [
+            'Id       Name',
+            # The selected row's padding differs in color from the blanks.
+            '0        row 0     ',
+        ]
+
+    def test_cells_are_clamped_to_column_width(self):
+        table = Table(0, 0, [ColumnSpec('Id', 3), ColumnSpec('Name', 5)])
+        table.rows = [['12345', 'abcdefg']]
+        assert table._line(0) == '123 abcde'
+
+    def test_invalidate_row_reformats_it(self, window):
+        rows = [[1, 'one'], [2, 'two']]
+        table = _table(rows)
+        table.render(0, 0, window)
+        rows[1][1] = 'TWO'
+        table.invalidate_row(1)
+        assert table.dirty
+        assert table._line(1) == '2        TWO       '
+
+    def test_changing_col_specs_reformats_rows(self):
+        table = _table([[1, 'one']])
+        assert table._line(0) == '1        one       '
+        table.col_specs = [ColumnSpec('Name', 5)]
+        assert table._line(0) == '1    '
+        assert table.width == 5
@@ -0,0 +1,172 @@
+import random
+
+from tests.conftest import FakeCurses
+
+from splutter.keys import KEY_DELETE, KEY_LEFT, KEY_UP, KEY_DOWN, KEY_ENTER
+from splutter.text import GapBuffer
+from splutter.text import TextArea
+from splutter.text import TextField
+from splutter.text import _LineIndex
+from splutter.window import Window
+from splutter.window import WindowEvent
+
+
+def _key(code):
+    if isinstance(code, str):
+        code = ord(code)
+    return WindowEvent(code, WindowEvent.KEY_EVENT)
+
+
+class TestGapBuffer(object):
+    def test_insert_and_delete(self):
+        buffer = GapBuffer('hello world')
+        buffer.insert(5, ',')
+        buffer.insert(0, '>> ')
+        buffer.delete(3, 5)
+        assert str(buffer) == '>> , world'
+        assert len(buffer) == 10
+
+    def test_matches_string_edits(self):
+        rand = random.Random(7)
+        text = ''
+        buffer = GapBuffer()
+        for _ in range(2000):
+            index = rand.randint(0, len(text))
+            if rand.random() < 0.6:
+                chunk = ''.join(rand.choice('abcé') for _ in
+                                range(rand.randint(1, 5)))
+                buffer.insert(index, chunk)
+                text = text[:index] + chunk + text[index:]
+            else:
+                count = rand.randint(1, 4)
+                buffer.delete(index, count)
+                text = text[:index] + text[index + count:]
+            start = rand.randint(0, len(text))
+            end = rand.randint(start, len(text) + 2)
+            assert buffer.slice(start, end) == text[start:end]
+        assert str(buffer) == text
+
+    def test_delete_past_end_is_ignored(self):
+        buffer = GapBuffer('abc')
+        buffer.delete(3)
+        buffer.delete(1, 10)
+        assert str(buffer) == 'a'
+
+
+class TestTextField(object):
+    def test_typing_and_deleting(self):
+        field = TextField(0, 0, width=10, text='ac')
+        field.handle_event(_key(KEY_LEFT), None)
+        field.handle_event(_key('b'), None)
+        assert field.text == 'abc'
+        field.handle_event(_key(KEY_DELETE), None)
+        field.handle_event(_key(KEY_DELETE), None)
+        assert field.text == 'c'
+
+    def test_visible_text_is_cached(self):
+        field = TextField(0, 0, width=3, max_length=100, text='')
+        for char in 'abcdef':
+            field.handle_event(_key(char), None)
+        visible = field._text_window()
+        assert visible == 'def'
+        assert field._text_window() is visible
+        field.text = 'abcdefgh'
+        assert field._text_window() == 'defg'
+
+
+class TestLineIndex(object):
+    def _starts(self, text):
+        starts = [0]
+        starts.extend(i + 1 for i, char in enumerate(text) if char == '\n')
+        return starts
+
+    def test_matches_text_after_edits(self):
+        rand = random.Random(3)
+        text = 'one\ntwo\n\nthree'
+        index = _LineIndex(text)
+        for _ in range(1000):
+            offset = rand.randint(0, len(text))
+            if rand.random() < 0.6:
+                chunk = ''.join(rand.choice('ab\n') for _ in
+                                range(rand.randint(1, 4)))
+                index.insert(offset, chunk)
+                text = text[:offset] + chunk + text[offset:]
+            else:
+                count = min(rand.randint(1, 3), len(text) - offset)
+                index.delete(offset, count)
+                text = text[:offset] + text[offset + count:]
+            starts = self._starts(text)
+            assert [index.start(i) for i in range(len(index))] == starts
+            probe = rand.randint(0, len(text))
+            assert index.line_of(probe) == text.count('\n', 0, probe)
+
+
+class TestTextArea(object):
+    def _type(self, area, keys):
+        for key in keys:
+            area.handle_event(_key(key), None)
+
+    def test_typing_lines(self):
+        area = TextArea(0, 0, 10, 3)
+        self._type(area, ['a', 'b', KEY_ENTER, 'c', KEY_UP, 'x'])
+        assert area.text == 'axb\nc'
+        assert area.cursor == (2, 0)
+        self._type(area, [KEY_DOWN, KEY_DELETE, KEY_DELETE])
+        assert area.text == 'axb'
+        assert area.line_count == 1
+
+    def test_only_visible_lines_are_drawn(self, fake_screen):
+        window = Window(fake_screen, curses_lib=FakeCurses())
+        text = '\n'.join('line %d' % i for i in range(10000))
+        area = TextArea(0, 0, 6, 2, text=text)
+        area._set_cursor(len(text))
+        area.render(0, 0, window)
+        window.refresh()
+        # Scrolled to show the end of the last line.
+        assert fake_screen.strings == [(1, 0, '9998'), (1, 1, '9999')]
+        assert area.cursor == (9, 9999)
+
+
+class EnterField(TextField):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted = []
+
+    def _handle_enter(self):
+        self.submitted.append(self.text)
+        self.text = ''
+        self._x_offset = 0
+        self._left_boundry = 0
+
+
+class TestPaste(object):
+    def test_text_field_inserts_paste_at_once(self):
+        field = TextField(0, 0, width=4, max_length=100, text='[]')
+        field.handle_event(_key(KEY_LEFT), None)
+        event = WindowEvent.paste('x' * 50)
+        field.handle_event(event, None)
+        assert not event.should_handle
+        assert field.text == '[' + 'x' * 50 + ']'
+        assert field._cursor_location() == 4
+
+    def test_text_field_paste_is_limited(self):
+        field = TextField(0, 0, width=4, max_length=5)
+        field.handle_event(WindowEvent.paste('abcdefghij'), None)
+        assert field.text == 'abcdef'
+
+    def test_text_field_paste_keeps_non_ascii_text(self):
+        field = TextField(0, 0, width=20)
+        field.handle_event(WindowEvent.paste('caf\xe9 \u2713\x07'), None)
+        assert field.text == 'caf\xe9 \u2713'
+
+    def test_newlines_press_enter(self):
+        field = EnterField(0, 0, width=10, max_length=100)
+        field.handle_event(WindowEvent.paste('one\ntwo\nthr'), None)
+        assert field.submitted == ['one', 'two']
+        assert field.text == 'thr'
+
+    def test_text_area_inserts_paste(self):
+        area = TextArea(0, 0, 10, 3)
+        area.handle_event(WindowEvent.paste('a\nb\nc'), None)
+        assert area.text == 'a\nb\nc'
+        assert area.cursor == (1, 2)
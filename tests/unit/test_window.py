@@ -2,41 +2,33 @@ import pytest
 
 from tests.conftest import FakeCurses
 
+from splutter.colors import Color
+from splutter.colors import RED
+from splutter.keys import KEY_UP
 from splutter.window import Window
+from splutter.window import WindowEvent
+from splutter.events import EventPool
+from splutter.headless import HeadlessScreen
 
 
-class TestCursesWindow(object):
-    """Fake curses window to make rendering calls against.
-
-    Records rendering calls so they can be verified later.
-    """
+class RecordingScreen(HeadlessScreen):
+    """Headless screen that records its ``addstr`` calls."""
     def __init__(self):
-        self._buffer = [['' for i in range(100)] for j in range(100)]
-        print(self._buffer)
-
-    def refresh(self):
-        pass
-
-    def erase(self):
-        pass
-
-    def addstr(self, y, x, char, attr):
-        print(y, x, char, attr)
+        super().__init__()
+        self.calls = []
 
-    def addch(self, y, x, char, attr):
-        pass
+    def addstr(self, y, x, string, attr=0):
+        self.calls.append((y, x, string, attr))
+        super().addstr(y, x, string, attr)
 
-    def getch(self):
-        pass
 
-
-    def addch(self, y, x, char, attr):
-        pass
+@pytest.fixture
+def ncurses_window():
+    return RecordingScreen()
 
 
 @pytest.fixture
-def window():
-    ncurses_window = TestCursesWindow()
+def window(ncurses_window):
     window = Window(ncurses_window, curses_lib=FakeCurses())
     return window
 
@@ -44,3 +36,164 @@ def window():
 class TestBasicDrawing(object):
     def test_basic_string(self, window):
         window.add_string(0, 0, "foo bar baz")
+
+
+def _attr(window):
+    return window.default_color.COLOR_UID << 8
+
+
+class TestBufferedDrawing(object):
+    def test_nothing_is_drawn_until_refresh(self, window, ncurses_window):
+        window.add_string(0, 0, "foo bar baz")
+        assert ncurses_window.calls == []
+        window.refresh()
+        assert ncurses_window.calls == [(0, 0, "foo bar baz", _attr(window))]
+
+    def test_unchanged_cells_are_not_redrawn(self, window, ncurses_window):
+        window.add_string(0, 0, "foo bar baz")
+        window.refresh()
+        ncurses_window.calls = []
+        window.erase()
+        window.add_string(0, 0, "foo BAR baz")
+        window.refresh()
+        assert ncurses_window.calls == [(0, 4, "BAR", _attr(window))]
+
+    def test_redraw_of_same_frame_sends_nothing(self, window,
+                                                ncurses_window):
+        window.add_string(3, 2, "foo")
+        window.refresh()
+        ncurses_window.calls = []
+        window.erase()
+        window.add_string(3, 2, "foo")
+        window.refresh()
+        assert ncurses_window.calls == []
+
+    def test_erased_text_is_blanked(self, window, ncurses_window):
+        window.add_string(3, 2, "foo")
+        window.refresh()
+        ncurses_window.calls = []
+        window.erase()
+        window.refresh()
+        assert ncurses_window.calls == [(2, 3, "   ", _attr(window))]
+
+    def test_runs_are_split_by_color(self, window, ncurses_window):
+        other = Color(fg=RED)
+        window.add_string(0, 0, "ab")
+        window.add_string(2, 0, "cd", other)
+        window.refresh()
+        assert ncurses_window.calls == [
+            (0, 0, "ab", _attr(window)),
+            (0, 2, "cd", other.COLOR_UID << 8),
+        ]
+
+    def test_spans_of_one_color_are_drawn_together(self, window,
+                                                   ncurses_window):
+        other = Color(fg=RED)
+        window.add_spans(0, 0, [("ab", None), ("cd", window.default_color),
+                                ("ef", other), ("gh", None)])
+        window.refresh()
+        assert ncurses_window.calls == [
+            (0, 0, "abcd", _attr(window)),
+            (0, 4, "ef", other.COLOR_UID << 8),
+            (0, 6, "gh", _attr(window)),
+        ]
+
+    def test_spans_are_clipped(self, window, ncurses_window):
+        other = Color(fg=RED)
+        window.add_spans(-3, 0, [("ab", other), ("cdef", None)])
+        window.add_spans(76, 1, [("ab", None), ("cd", other), ("ef", None)])
+        window.add_spans(0, 24, [("ab", None)])
+        window.refresh()
+        assert ncurses_window.calls == [
+            (0, 0, "def", _attr(window)),
+            (1, 76, "ab", _attr(window)),
+            (1, 78, "cd", other.COLOR_UID << 8),
+        ]
+
+    def test_drawing_is_clipped(self, window, ncurses_window):
+        window.add_string(-2, 0, "foobar")
+        window.add_string(78, 1, "foobar")
+        window.add_string(0, 24, "foobar")
+        window.refresh()
+        assert ncurses_window.calls == [
+            (0, 0, "obar", _attr(window)),
+            (1, 78, "fo", _attr(window)),
+        ]
+
+    def test_drawing_is_clipped_to_clip_rect(self, window, ncurses_window):
+        window.clip = (2, 1, 5, 2)
+        window.add_string(0, 1, "foobar")
+        window.add_string(0, 0, "foobar")
+        window.clip = None
+        window.add_string(0, 3, "baz")
+        window.refresh()
+        assert ncurses_window.calls == [
+            (1, 2, "oba", _attr(window)),
+            (3, 0, "baz", _attr(window)),
+        ]
+
+
+class ScriptedWindow(RecordingScreen):
+    def __init__(self, keys):
+        super().__init__()
+        self.feed(keys)
+
+
+class TestGetEvents(object):
+    def _events(self, keys):
+        window = Window(ScriptedWindow(keys), curses_lib=FakeCurses())
+        return window.get_events()
+
+    def test_typing_is_not_coalesced(self):
+        events = self._events(b'abc')
+        assert events == ['a', 'b', 'c']
+        assert all(e.event_type == WindowEvent.KEY_EVENT for e in events)
+
+    def test_bursts_become_paste_events(self):
+        events = self._events([KEY_UP] + list(b'hello\nworld') + [KEY_UP])
+        assert [e.event_type for e in events] == [
+            WindowEvent.KEY_EVENT, WindowEvent.PASTE_EVENT,
+            WindowEvent.KEY_EVENT]
+        assert events[1].text == 'hello\nworld'
+        assert events[1].printable() is None
+        assert events[1] != 'h'
+
+
+class TestWindowEvent(object):
+    def test_events_have_no_instance_dict(self):
+        event = WindowEvent(ord('a'), WindowEvent.KEY_EVENT)
+        assert not hasattr(event, '__dict__')
+
+    def test_printable(self):
+        def printable(code):
+            return WindowEvent(code, WindowEvent.KEY_EVENT).printable()
+        assert printable(ord('a')) == 'a'
+        assert printable(ord('\n')) == '\n'
+        assert printable(1) is None
+        assert printable(KEY_UP) is None
+        assert printable(-1) is None
+
+
+class TestEventPool(object):
+    def test_released_events_are_reused(self):
+        pool = EventPool(size=1)
+        event = pool.acquire(ord('a'), WindowEvent.KEY_EVENT)
+        event.stop_propagation()
+        pool.release(event)
+        pool.release(WindowEvent(ord('c'), WindowEvent.KEY_EVENT))
+        assert len(pool) == 1
+        reused = pool.acquire(ord('b'), WindowEvent.KEY_EVENT)
+        assert reused is event
+        assert reused == 'b' and reused.should_handle
+        assert len(pool) == 0
+
+    def test_window_recycles_events(self):
+        pool = EventPool()
+        window = Window(ScriptedWindow(b'ab' * 8), curses_lib=FakeCurses(),
+                        event_pool=pool)
+        events = window.get_events()
+        # The keys that were merged into a paste go straight back.
+        assert len(pool) == 16
+        assert events[0].text == 'ab' * 8
+        window.release_events(events)
+        assert len(pool) == 17